@@ -0,0 +1,143 @@
+# --- START OF FILE assets.py ---
+
+import os
+import hashlib
+
+from minify import iter_tokens
+
+
+FINGERPRINT_LENGTH = 10       # hex digits of the content hash kept in names
+URL_ATTRIBUTES = ("href", "src")
+
+
+def file_digest(path, chunk_size=1 << 16):
+    """Returns the hex SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint_name(file_name, digest):
+    """Turns 'name.ext' into 'name.<hash>.ext' using the first digits of digest."""
+    base_name, extension = os.path.splitext(file_name)
+    return f"{base_name}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+
+class AssetMap(dict):
+    """
+    Maps root-relative asset URLs ('/images/tom.png') to their fingerprinted
+    names ('/images/tom.3f2a9c01de.png').
+    """
+
+    def digest(self):
+        """A short hash of the whole mapping, used to key compiled templates."""
+        digest = hashlib.sha256()
+        for url, hashed_url in sorted(self.items()):
+            digest.update(f"{url}\0{hashed_url}\0".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+
+def scan_asset_map(static_dir):
+    """
+    Builds the AssetMap that copy_directory_recursive would produce for
+    static_dir, without copying anything.
+    """
+    asset_map = AssetMap()
+    for dir_path, _, file_names in os.walk(static_dir):
+        rel_dir = os.path.relpath(dir_path, static_dir).replace(os.sep, "/")
+        url_path = "/" if rel_dir == "." else f"/{rel_dir}/"
+        for name in file_names:
+            digest = file_digest(os.path.join(dir_path, name))
+            asset_map[url_path + name] = url_path + fingerprint_name(name, digest)
+    return asset_map
+
+
+class DedupeIndex:
+    """
+    Content-addressed record of the static files copied so far: the first
+    file with a given digest is copied, later identical files are hardlinked
+    to it.
+    """
+
+    def __init__(self):
+        self.paths = {}        # digest -> destination path of the physical copy
+        self.linked = 0        # files stored as hardlinks
+        self.saved_bytes = 0   # bytes not written thanks to hardlinks
+
+    def place(self, source_path, destination_path, digest, backend=None):
+        """
+        Writes source_path to destination_path, hardlinking to an earlier
+        copy with the same digest when possible.
+
+        Args:
+            backend: Optional OutputBackend to write through instead of the
+                local filesystem.
+
+        Returns:
+            True if the file was hardlinked, False if it was copied.
+        """
+        if backend is None:
+            from output import DiskBackend  # output imports this module
+            backend = DiskBackend()
+        original = self.paths.get(digest)
+        if original is not None and original != destination_path:
+            # Falls back to a copy e.g. across devices or without hardlink support
+            if backend.link_file(original, destination_path):
+                self.linked += 1
+                self.saved_bytes += os.path.getsize(source_path)
+                return True
+        backend.copy_file(source_path, destination_path)
+        self.paths[digest] = destination_path
+        return False
+
+    def __repr__(self):
+        return f"DedupeIndex(unique={len(self.paths)}, linked={self.linked}, saved_bytes={self.saved_bytes})"
+
+
+def asset_map_key(asset_map):
+    """Cache key for an asset mapping; None when there is nothing to rewrite."""
+    if not asset_map:
+        return None
+    if isinstance(asset_map, AssetMap):
+        return asset_map.digest()
+    return AssetMap(asset_map).digest()
+
+
+def _rewrite_tag(tag, asset_map):
+    """Rewrites href/src attribute values of one raw tag through asset_map."""
+    for attribute in URL_ATTRIBUTES:
+        for quote in ('"', "'"):
+            marker = f"{attribute}={quote}"
+            start = tag.find(marker)
+            # Require a separator before the name so 'data-src=' is left alone
+            while start != -1 and not tag[start - 1].isspace():
+                start = tag.find(marker, start + 1)
+            if start == -1:
+                continue
+            value_start = start + len(marker)
+            value_end = tag.find(quote, value_start)
+            if value_end == -1:
+                continue
+            value = tag[value_start:value_end]
+            if value in asset_map:
+                tag = tag[:value_start] + asset_map[value] + tag[value_end:]
+    return tag
+
+
+def rewrite_asset_references(html, asset_map):
+    """
+    Points every href/src attribute in html that names a fingerprinted
+    asset at its hashed name. Text content is never touched.
+    """
+    if not asset_map:
+        return html
+    parts = []
+    for kind, text in iter_tokens(html):
+        if kind == "tag" and not text.startswith("<!--"):
+            text = _rewrite_tag(text, asset_map)
+        parts.append(text)
+    return "".join(parts)
+
+# --- END OF FILE assets.py ---
@@ -0,0 +1,453 @@
+# --- START OF FILE bench.py ---
+
+"""
+Micro- and macro-benchmarks for the generator. Not part of the test suite;
+run one by name, e.g.:
+
+    python3 src/bench.py streaming --sizes 50,500
+    python3 src/bench.py allocations
+    python3 src/bench.py adversarial
+    python3 src/bench.py escaping
+    python3 src/bench.py tags
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import contextlib
+import resource
+import tempfile
+import tracemalloc
+import multiprocessing
+
+import htmlnode
+from textnode import TextNode, TextType
+from htmlnode import (
+    iter_split_nodes_delimiter,
+    iter_split_nodes_image,
+    iter_split_nodes_link,
+    iter_text_to_textnodes,
+    markdown_to_html_node,
+    text_to_textnodes,
+    render_markdown_stream,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link
+)
+
+
+SAMPLE_BLOCKS = [
+    "## Section {n}",
+    "A paragraph with **bold**, _italic_ and `code`, plus a [link](/blog/{n}) and "
+    "an ![image](/images/{n}.png) to exercise the inline splitters.",
+    "- first item\n- second item with **bold**\n- third item",
+    "1. one\n2. two\n3. three",
+    "> A quoted line\n> and another one",
+    "```\ndef f(x):\n    return x * {n}\n```",
+]
+
+
+def write_sample_markdown(path, size_bytes):
+    """Writes a markdown file of at least size_bytes, one block at a time."""
+    written = 0
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Benchmark document\n\n")
+        while written < size_bytes:
+            block = SAMPLE_BLOCKS[n % len(SAMPLE_BLOCKS)].format(n=n) + "\n\n"
+            f.write(block)
+            written += len(block)
+            n += 1
+    return written
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _streaming_child(path, results):
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as source, open(os.devnull, "w") as out:
+        blocks = render_markdown_stream(source, out)
+    results.put((blocks, time.perf_counter() - start, baseline, _peak_rss_bytes()))
+
+
+def bench_streaming(args):
+    """Streams documents of growing size and reports peak RSS for each."""
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "large.md")
+        print(f"{'size MB':>8} {'blocks':>10} {'seconds':>8} {'MB/s':>7} {'peak RSS MB':>12}")
+        for size_mb in sizes:
+            size = write_sample_markdown(path, size_mb * 1024 * 1024)
+            # Fresh process per size so each peak RSS reading is independent
+            results = multiprocessing.Queue()
+            child = multiprocessing.Process(target=_streaming_child, args=(path, results))
+            child.start()
+            blocks, seconds, baseline, peak = results.get()
+            child.join()
+            print(f"{size_mb:>8} {blocks:>10} {seconds:>8.1f} {size / seconds / 2**20:>7.1f} "
+                  f"{peak / 2**20:>12.1f}")
+            if peak - baseline > args.max_growth_mb * 2**20:
+                print(f"FAIL: peak RSS grew by {(peak - baseline) / 2**20:.1f} MB "
+                      f"(limit {args.max_growth_mb} MB)")
+                return 1
+    return 0
+
+
+def _eager_text_to_textnodes(text):
+    """The list-at-every-stage pipeline, kept as the allocation baseline."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    return split_nodes_delimiter(nodes, "`", TextType.CODE)
+
+
+def _consume(nodes):
+    count = 0
+    for _ in nodes:
+        count += 1
+    return count
+
+
+def _measure(function, text, repeat):
+    tracemalloc.start()
+    count = _consume(function(text))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        _consume(function(text))
+    return count, peak, (time.perf_counter() - start) / repeat
+
+
+def bench_allocations(args):
+    """Peak traced memory of the eager vs. lazily chained inline splitters."""
+    segment = SAMPLE_BLOCKS[1].format(n=1) + " "
+    text = segment * args.segments
+    print(f"Paragraph of {len(text)} chars, consumed node by node")
+    print(f"{'pipeline':>10} {'nodes':>8} {'peak KB':>10} {'ms/run':>8}")
+    results = {}
+    for name, function in (("eager", _eager_text_to_textnodes), ("lazy", iter_text_to_textnodes)):
+        count, peak, seconds = _measure(function, text, args.repeat)
+        results[name] = peak
+        print(f"{name:>10} {count:>8} {peak / 1024:>10.1f} {seconds * 1000:>8.2f}")
+    print(f"Lazy chaining saves {100 * (1 - results['lazy'] / results['eager']):.0f}% of peak allocations.")
+    return 0
+
+
+# Inputs crafted against backtracking/rescanning inline parsers, as a
+# function of a repeat count
+ADVERSARIAL_INPUTS = {
+    "unclosed-image": lambda n: "![" * n,
+    "unclosed-link": lambda n: "[" * n,
+    "no-close-paren": lambda n: "[a](" * n,
+    "nested-brackets": lambda n: "[" * n + "]" * n + "(",
+    "many-matches": lambda n: "![a](b)[c](d) " * n,
+    "delimiter-soup": lambda n: "**`_" * n + "x",
+}
+
+
+def _time_parse(text):
+    start = time.perf_counter()
+    try:
+        text_to_textnodes(text)
+    except ValueError:
+        pass  # unmatched delimiters are a parse error, not a hang
+    return time.perf_counter() - start
+
+
+def bench_adversarial(args):
+    """Asserts inline parsing time grows linearly with adversarial input size."""
+    sizes = [args.base * 2**step for step in range(args.steps)]
+    failures = 0
+    print(f"{'input':>16} " + " ".join(f"{size:>10}" for size in sizes) + f" {'growth':>7}")
+    for name, make in ADVERSARIAL_INPUTS.items():
+        # Best of three to keep scheduler noise out of the ratio
+        timings = [min(_time_parse(make(size)) for _ in range(3)) for size in sizes]
+        # Doubling the input should roughly double the time; allow slack for noise
+        growth = timings[-1] / max(timings[0], 1e-6) / (sizes[-1] / sizes[0])
+        ok = growth <= args.max_growth
+        failures += not ok
+        print(f"{name:>16} " + " ".join(f"{t * 1000:>8.1f}ms" for t in timings)
+              + f" {growth:>6.2f}x" + ("" if ok else "  SUPERLINEAR"))
+    if args.compare_regex:
+        pattern = re.compile(r"!\[(.*?)\]\((.*?)\)")
+        text = ADVERSARIAL_INPUTS["unclosed-image"](args.base)
+        start = time.perf_counter()
+        pattern.findall(text)
+        print(f"\nFor comparison, the old image regex takes {time.perf_counter() - start:.2f}s "
+              f"on {args.base} unclosed '!['.")
+    return 1 if failures else 0
+
+
+# The per-node renderer (f-strings per tag, '+=' per child), with and
+# without escaping; the baseline for the escaping and tags benchmarks
+def _node_leaf_to_html(self, escape=htmlnode.escape_text):
+    value = escape(self.value)
+    if self.tag is None:
+        return value
+    return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
+
+
+def _node_parent_to_html(self):
+    children_html = ""
+    for child in self.children:
+        children_html += child.to_html()
+    return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+
+def _node_props_to_html(self, escape=htmlnode.escape_attribute):
+    if self.props is None:
+        return ""
+    props_string = ""
+    for key, value in self.props.items():
+        props_string += f' {key}="{escape(str(value))}"'
+    return props_string
+
+
+def _raw_leaf_to_html(self):
+    return _node_leaf_to_html(self, _identity)
+
+
+def _raw_props_to_html(self):
+    return _node_props_to_html(self, _identity)
+
+
+def _identity(value):
+    return value
+
+
+@contextlib.contextmanager
+def _renderer(leaf_to_html, parent_to_html, props_to_html):
+    """Temporarily swaps the node classes' rendering methods."""
+    slots = ((htmlnode.LeafNode, "to_html", leaf_to_html), (htmlnode.ParentNode, "to_html", parent_to_html),
+             (htmlnode.HTMLNode, "props_to_html", props_to_html))
+    saved = [cls.__dict__[name] for cls, name, _ in slots]
+    for cls, name, method in slots:
+        setattr(cls, name, method)
+    try:
+        yield
+    finally:
+        for (cls, name, _), method in zip(slots, saved):
+            setattr(cls, name, method)
+
+
+def _time_to_html(node, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        node.to_html()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_escaping(args):
+    """Rendering time of typical pages with and without HTML escaping."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "page.md")
+        write_sample_markdown(path, args.kb * 1024)
+        with open(path, "r", encoding="utf-8") as f:
+            markdown = f.read()
+    if args.special:
+        # Put markup-like characters in every code block, the worst realistic case
+        markdown = markdown.replace("return x *", "return x < y && x *")
+    start = time.perf_counter()
+    node = markdown_to_html_node(markdown)
+    parse = time.perf_counter() - start
+    # Measured on the per-node renderer, where escaping is a separable call;
+    # the current renderer inlines its fast path
+    with _renderer(_node_leaf_to_html, _node_parent_to_html, _node_props_to_html):
+        escaped = _time_to_html(node, args.repeat)
+    with _renderer(_raw_leaf_to_html, _node_parent_to_html, _raw_props_to_html):
+        raw = _time_to_html(node, args.repeat)
+    print(f"{len(markdown) / 1024:.0f} KB page, to_html best of {args.repeat}:")
+    print(f"  unescaped {raw * 1000:8.2f} ms")
+    print(f"  escaped   {escaped * 1000:8.2f} ms  ({100 * (escaped / raw - 1):+.1f}%)")
+    print(f"Parsing the page takes {parse * 1000:.0f} ms, so escaping adds "
+          f"{100 * (escaped - raw) / (parse + raw):.1f}% to the whole render.")
+    return 0
+
+
+# Alternative measured by the tags benchmark: start/end tag fragments
+# formatted once per tag and concatenated, instead of one f-string per node
+_TAG_FRAGMENTS = {}
+
+
+def _fragments(tag):
+    fragments = _TAG_FRAGMENTS.get(tag)
+    if fragments is None:
+        fragments = _TAG_FRAGMENTS[tag] = (f"<{tag}>", f"</{tag}>")
+    return fragments
+
+
+def _fragment_leaf_to_html(self):
+    value = htmlnode.escape_text(self.value)
+    tag = self.tag
+    if tag is None:
+        return value
+    if tag in htmlnode.VOID_TAGS:
+        return f"<{tag}{self.props_to_html()}>"
+    if self.props:
+        return f"<{tag}{self.props_to_html()}>{value}</{tag}>"
+    start, end = _fragments(tag)
+    return start + value + end
+
+
+def _fragment_parent_to_html(self):
+    children_html = ""
+    for child in self.children:
+        children_html += child.to_html()
+    if self.props:
+        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    start, end = _fragments(self.tag)
+    return start + children_html + end
+
+
+TAG_HEAVY_ITEM = ("- **{n}** _item_ with `code`, a [link](/items/{n}.html) "
+                  "and ![icon](/icons/{n}.png) **b** _i_ `c`")
+
+
+def bench_tags(args):
+    """to_html time on tag-heavy pages for the previous, fragment-cache and current renderers."""
+    items = "\n".join(TAG_HEAVY_ITEM.format(n=n) for n in range(args.items))
+    node = markdown_to_html_node("# Tag-heavy page\n\n" + items)
+    html = node.to_html()
+    renderers = {
+        "previous": (_node_leaf_to_html, _node_parent_to_html, _node_props_to_html),
+        "fragment cache": (_fragment_leaf_to_html, _fragment_parent_to_html, htmlnode.HTMLNode.props_to_html),
+        "current": (htmlnode.LeafNode.to_html, htmlnode.ParentNode.to_html, htmlnode.HTMLNode.props_to_html),
+    }
+    best = dict.fromkeys(renderers, float("inf"))
+    # Interleaved rounds, so load changes on the machine hit every renderer alike
+    for _ in range(args.repeat):
+        for name, methods in renderers.items():
+            with _renderer(*methods):
+                best[name] = min(best[name], _time_to_html(node, 1))
+    with _renderer(*renderers["previous"]):
+        previous_html = node.to_html()
+    # The only intended difference is that img is now a void element
+    assert html == re.sub(r"(<img [^>]*>)</img>", r"\1", previous_html), "renderers disagree"
+    print(f"{args.items} list items, {len(html) / 1024:.0f} KB of HTML, to_html best of {args.repeat}:")
+    for name, seconds in best.items():
+        print(f"{name:>16} {seconds * 1000:8.2f} ms  ({100 * (seconds / best['previous'] - 1):+.1f}%)")
+    return 0
+
+
+def _all_stages_text_to_textnodes(text):
+    """iter_text_to_textnodes without the marker prescan: every stage runs."""
+    if not text:
+        return iter(())
+    nodes = iter((TextNode(text, TextType.TEXT),))
+    nodes = iter_split_nodes_image(nodes)
+    nodes = iter_split_nodes_link(nodes)
+    nodes = iter_split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = iter_split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = iter_split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    return iter_split_nodes_delimiter(nodes, "`", TextType.CODE)
+
+
+def _parse_corpus(documents):
+    for markdown in documents:
+        markdown_to_html_node(markdown)
+
+
+def bench_prescan(args):
+    """How often the inline marker prescan skips each stage on a corpus, and what it saves."""
+    documents = []
+    for dirpath, _, filenames in os.walk(args.content):
+        for filename in sorted(filenames):
+            if filename.endswith(".md"):
+                with open(os.path.join(dirpath, filename), "r", encoding="utf-8") as f:
+                    documents.append(f.read())
+    if not documents:
+        print(f"No markdown files under {args.content}")
+        return 1
+    htmlnode.reset_inline_stage_stats()
+    _parse_corpus(documents)
+    stats = htmlnode.inline_stage_stats()
+    texts = stats["texts"]
+    print(f"{len(documents)} documents, {texts} inline texts; stages skipped by the prescan:")
+    for name, skipped in stats["skipped"].items():
+        print(f"{name:>18} {skipped:8} ({100 * skipped / max(texts, 1):5.1f}%)")
+
+    best = {"all stages": float("inf"), "prescan": float("inf")}
+    prescan = htmlnode.iter_text_to_textnodes
+    # Interleaved rounds, so load changes on the machine hit both variants alike
+    for _ in range(args.repeat):
+        for name in best:
+            htmlnode.iter_text_to_textnodes = _all_stages_text_to_textnodes if name == "all stages" else prescan
+            try:
+                start = time.perf_counter()
+                _parse_corpus(documents)
+                best[name] = min(best[name], time.perf_counter() - start)
+            finally:
+                htmlnode.iter_text_to_textnodes = prescan
+    print(f"Parsing the corpus, best of {args.repeat}:")
+    for name, seconds in best.items():
+        print(f"{name:>18} {seconds * 1000:8.2f} ms  ({100 * (seconds / best['all stages'] - 1):+.1f}%)")
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="StaticWeb benchmarks")
+    commands = parser.add_subparsers(dest="benchmark", required=True)
+
+    streaming = commands.add_parser("streaming", help="Peak memory of the block-at-a-time renderer")
+    streaming.add_argument("--sizes", default="50,500",
+                           help="Comma-separated input sizes in MB (default: 50,500)")
+    streaming.add_argument("--max-growth-mb", type=int, default=64,
+                           help="Fail if peak RSS grows by more than this while streaming")
+    streaming.set_defaults(run=bench_streaming)
+
+    allocations = commands.add_parser("allocations", help="Eager vs. lazy inline splitter allocations")
+    allocations.add_argument("--segments", type=int, default=2000,
+                             help="Repetitions of the sample inline segment in the paragraph")
+    allocations.add_argument("--repeat", type=int, default=20, help="Timed runs per pipeline")
+    allocations.set_defaults(run=bench_allocations)
+
+    adversarial = commands.add_parser("adversarial", help="Inline parsing time on crafted inputs")
+    adversarial.add_argument("--base", type=int, default=5000, help="Smallest repeat count")
+    adversarial.add_argument("--steps", type=int, default=4, help="Number of doublings")
+    adversarial.add_argument("--max-growth", type=float, default=2.0,
+                             help="Fail if time grows more than this factor faster than input size")
+    adversarial.add_argument("--compare-regex", action="store_true",
+                             help="Also time the replaced regex on the smallest unclosed-image input")
+    adversarial.set_defaults(run=bench_adversarial)
+
+    escaping = commands.add_parser("escaping", help="Overhead of HTML escaping on a typical page")
+    escaping.add_argument("--kb", type=int, default=512, help="Size of the sample page in KB")
+    escaping.add_argument("--repeat", type=int, default=20, help="Timed renders per variant")
+    escaping.add_argument("--special", action="store_true",
+                          help="Put characters that need escaping in every code block")
+    escaping.set_defaults(run=bench_escaping)
+
+    tags = commands.add_parser("tags", help="Renderer time on tag-heavy pages")
+    tags.add_argument("--items", type=int, default=5000, help="List items on the sample page")
+    tags.add_argument("--repeat", type=int, default=40, help="Timed renders per renderer")
+    tags.set_defaults(run=bench_tags)
+
+    prescan = commands.add_parser("prescan", help="Inline stages skipped by the marker prescan on a corpus")
+    prescan.add_argument("--content", default="content", help="Directory of markdown files (default: content)")
+    prescan.add_argument("--repeat", type=int, default=50, help="Timed parses of the corpus per variant")
+    prescan.set_defaults(run=bench_prescan)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    sys.exit(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE bench.py ---
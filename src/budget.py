@@ -0,0 +1,222 @@
+# --- START OF FILE budget.py ---
+
+import os
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+
+
+class PageBudget:
+    """Per-page limits enforced by BudgetedPool."""
+
+    def __init__(self, seconds=None, memory_mb=None, skip=False):
+        self.seconds = seconds        # wall-time limit per page, or None
+        self.memory_mb = memory_mb    # RSS growth limit per page in MiB, or None
+        self.skip = skip              # skip offending pages instead of failing them
+
+    @property
+    def enforced(self):
+        return self.seconds is not None or self.memory_mb is not None
+
+    def __repr__(self):
+        return f"PageBudget(seconds={self.seconds}, memory_mb={self.memory_mb}, skip={self.skip})"
+
+
+class BudgetViolation:
+    """Why and at what measured cost a task's worker was killed."""
+
+    def __init__(self, reason, seconds, memory_bytes=None):
+        self.reason = reason              # "time", "memory" or "crashed"
+        self.seconds = seconds            # wall time until the kill
+        self.memory_bytes = memory_bytes  # peak RSS growth seen, if measured
+
+    def describe(self):
+        cost = f"{self.seconds:.2f}s"
+        if self.memory_bytes is not None:
+            cost += f", {self.memory_bytes / 2**20:.1f} MiB"
+        if self.reason == "crashed":
+            return f"worker died while rendering ({cost})"
+        return f"over {self.reason} budget, killed after {cost}"
+
+    def to_dict(self, path):
+        return {"path": path, "reason": self.reason, "seconds": round(self.seconds, 3),
+                "memory_bytes": self.memory_bytes}
+
+    def __repr__(self):
+        return f"BudgetViolation({self.reason}, {self.seconds:.2f}s, {self.memory_bytes})"
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes(pid):
+    """Resident set size of a process, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn):
+    """Runs (func, task) messages until told to stop; one task at a time."""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        func, task = message
+        try:
+            conn.send((True, func(task)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.started = None
+        self.baseline = None
+        self.peak = 0
+
+    def assign(self, func, task):
+        self.task = task
+        self.baseline = rss_bytes(self.process.pid)
+        self.peak = 0
+        self.started = time.monotonic()
+        self.conn.send((func, task))
+
+    def growth(self):
+        """Samples RSS growth since the task started, tracking the peak."""
+        if self.baseline is None:
+            return None
+        current = rss_bytes(self.process.pid)
+        if current is not None:
+            self.peak = max(self.peak, current - self.baseline)
+        return self.peak
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        if self.task is not None:
+            # Still rendering a task nobody will collect
+            self.kill()
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+class BudgetedPool:
+    """
+    Worker pool that supervises every task against a PageBudget.
+
+    Each worker is a separate process running one task at a time. The parent
+    polls the busy workers; one that exceeds the wall-time budget, or grows
+    its resident memory past the memory budget while running a task (sampled
+    from /proc, so Linux only), is killed and replaced, and the task yields
+    on_violation(task, BudgetViolation) instead of a result. A worker that
+    dies on its own (e.g. killed by the OS) is reported the same way.
+
+    Offers the subset of multiprocessing.Pool used by the build:
+    imap_unordered, close and join.
+    """
+
+    def __init__(self, jobs, budget, on_violation, poll_interval=0.02):
+        self.budget = budget
+        self.on_violation = on_violation
+        self.poll_interval = poll_interval
+        self.context = multiprocessing.get_context()
+        self.workers = [_Worker(self.context) for _ in range(max(jobs, 1))]
+        if budget.memory_mb is not None and rss_bytes(os.getpid()) is None:
+            print("Warning: memory budgets need /proc; only the time budget is enforced.")
+
+    def _replace(self, worker):
+        worker.kill()
+        replacement = _Worker(self.context)
+        self.workers[self.workers.index(worker)] = replacement
+        return replacement
+
+    def _check(self, worker, now):
+        """Returns a BudgetViolation if worker's current task is over budget."""
+        elapsed = now - worker.started
+        growth = worker.growth()
+        if self.budget.seconds is not None and elapsed > self.budget.seconds:
+            return BudgetViolation("time", elapsed, growth)
+        if (self.budget.memory_mb is not None and growth is not None
+                and growth > self.budget.memory_mb * 2**20):
+            return BudgetViolation("memory", elapsed, growth)
+        return None
+
+    def imap_unordered(self, func, tasks):
+        pending = iter(tasks)
+        exhausted = False
+        idle = list(self.workers)
+        busy = {}  # connection -> worker
+        while True:
+            while idle and not exhausted:
+                try:
+                    task = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                worker = idle.pop()
+                worker.assign(func, task)
+                busy[worker.conn] = worker
+            if not busy:
+                return
+
+            for conn in wait(list(busy), timeout=self.poll_interval):
+                worker = busy.pop(conn)
+                try:
+                    ok, value = conn.recv()
+                except (EOFError, OSError):
+                    violation = BudgetViolation("crashed", time.monotonic() - worker.started, worker.peak or None)
+                    task = worker.task
+                    idle.append(self._replace(worker))
+                    yield self.on_violation(task, violation)
+                    continue
+                worker.growth()
+                worker.task = None
+                idle.append(worker)
+                if not ok:
+                    raise RuntimeError(f"Task failed in budgeted worker: {value}")
+                yield value
+
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                violation = self._check(worker, now)
+                if violation is None:
+                    continue
+                del busy[conn]
+                task = worker.task
+                idle.append(self._replace(worker))
+                yield self.on_violation(task, violation)
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def join(self):
+        pass
+
+    def terminate(self):
+        for worker in self.workers:
+            worker.kill()
+        self.workers = []
+
+# --- END OF FILE budget.py ---
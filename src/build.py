@@ -0,0 +1,519 @@
+# --- START OF FILE build.py ---
+
+import os
+import shutil
+import time
+import contextlib
+import hashlib
+import tempfile
+import multiprocessing
+
+import tracing
+from tracing import span
+
+from budget import BudgetedPool
+from assets import AssetMap, DedupeIndex, asset_map_key, scan_asset_map
+from cache import GENERATOR_VERSION
+from changes import detect_changes, record_build
+from compress import compress_outputs
+from manifest import write_manifest
+from metrics import Histogram, PageMetrics, page_metrics_row, write_prometheus
+from output import MemoryBackend, is_disk
+from schedule import estimate_costs, load_render_times, plan_batches, record_render_times, schedule_stats
+from shard import MANIFEST_FILE as SHARD_MANIFEST_FILE, select_shard, write_shard_manifest
+from htmlnode import (
+    copy_directory_recursive,
+    discover_pages,
+    generate_page,
+    read_template
+)
+
+
+class BuildOptions:
+    """Settings for one site build, shared by main.py and the build daemon."""
+
+    def __init__(self, base_path="/", jobs=1, compress=False, minify=False, fingerprint=False,
+                 dedupe=False, shard=None, cache=None, incremental=False, state_dir=".staticweb",
+                 manifest_path=None, budget=None, schedule=True, trace_path=None,
+                 top_pages=0, page_metrics_path=None, metrics_path=None):
+        self.base_path = base_path
+        self.jobs = jobs
+        self.compress = compress  # write .gz/.br siblings after the build
+        self.minify = minify      # strip insignificant whitespace from pages
+        self.fingerprint = fingerprint  # copy assets to content-hashed names
+        self.dedupe = dedupe      # hardlink static files with identical content
+        self.shard = shard        # (index, count) to render one partition, or None
+        self.cache = cache        # BuildCache shared between builds/builders, or None
+        self.incremental = incremental  # render only content changed since the last build
+        self.state_dir = state_dir      # where incremental build state is kept
+        self.manifest_path = manifest_path  # output manifest + delta for deploys, or None
+        self.budget = budget      # PageBudget enforced in isolated workers, or None
+        self.schedule = schedule  # largest-first, batched submission for parallel builds
+        self.trace_path = trace_path  # Chrome trace-event JSON written by build_site, or None
+        self.trace_dir = None     # per-process trace files while tracing (set by build_site)
+        self.top_pages = top_pages  # how many slowest/largest pages the summary lists
+        self.page_metrics_path = page_metrics_path  # per-page metrics table (.csv/.json), or None
+        self.metrics_path = metrics_path  # Prometheus textfile written after each build, or None
+
+
+def create_pool(options):
+    """
+    Starts a worker pool for parallel page rendering.
+
+    Returns:
+        A BudgetedPool when options.budget sets a limit (even for one job,
+        since limits need an isolated worker to kill), otherwise a
+        multiprocessing.Pool, or None when options.jobs asks for a serial build.
+    """
+    if options.budget is not None and options.budget.enforced:
+        return BudgetedPool(options.jobs, options.budget, _over_budget_result)
+    if options.jobs <= 1:
+        return None
+    return multiprocessing.Pool(options.jobs)
+
+
+def _build_page_task(task):
+    """
+    Worker entry point: renders one page and reports
+    (source, result, error, seconds, captured_bytes, violation).
+
+    With capture set, the page is rendered into memory and its bytes are
+    returned for the parent to write, since archive and in-memory backends
+    cannot be shared with worker processes. markdown is the page source
+    when it came from a packed content source, otherwise None.
+    """
+    from_path, template_path, dest_path, options, asset_map, capture, markdown = task
+    if options.trace_dir is not None:
+        tracing.enable(options.trace_dir)
+    start = time.perf_counter()
+    backend = MemoryBackend() if capture else None
+    try:
+        with span("page", "page", path=from_path):
+            result = generate_page(from_path, template_path, dest_path, options.base_path,
+                                   minify=options.minify, asset_map=asset_map, cache=options.cache,
+                                   backend=backend, markdown_content=markdown)
+    except Exception as e:
+        return from_path, None, str(e), time.perf_counter() - start, None, None
+    finally:
+        # A worker may be killed at any time, so its events go out per page
+        tracing.flush()
+    data = backend.read_bytes(dest_path) if capture else None
+    return from_path, result, None, time.perf_counter() - start, data, None
+
+
+def _over_budget_result(task, violation):
+    """The task result reported for a page whose worker BudgetedPool killed."""
+    from_path = task[0]
+    return from_path, None, violation.describe(), violation.seconds, None, violation
+
+
+def _build_batch_task(batch):
+    """
+    Worker entry point for a scheduled batch of page tasks; reports
+    (worker_pid, start, end, page_results) with wall-clock times.
+    """
+    start = time.time()
+    results = [_build_page_task(task) for task in batch]
+    return os.getpid(), start, time.time(), results
+
+
+def _unbatch(batch_results, spans):
+    """Flattens batch results into page results, collecting task spans."""
+    for pid, start, end, results in batch_results:
+        spans.append((pid, start, end))
+        yield from results
+
+
+def _source_tasks(pages, source, template_path, options, asset_map, capture):
+    """Yields page tasks with markdown read from source in one sequential pass."""
+    dest_by_rel = {source.rel_path(src): dest for src, dest in pages}
+    for rel_path, markdown in source.iter_markdown(list(dest_by_rel)):
+        yield (os.path.join(source.root, rel_path), template_path, dest_by_rel[rel_path],
+               options, asset_map, capture, markdown)
+
+
+def build_pages(pages, template_path, options, pool=None, asset_map=None, backend=None, source=None):
+    """
+    Renders a list of discovered pages, in parallel when a pool is given.
+
+    Args:
+        pages: (markdown_path, html_dest_path) tuples, e.g. from discover_pages.
+        template_path: Path to the HTML template.
+        options: The BuildOptions for this build.
+        pool: An optional multiprocessing.Pool to render pages in.
+        asset_map: Fingerprinted asset mapping from copy_static, if any.
+        backend: OutputBackend receiving the pages; the local disk if omitted.
+        source: ContentSource the pages came from; pages are read by the
+            workers from disk if omitted or a DirectorySource.
+
+    Returns:
+        A summary dict with 'rendered', 'failed', 'errors', 'bytes_written',
+        'bytes_saved', 'cache_hits', 'changed_outputs' (dest paths whose
+        bytes actually changed), 'over_budget' (pages killed for exceeding
+        options.budget, with their measured cost), 'budget_skipped' (how
+        many of those were skipped rather than failed), 'skipped_paths' (the
+        source paths of the skipped ones), 'seconds', 'slowest'
+        and 'largest' (the options.top_pages slowest pages and largest
+        sources, as page_metrics_row dicts), 'bytes_read' (markdown source
+        bytes), 'histograms' (Histogram.to_dict of per-page 'page', 'parse'
+        and 'render' seconds), and for scheduled parallel builds 'schedule'
+        (page and task counts, plus schedule_stats unless pool is a
+        BudgetedPool).
+
+    Every rendered page's metrics row is written to options.page_metrics_path
+    when it is set.
+
+    Parallel builds of on-disk content are scheduled by estimated cost
+    (options.schedule): the render times of the previous build, or source
+    sizes, order pages largest-first, and small pages travel in batches.
+    """
+    start = time.perf_counter()
+    capture = not is_disk(backend)
+    if source is None or source.is_directory:
+        tasks = [(src, template_path, dest, options, asset_map, capture, None) for src, dest in pages]
+    else:
+        tasks = _source_tasks(pages, source, template_path, options, asset_map, capture)
+    scheduled = pool is not None and options.schedule and (source is None or source.is_directory)
+    spans = []
+    if scheduled:
+        task_by_page = dict(zip(pages, tasks))
+        jobs = max(options.jobs, 1)
+        costs = estimate_costs(pages, load_render_times(options.state_dir))
+        if isinstance(pool, BudgetedPool):
+            # Budgets are per page, so keep one page per task and only reorder
+            batches = [[page] for _, page in sorted(zip(costs, pages), key=lambda item: item[0], reverse=True)]
+            results = pool.imap_unordered(_build_page_task, [task_by_page[batch[0]] for batch in batches])
+        else:
+            batches = plan_batches(pages, costs, jobs)
+            batch_tasks = [[task_by_page[page] for page in batch] for batch in batches]
+            results = _unbatch(pool.imap_unordered(_build_batch_task, batch_tasks), spans)
+    elif pool is not None:
+        results = pool.imap_unordered(_build_page_task, tasks)
+    else:
+        results = map(_build_page_task, tasks)
+
+    summary = {"rendered": 0, "failed": 0, "errors": [], "bytes_read": 0, "bytes_written": 0, "bytes_saved": 0,
+               "cache_hits": 0, "changed_outputs": [], "budget_skipped": 0, "skipped_paths": [], "over_budget": []}
+    histograms = {"page": Histogram(), "parse": Histogram(), "render": Histogram()}
+    render_times = {}
+    with PageMetrics(options.top_pages, options.page_metrics_path) as page_metrics:
+        for from_path, result, error, seconds, data, violation in results:
+            if violation is not None:
+                summary["over_budget"].append(violation.to_dict(from_path))
+                if options.budget.skip:
+                    print(f"    SKIPPED '{from_path}': {error}")
+                    summary["budget_skipped"] += 1
+                    summary["skipped_paths"].append(from_path)
+                    continue
+            if error is None and data is not None:
+                try:
+                    with span("write", "page", path=result.dest):
+                        result.changed = backend.write_bytes(result.dest, data)
+                except Exception as e:
+                    error = f"Error writing HTML file to {result.dest}: {e}"
+            if error is None:
+                render_times[from_path] = round(seconds, 6)
+                summary["rendered"] += 1
+                summary["bytes_read"] += result.source_bytes
+                summary["bytes_written"] += result.output_bytes
+                summary["bytes_saved"] += result.bytes_saved
+                summary["cache_hits"] += result.cache_hit
+                if result.changed:
+                    summary["changed_outputs"].append(result.dest)
+                page_metrics.add(page_metrics_row(result, seconds))
+                histograms["page"].observe(seconds)
+                if not result.cache_hit:
+                    histograms["parse"].observe(result.parse_seconds)
+                    histograms["render"].observe(result.render_seconds)
+            else:
+                print(f"    ERROR generating page for '{from_path}': {error}")
+                summary["failed"] += 1
+                summary["errors"].append({"path": from_path, "error": error})
+    summary["slowest"] = page_metrics.slowest()
+    summary["largest"] = page_metrics.largest()
+    summary["histograms"] = {stage: histogram.to_dict() for stage, histogram in histograms.items()}
+    summary["seconds"] = time.perf_counter() - start
+    if scheduled:
+        record_render_times(options.state_dir, render_times)
+        summary["schedule"] = {"pages": len(pages), "batches": len(batches)}
+        # Budgeted pools run bare page tasks, which report no worker spans to measure
+        if not isinstance(pool, BudgetedPool):
+            summary["schedule"].update(schedule_stats(spans, jobs))
+    return summary
+
+
+def output_fingerprint(template_path, options, asset_map=None):
+    """
+    Identifies everything besides the content that affects rendered pages;
+    incremental builds fall back to a full build when it changes.
+    """
+    digest = hashlib.sha256()
+    for part in (GENERATOR_VERSION, read_template(template_path), options.base_path,
+                 str(options.minify), str(asset_map_key(asset_map))):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def _unbuilt_paths(summary):
+    """Source paths of the pages a build_pages summary failed or skipped."""
+    return [error["path"] for error in summary["errors"]] + summary["skipped_paths"]
+
+
+def _remove_deleted_outputs(deleted, docs_dir):
+    for rel_path in deleted:
+        if not rel_path.endswith(".md"):
+            continue
+        html_path = os.path.join(docs_dir, os.path.splitext(rel_path)[0] + ".html")
+        if os.path.exists(html_path):
+            print(f"  Removing output of deleted page: '{html_path}'")
+            os.remove(html_path)
+
+
+def _static_outputs(static_dir, docs_dir, asset_map):
+    """The paths copy_static wrote under docs_dir, fingerprinted names included."""
+    outputs = set()
+    for dir_path, _, file_names in os.walk(static_dir):
+        for name in file_names:
+            url = "/" + os.path.relpath(os.path.join(dir_path, name), static_dir).replace(os.sep, "/")
+            if asset_map is not None:
+                url = asset_map.get(url, url)
+            outputs.add(os.path.normpath(os.path.join(docs_dir, *url[1:].split("/"))))
+    return outputs
+
+
+def _remove_stale_outputs(docs_dir, outputs, keep_compressed=False):
+    """
+    Deletes files under docs_dir that this build did not produce, and the
+    directories they leave empty. Files the build did produce are never
+    touched, so unchanged outputs keep their mtime.
+
+    Args:
+        docs_dir: The output directory.
+        outputs: Normalized paths of every output this build wrote or kept;
+            the shard manifest is kept too.
+        keep_compressed: Also keep the .gz/.br siblings of outputs, for a
+            build that refreshes them afterwards; without compression they
+            would go on serving the old content.
+
+    Returns:
+        The number of files removed.
+    """
+    removed = 0
+    for dir_path, _, file_names in os.walk(docs_dir, topdown=False):
+        for name in file_names:
+            path = os.path.normpath(os.path.join(dir_path, name))
+            base, extension = os.path.splitext(path)
+            if path in outputs or (keep_compressed and extension in (".gz", ".br") and base in outputs):
+                continue
+            if dir_path == docs_dir and name == SHARD_MANIFEST_FILE:
+                continue
+            print(f"  Removing stale output: '{path}'")
+            os.remove(path)
+            removed += 1
+        if dir_path != docs_dir and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+    return removed
+
+
+def copy_static(static_dir, docs_dir, options, backend=None):
+    """
+    Copies static assets into docs_dir, or into backend when one is given.
+
+    Returns:
+        The AssetMap of fingerprinted names when options.fingerprint is set,
+        otherwise None.
+    """
+    print(f"\nCopying static assets from '{static_dir}' to '{docs_dir}'...")
+    if not os.path.exists(static_dir):
+        print(f"Warning: Static directory '{static_dir}' not found. Skipping copy.")
+        return None
+    asset_map = AssetMap() if options.fingerprint else None
+    dedupe_index = DedupeIndex() if options.dedupe else None
+    copy_directory_recursive(static_dir, docs_dir, asset_map, dedupe_index=dedupe_index,
+                             backend=None if is_disk(backend) else backend)
+    print("Static assets copied successfully.")
+    if dedupe_index is not None:
+        print(f"Deduplication: {len(dedupe_index.paths)} unique files, {dedupe_index.linked} "
+              f"hardlinked, {dedupe_index.saved_bytes} bytes saved.")
+    return asset_map
+
+
+def build_site(static_dir, content_dir, template_path, docs_dir, options, pool=None, clean=True,
+               backend=None, source=None):
+    """
+    Runs a full build: copy static assets, render every page, delete stale outputs.
+
+    Args:
+        static_dir: Directory of static assets copied verbatim.
+        content_dir: Directory of markdown content.
+        template_path: Path to the HTML template.
+        docs_dir: Output directory.
+        options: The BuildOptions for this build.
+        pool: An optional warm worker pool; one is created for the build if
+            omitted and options.jobs > 1.
+        clean: Delete files in docs_dir that the build did not produce.
+            Ignored for incremental builds.
+        backend: Optional OutputBackend (e.g. an archive) that receives every
+            output instead of docs_dir; docs_dir then only names the root of
+            the paths and is never created. Incremental builds, compression
+            and the output manifest need the disk backend and are skipped.
+        source: Optional ContentSource (packed archive or SQLite database)
+            to read pages from instead of content_dir.
+
+    Returns:
+        The summary dict from build_pages, with 'stages' (wall seconds of
+        each build stage and the 'total'), 'pages_unchanged' (pages an
+        incremental build skipped), a 'compression' entry when
+        options.compress is set, and 'trace_events' when options.trace_path
+        is set.
+
+    With options.trace_path set, spans for every stage, page step and asset
+    copy, from this process and every worker, are written there as Chrome
+    trace-event JSON (viewable in chrome://tracing or ui.perfetto.dev).
+    With options.metrics_path set, the summary is also exported there for
+    Prometheus (see write_prometheus).
+    """
+    start = time.perf_counter()
+    if options.trace_path:
+        summary = _traced_build_site(static_dir, content_dir, template_path, docs_dir, options, pool, clean,
+                                     backend, source)
+    else:
+        summary = _build_site(static_dir, content_dir, template_path, docs_dir, options, pool, clean,
+                              backend, source)
+    summary["stages"]["total"] = time.perf_counter() - start
+    if options.metrics_path:
+        write_prometheus(summary, options.metrics_path)
+        print(f"Build metrics written to '{options.metrics_path}'.")
+    return summary
+
+
+def _traced_build_site(static_dir, content_dir, template_path, docs_dir, options, pool, clean, backend, source):
+    options.trace_dir = tempfile.mkdtemp(prefix="staticweb-trace-")
+    tracing.enable(options.trace_dir)
+    try:
+        with span("build"):
+            summary = _build_site(static_dir, content_dir, template_path, docs_dir, options, pool, clean,
+                                  backend, source)
+        tracing.flush()
+        summary["trace_events"] = tracing.write_trace(options.trace_dir, options.trace_path, os.getpid())
+        print(f"\nTrace written to '{options.trace_path}': {summary['trace_events']} spans.")
+        return summary
+    finally:
+        tracing.disable()
+        shutil.rmtree(options.trace_dir, ignore_errors=True)
+        options.trace_dir = None
+
+
+@contextlib.contextmanager
+def _stage(stages, name, **args):
+    """Times a build stage into stages[name], and traces it as a span."""
+    start = time.perf_counter()
+    with span(name, **args):
+        yield
+    stages[name] = time.perf_counter() - start
+
+
+def _build_site(static_dir, content_dir, template_path, docs_dir, options, pool, clean, backend, source):
+    stages = {}
+    on_disk = is_disk(backend)
+    incremental = options.incremental and on_disk
+    # A clean build rewrites every output in place and then deletes the rest,
+    # instead of wiping docs_dir, so unchanged files keep their mtime
+    reconcile = on_disk and clean and not incremental
+    if on_disk and not os.path.exists(docs_dir):
+        print(f"Creating destination directory: '{docs_dir}'")
+        os.mkdir(docs_dir)
+
+    # Static assets are identical for every shard, so only the first copies them
+    outputs = set()
+    if options.shard is None or options.shard[0] == 1:
+        with _stage(stages, "static"):
+            asset_map = copy_static(static_dir, docs_dir, options, backend)
+        if reconcile and os.path.exists(static_dir):
+            outputs = _static_outputs(static_dir, docs_dir, asset_map)
+    elif options.fingerprint and os.path.exists(static_dir):
+        asset_map = scan_asset_map(static_dir)
+    else:
+        asset_map = None
+
+    print("\nGenerating content pages...")
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"Template file not found: {template_path}")
+    with _stage(stages, "discover"):
+        if source is not None and not source.is_directory:
+            content_dir = source.root
+            pages = source.pages(docs_dir)
+        else:
+            source = None
+            pages = discover_pages(content_dir, docs_dir)
+    if options.shard is not None:
+        index, count = options.shard
+        pages, all_rel_paths = select_shard(pages, content_dir, index, count)
+        write_shard_manifest(docs_dir, index, count, pages, all_rel_paths, backend)
+        print(f"Shard {index}/{count}: rendering {len(pages)} of {len(all_rel_paths)} pages.")
+
+    unchanged = 0
+    if incremental:
+        fingerprint = output_fingerprint(template_path, options, asset_map)
+        with _stage(stages, "changes"):
+            changes = detect_changes(content_dir, options.state_dir, docs_dir, fingerprint, source)
+        print(f"Change detection ({changes.backend}): "
+              + ("full rebuild" if changes.full else f"{len(changes.changed)} changed, {len(changes.deleted)} deleted"))
+        if not changes.full:
+            total = len(pages)
+            # An unchanged page whose output is gone (docs_dir wiped or edited
+            # by hand) is rebuilt too, and recorded as changed
+            changes.changed.update(os.path.relpath(src, content_dir).replace(os.sep, "/")
+                                   for src, dest in pages if not os.path.exists(dest))
+            pages = [(src, dest) for src, dest in pages
+                     if os.path.relpath(src, content_dir).replace(os.sep, "/") in changes.changed]
+            _remove_deleted_outputs(changes.deleted, docs_dir)
+            unchanged = total - len(pages)
+            print(f"Incremental build: rendering {len(pages)} of {total} pages.")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = create_pool(options)
+    try:
+        with _stage(stages, "pages", pages=len(pages)):
+            summary = build_pages(pages, template_path, options, pool, asset_map, backend, source)
+    finally:
+        if own_pool and pool is not None:
+            pool.close()
+            pool.join()
+    summary["stages"] = stages
+    summary["pages_unchanged"] = unchanged
+
+    if reconcile:
+        # Failed pages lose their old output, as they would in a wiped docs_dir
+        failed = {os.path.normpath(path) for path in _unbuilt_paths(summary)}
+        outputs.update(os.path.normpath(dest) for src, dest in pages if os.path.normpath(src) not in failed)
+        with _stage(stages, "clean"):
+            summary["stale_removed"] = _remove_stale_outputs(docs_dir, outputs, keep_compressed=options.compress)
+
+    if incremental:
+        # Pages skipped over budget are retried by the next build, like failed ones
+        failed = [os.path.relpath(path, content_dir).replace(os.sep, "/") for path in _unbuilt_paths(summary)]
+        record_build(content_dir, options.state_dir, docs_dir, fingerprint, changes, failed, source)
+        summary["changes"] = repr(changes)
+
+    if not on_disk:
+        if options.compress or options.manifest_path:
+            print("\nOutputs went to a non-disk backend; skipping compression and manifest.")
+        return summary
+
+    if options.compress:
+        print("\nPre-compressing text outputs...")
+        with _stage(stages, "compress"):
+            summary["compression"] = compress_outputs(docs_dir, options.state_dir, jobs=max(options.jobs, 1))
+        print(f"Compression: {summary['compression']}")
+
+    if options.manifest_path:
+        with _stage(stages, "manifest"):
+            delta = write_manifest(docs_dir, options.manifest_path)["delta"]
+        summary["delta"] = {kind: len(paths) for kind, paths in delta.items()}
+        print(f"\nManifest written to '{options.manifest_path}': {len(delta['added'])} added, "
+              f"{len(delta['modified'])} modified, {len(delta['removed'])} removed.")
+    return summary
+
+# --- END OF FILE build.py ---
@@ -0,0 +1,95 @@
+# --- START OF FILE cache.py ---
+
+import os
+import mmap
+import hashlib
+import tempfile
+
+from output import _UMASK
+
+
+# Bump whenever a change to the generator alters rendered HTML, so entries
+# written by older builders stop matching.
+GENERATOR_VERSION = "3"
+
+
+def page_cache_key(markdown_content, template_content, base_path, *extra):
+    """
+    Content-addressed key for one rendered page.
+
+    Args:
+        markdown_content: The page's markdown source, as a str or UTF-8 buffer.
+        template_content: The compiled template the page is assembled into.
+        base_path: The base path applied to root-relative links.
+        *extra: Any further settings that change the output (e.g. minify).
+
+    Returns:
+        A hex SHA-256 string.
+    """
+    digest = hashlib.sha256()
+    for part in (GENERATOR_VERSION, base_path, *map(str, extra), template_content, markdown_content):
+        # Buffers (e.g. a memory-mapped markdown source) are hashed as-is
+        encoded = part if isinstance(part, (bytes, bytearray, memoryview, mmap.mmap)) else part.encode("utf-8")
+        # Length-prefix each part so different splits never collide
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """Interface for rendered-page caches shared between builds and builders."""
+
+    def get(self, key):
+        """Returns the cached HTML for key, or None on a miss."""
+        raise NotImplementedError("get method not implemented")
+
+    def put(self, key, html):
+        """Stores html under key."""
+        raise NotImplementedError("put method not implemented")
+
+
+class LocalDirectoryCache(BuildCache):
+    """
+    Cache backend storing one file per key under a directory, which may sit
+    on a mount shared by several machines.
+
+    Entries are written to a temporary file in the destination directory and
+    renamed into place, so concurrent builders never observe partial files;
+    two builders racing on the same key write identical bytes. Entries are
+    stored as raw UTF-8, without newline translation, and an entry that
+    cannot be read or decoded counts as a miss.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key[2:] + ".html")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def put(self, key, html):
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(html.encode("utf-8"))
+            # mkstemp creates 0600 files; other builders sharing the cache need to read them
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def __repr__(self):
+        return f"LocalDirectoryCache(root={self.root})"
+
+# --- END OF FILE cache.py ---
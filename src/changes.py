@@ -0,0 +1,237 @@
+# --- START OF FILE changes.py ---
+
+import os
+import json
+import hashlib
+import subprocess
+
+
+STATE_FILE = "build-state-{key}.json"  # in the build state directory, one per output directory
+
+
+class ChangeSet:
+    """Content files that need rebuilding since the last recorded build."""
+
+    def __init__(self, backend, full=False, changed=None, deleted=None):
+        self.backend = backend              # "git", "stat" or "none"
+        self.full = full                    # True means rebuild everything
+        self.changed = changed or set()     # content-relative paths ('/'-separated)
+        self.deleted = deleted or set()
+
+    def __repr__(self):
+        return f"ChangeSet(backend={self.backend}, full={self.full}, changed={len(self.changed)}, deleted={len(self.deleted)})"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_entry(path, with_hash=True):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size, _sha256(path) if with_hash else None]
+
+
+def state_path(state_dir, output_dir):
+    """The build state file for output_dir, keyed by its absolute path."""
+    key = hashlib.sha256(os.path.abspath(output_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir, STATE_FILE.format(key=key))
+
+
+def load_state(state_dir, output_dir):
+    try:
+        with open(state_path(state_dir, output_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _git(content_dir, *args):
+    """Runs git in content_dir; returns stdout lines, or None if git fails."""
+    try:
+        completed = subprocess.run(["git", *args], cwd=content_dir, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [line for line in completed.stdout.splitlines() if line]
+
+
+def _git_paths(content_dir, command, *args):
+    """
+    Runs a path-listing git command with -z; returns the paths, or None if
+    git fails. NUL-separated output is never quoted, so names with non-ASCII
+    or special characters come back exactly as they are on disk.
+    """
+    try:
+        completed = subprocess.run(["git", command, "-z", *args], cwd=content_dir, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [os.fsdecode(path) for path in completed.stdout.split(b"\0") if path]
+
+
+def git_head(content_dir):
+    """Returns the HEAD commit of the work tree containing content_dir, or None."""
+    inside = _git(content_dir, "rev-parse", "--is-inside-work-tree")
+    if inside != ["true"]:
+        return None
+    head = _git(content_dir, "rev-parse", "HEAD")
+    return head[0] if head else None
+
+
+def _git_changes(content_dir, state):
+    """Asks git what changed since state['commit']; None if git cannot answer."""
+    last_commit = state.get("commit")
+    if not last_commit or git_head(content_dir) is None:
+        return None
+    # Working tree against the last build commit covers new commits, staged
+    # and unstaged edits, and deletions of tracked files in one call
+    tracked = _git_paths(content_dir, "diff", "--name-only", "--relative", "--no-renames", last_commit, "--", ".")
+    # Ignored files are content too: the stat scan would build them
+    untracked = _git_paths(content_dir, "ls-files", "--others")
+    if tracked is None or untracked is None:
+        return None
+
+    files = state.get("files", {})
+    changes = ChangeSet("git")
+    for rel_path in tracked + untracked:
+        path = os.path.join(content_dir, rel_path)
+        if not os.path.exists(path):
+            changes.deleted.add(rel_path)
+            continue
+        # Uncommitted edits and untracked files keep showing up until they are
+        # committed; skip the ones already rendered in their current state
+        entry = files.get(rel_path)
+        if entry is None or entry[:2] != _stat_entry(path, with_hash=False)[:2]:
+            changes.changed.add(rel_path)
+    # git cannot report deleted untracked files, so check the ones it listed last time
+    for rel_path in state.get("untracked", []):
+        if not os.path.exists(os.path.join(content_dir, rel_path)):
+            changes.deleted.add(rel_path)
+    return changes
+
+
+def _stat_changes(content_dir, state):
+    """Finds changes by comparing (mtime, size), then hashes, with the last build."""
+    files = state.get("files", {})
+    changes = ChangeSet("stat")
+    seen = set()
+    for dir_path, _, file_names in os.walk(content_dir):
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, content_dir).replace(os.sep, "/")
+            seen.add(rel_path)
+            entry = files.get(rel_path)
+            if entry is None:
+                changes.changed.add(rel_path)
+                continue
+            current = _stat_entry(path, with_hash=False)
+            # Touched but identical files are not worth a rebuild
+            if current[:2] != entry[:2] and _sha256(path) != entry[2]:
+                changes.changed.add(rel_path)
+    changes.deleted = set(files) - seen
+    return changes
+
+
+def _entry_changes(entries, state):
+    """Finds changes in a non-directory content source by (mtime, size) alone."""
+    files = state.get("files", {})
+    changes = ChangeSet("source")
+    for rel_path, entry in entries.items():
+        recorded = files.get(rel_path)
+        if recorded is None or recorded[:2] != list(entry):
+            changes.changed.add(rel_path)
+    changes.deleted = set(files) - set(entries)
+    return changes
+
+
+def detect_changes(content_dir, state_dir, output_dir, fingerprint, source=None):
+    """
+    Works out which content files changed since the last recorded build.
+
+    Uses git when content_dir is inside a work tree with a recorded build
+    commit, and falls back to a stat/hash scan otherwise.
+
+    Args:
+        content_dir: The content root.
+        state_dir: Directory holding the build state file.
+        output_dir: The output directory being built; each one keeps its
+            own state, since it holds the outputs of its own last build.
+        fingerprint: A string identifying everything besides the content
+            that affects output (template, options); if it differs from the
+            recorded one, a full rebuild is requested.
+        source: Optional non-directory ContentSource (archive or database)
+            to compare by its recorded (mtime, size) entries instead.
+
+    Returns:
+        A ChangeSet.
+    """
+    state = load_state(state_dir, output_dir)
+    if not state or state.get("fingerprint") != fingerprint:
+        return ChangeSet("none", full=True)
+    if source is not None:
+        entries = source.entries()
+        changes = _entry_changes(entries, state)
+        changes.changed.update(path for path in state.get("failed", []) if path in entries)
+        return changes
+    changes = _git_changes(content_dir, state)
+    if changes is None:
+        changes = _stat_changes(content_dir, state)
+    # Pages that failed last time are retried until they succeed
+    changes.changed.update(path for path in state.get("failed", []) if os.path.exists(os.path.join(content_dir, path)))
+    return changes
+
+
+def record_build(content_dir, state_dir, output_dir, fingerprint, changes, failed=(), source=None):
+    """
+    Saves the state that the next detect_changes call compares against.
+
+    Args:
+        content_dir: The content root.
+        state_dir: Directory holding the build state file.
+        output_dir: See detect_changes.
+        fingerprint: See detect_changes.
+        changes: The ChangeSet this build acted on.
+        failed: Content-relative paths of pages that failed to render.
+        source: The non-directory ContentSource passed to detect_changes, if any.
+    """
+    state = load_state(state_dir, output_dir) if not changes.full else {}
+    files = state.get("files", {})
+    if source is not None:
+        entries = source.entries()
+        if changes.full:
+            files = {}
+        for rel_path in (entries if changes.full else changes.changed):
+            if rel_path in entries:
+                files[rel_path] = [*entries[rel_path], None]
+        for rel_path in changes.deleted:
+            files.pop(rel_path, None)
+    elif changes.full:
+        for dir_path, _, file_names in os.walk(content_dir):
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                files[os.path.relpath(path, content_dir).replace(os.sep, "/")] = _stat_entry(path)
+    else:
+        for rel_path in changes.changed:
+            files[rel_path] = _stat_entry(os.path.join(content_dir, rel_path))
+        for rel_path in changes.deleted:
+            files.pop(rel_path, None)
+
+    commit = git_head(content_dir) if source is None else None
+    untracked = _git_paths(content_dir, "ls-files", "--others") if commit else None
+    state = {
+        "fingerprint": fingerprint,
+        "commit": commit,
+        "untracked": untracked or [],
+        "files": files,
+        "failed": sorted(failed),
+    }
+    os.makedirs(state_dir, exist_ok=True)
+    path = state_path(state_dir, output_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# --- END OF FILE changes.py ---
@@ -0,0 +1,48 @@
+# --- START OF FILE client.py ---
+
+# Thin client for the build daemon. Deliberately imports nothing from the
+# generator so that triggering a rebuild costs only interpreter startup
+# plus one socket round trip.
+
+import sys
+import json
+import socket
+
+
+def send_command(socket_path, command, timeout=None):
+    """
+    Sends one command line to a running build daemon and returns its reply.
+
+    Args:
+        socket_path: Path to the daemon's Unix socket.
+        command: The command line, e.g. "build" or "build content/index.md".
+        timeout: Optional socket timeout in seconds.
+
+    Returns:
+        The decoded JSON reply dict.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((command.strip() + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reply_file:
+            line = reply_file.readline()
+    if not line:
+        raise ConnectionError(f"No reply from build daemon at {socket_path}")
+    return json.loads(line)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python3 src/client.py SOCKET (build [PATHS...] | status | stop)")
+        sys.exit(2)
+    reply = send_command(sys.argv[1], " ".join(sys.argv[2:]))
+    print(json.dumps(reply, indent=2))
+    if not reply.get("ok"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE client.py ---
@@ -0,0 +1,151 @@
+# --- START OF FILE compress.py ---
+
+import os
+import gzip
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import span
+from assets import file_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+TEXT_EXTENSIONS = (".html", ".css", ".js", ".json", ".xml", ".svg", ".txt")
+STATE_FILE = "compress-state-{key}.json"  # in the build state directory, one per output directory
+DEFAULT_MIN_SIZE = 1024     # bytes; smaller files are not worth a round trip
+DEFAULT_MAX_RATIO = 0.9     # keep a sibling only if it is at most 90% of the original
+
+
+def _compressors():
+    compressors = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append((".br", lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+
+def _remove_siblings(path, compressors):
+    for suffix, _ in compressors:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _siblings_present(path, outcome, compressors):
+    if outcome != "compressed":
+        return True
+    return os.path.exists(path + compressors[0][0])
+
+
+def compress_state_path(state_dir, output_dir):
+    """The compression state file for output_dir, keyed by its absolute path."""
+    key = hashlib.sha256(os.path.abspath(output_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir, STATE_FILE.format(key=key))
+
+
+def _compress_file(path, compressors, min_size, max_ratio):
+    """Compresses one file; returns (outcome, bytes_saved)."""
+    size = os.path.getsize(path)
+    if size < min_size:
+        _remove_siblings(path, compressors)
+        return "small", 0
+
+    with open(path, "rb") as f:
+        data = f.read()
+    saved = 0
+    kept = False
+    for suffix, compress in compressors:
+        packed = compress(data)
+        if len(packed) > size * max_ratio:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+            continue
+        with open(path + suffix, "wb") as f:
+            f.write(packed)
+        saved = max(saved, size - len(packed))
+        kept = True
+    return ("compressed" if kept else "incompressible"), saved
+
+
+def compress_outputs(output_dir, state_dir, min_size=DEFAULT_MIN_SIZE, max_ratio=DEFAULT_MAX_RATIO, jobs=None):
+    """
+    Writes pre-compressed .gz (and .br, if brotli is installed) siblings for
+    the text files under output_dir.
+
+    Files under min_size bytes, or whose compressed form is not at most
+    max_ratio of the original, get no sibling. A state file in state_dir
+    remembers each file's SHA-256, so outputs whose bytes did not change are
+    not recompressed on the next build, even when they were rewritten or
+    copied with a new mtime. The (mtime_ns, size) recorded alongside only
+    spares hashing files that were not touched at all.
+
+    Args:
+        output_dir: The build output directory.
+        state_dir: Directory holding the build state, outside output_dir so
+            the state file is never deployed.
+        min_size: Minimum file size in bytes worth compressing.
+        max_ratio: Maximum compressed/original size ratio worth keeping.
+        jobs: Number of compression threads (zlib releases the GIL).
+
+    Returns:
+        A summary dict of counts per outcome plus 'bytes_saved'.
+    """
+    compressors = _compressors()
+    state_file = compress_state_path(state_dir, output_dir)
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+
+    state = {}
+    pending = []
+    summary = {"compressed": 0, "small": 0, "incompressible": 0, "unchanged": 0, "bytes_saved": 0}
+    for dir_path, _, file_names in os.walk(output_dir):
+        for name in file_names:
+            if not name.endswith(TEXT_EXTENSIONS):
+                continue
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, output_dir)
+            stat = os.stat(path)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = previous.get(rel_path)
+            # [mtime_ns, size, sha256, outcome]
+            if entry is not None and entry[:2] == stamp:
+                digest = entry[2]
+            else:
+                digest = file_digest(path)
+            if entry is not None and entry[2] == digest and _siblings_present(path, entry[3], compressors):
+                state[rel_path] = stamp + entry[2:]
+                summary["unchanged"] += 1
+            else:
+                pending.append((rel_path, path, stamp + [digest]))
+
+    # Sources that disappeared since the last build leave stale siblings behind
+    pending_paths = {rel_path for rel_path, _, _ in pending}
+    for rel_path in previous:
+        if rel_path not in state and rel_path not in pending_paths:
+            _remove_siblings(os.path.join(output_dir, rel_path), compressors)
+
+    def compress(item):
+        with span("compress", "asset", path=item[1]):
+            return _compress_file(item[1], compressors, min_size, max_ratio)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(compress, pending)
+        for (rel_path, _, entry), (outcome, saved) in zip(pending, results):
+            state[rel_path] = entry + [outcome]
+            summary[outcome] += 1
+            summary["bytes_saved"] += saved
+
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = state_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, sort_keys=True)
+    os.replace(tmp_path, state_file)
+    return summary
+
+# --- END OF FILE compress.py ---
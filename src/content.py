@@ -0,0 +1,237 @@
+# --- START OF FILE content.py ---
+
+import os
+import time
+import sqlite3
+import tarfile
+import zipfile
+
+from htmlnode import discover_pages, normalize_newlines
+
+
+ARCHIVE_EXTENSIONS = (".tar", ".tar.gz", ".tgz", ".zip")
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+class ContentSource:
+    """
+    Where page markdown comes from.
+
+    Pages are named by '/'-separated paths relative to the source. The build
+    refers to them as os.path.join(root, rel_path), so root plays the part
+    content_dir plays for a directory tree (sharding, error messages).
+    """
+
+    is_directory = False
+
+    def __init__(self, root="content"):
+        self.root = root
+
+    def entries(self):
+        """Returns {rel_path: (mtime_ns, size)} for every file in the source."""
+        raise NotImplementedError("entries method not implemented")
+
+    def iter_markdown(self, rel_paths=None):
+        """
+        Yields (rel_path, markdown) for the given pages, or for every page
+        when rel_paths is None, in whatever order the source reads fastest.
+        """
+        raise NotImplementedError("iter_markdown method not implemented")
+
+    def page_paths(self):
+        """Returns the sorted rel_paths of every markdown page."""
+        return sorted(rel_path for rel_path in self.entries() if rel_path.endswith(".md"))
+
+    def pages(self, dest_dir):
+        """Returns sorted (source_path, html_dest_path) tuples, like discover_pages."""
+        return [(os.path.join(self.root, rel_path),
+                 os.path.join(dest_dir, os.path.splitext(rel_path)[0] + ".html"))
+                for rel_path in self.page_paths()]
+
+    def rel_path(self, source_path):
+        return os.path.relpath(source_path, self.root).replace(os.sep, "/")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DirectorySource(ContentSource):
+    """The classic content/ tree, one markdown file per page."""
+
+    is_directory = True
+
+    def entries(self):
+        entries = {}
+        for dir_path, _, file_names in os.walk(self.root):
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                stat = os.stat(path)
+                entries[self.rel_path(path)] = (stat.st_mtime_ns, stat.st_size)
+        return entries
+
+    def pages(self, dest_dir):
+        return discover_pages(self.root, dest_dir)
+
+    def iter_markdown(self, rel_paths=None):
+        if rel_paths is None:
+            rel_paths = self.page_paths()
+        for rel_path in rel_paths:
+            with open(os.path.join(self.root, rel_path), "r", encoding="utf-8") as f:
+                yield rel_path, f.read()
+
+
+def _member_name(name):
+    return name[2:] if name.startswith("./") else name
+
+
+class PackedSource(ContentSource):
+    """
+    Content packed into a single .tar, .tar.gz/.tgz or .zip file.
+
+    Reading pages streams through the archive once in storage order, so a
+    build does one sequential read instead of an open/read/close per page.
+    """
+
+    def __init__(self, archive_path, root="content"):
+        super().__init__(root)
+        if not archive_path.endswith(ARCHIVE_EXTENSIONS):
+            raise ValueError(f"Unsupported content archive: {archive_path} (use .tar, .tar.gz, .tgz or .zip)")
+        if not os.path.isfile(archive_path):
+            raise FileNotFoundError(f"Content archive not found: {archive_path}")
+        self.archive_path = archive_path
+        self.is_zip = archive_path.endswith(".zip")
+        self._entries = None
+
+    def entries(self):
+        if self._entries is None:
+            self._entries = {}
+            if self.is_zip:
+                with zipfile.ZipFile(self.archive_path) as archive:
+                    for info in archive.infolist():
+                        if not info.is_dir():
+                            mtime_ns = int(time.mktime(info.date_time + (0, 0, -1))) * 10**9
+                            self._entries[_member_name(info.filename)] = (mtime_ns, info.file_size)
+            else:
+                with tarfile.open(self.archive_path, "r|*") as archive:
+                    for member in archive:
+                        if member.isfile():
+                            self._entries[_member_name(member.name)] = (int(member.mtime) * 10**9, member.size)
+        return self._entries
+
+    def iter_markdown(self, rel_paths=None):
+        wanted = None if rel_paths is None else set(rel_paths)
+        if self.is_zip:
+            with zipfile.ZipFile(self.archive_path) as archive:
+                infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+                for info in infos:
+                    name = _member_name(info.filename)
+                    if info.is_dir() or not name.endswith(".md") or (wanted is not None and name not in wanted):
+                        continue
+                    yield name, normalize_newlines(archive.read(info).decode("utf-8"))
+            return
+        with tarfile.open(self.archive_path, "r|*") as archive:
+            for member in archive:
+                name = _member_name(member.name)
+                if not member.isfile() or not name.endswith(".md") or (wanted is not None and name not in wanted):
+                    continue
+                yield name, normalize_newlines(archive.extractfile(member).read().decode("utf-8"))
+
+
+class SqliteSource(ContentSource):
+    """
+    Content stored in a SQLite table of (path, markdown, mtime), where mtime
+    is in seconds since the epoch and path is relative to the content root.
+    """
+
+    def __init__(self, db_path, root="content", table="pages"):
+        super().__init__(root)
+        if not os.path.isfile(db_path):
+            raise FileNotFoundError(f"Content database not found: {db_path}")
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.db_path = db_path
+        self.table = table
+        # Pool.imap pulls tasks (and so rows) from a handler thread
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+
+    def entries(self):
+        rows = self.connection.execute(
+            f"SELECT path, mtime, length(CAST(markdown AS BLOB)) FROM {self.table}")
+        return {path: (int(mtime * 10**9), size) for path, mtime, size in rows}
+
+    def iter_markdown(self, rel_paths=None):
+        if rel_paths is None:
+            # One scan in rowid order, which is the order the rows sit on disk
+            rows = self.connection.execute(
+                f"SELECT path, markdown FROM {self.table} WHERE path LIKE '%.md' ORDER BY rowid")
+            for path, markdown in rows:
+                yield path, normalize_newlines(markdown)
+            return
+        rel_paths = list(rel_paths)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(rel_paths), 500):
+            chunk = rel_paths[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for path, markdown in self.connection.execute(
+                    f"SELECT path, markdown FROM {self.table} WHERE path IN ({placeholders})", chunk):
+                yield path, normalize_newlines(markdown)
+
+    def close(self):
+        self.connection.close()
+
+
+def open_content_source(path, root="content"):
+    """
+    Opens the content source at path: a directory tree, a packed archive or
+    a SQLite database, chosen by file type.
+    """
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if path.endswith(SQLITE_EXTENSIONS):
+        return SqliteSource(path, root)
+    if path.endswith(ARCHIVE_EXTENSIONS):
+        return PackedSource(path, root)
+    raise ValueError(f"Unsupported content source: {path} (use a directory, .tar/.tar.gz/.tgz/.zip or .db/.sqlite)")
+
+
+def pack_content(content_dir, out_path, table="pages"):
+    """
+    Packs a content directory into an archive or SQLite database that
+    open_content_source can read.
+
+    Returns:
+        The number of files packed.
+    """
+    source = DirectorySource(content_dir)
+    rel_paths = sorted(source.entries())
+    if out_path.endswith(SQLITE_EXTENSIONS):
+        rel_paths = [rel_path for rel_path in rel_paths if rel_path.endswith(".md")]
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        with sqlite3.connect(out_path) as connection:
+            connection.execute(f"CREATE TABLE {table} (path TEXT PRIMARY KEY, markdown TEXT NOT NULL, mtime REAL NOT NULL)")
+            rows = ((rel_path, markdown, os.stat(os.path.join(content_dir, rel_path)).st_mtime)
+                    for rel_path, markdown in source.iter_markdown(rel_paths))
+            connection.executemany(f"INSERT INTO {table} VALUES (?, ?, ?)", rows)
+        connection.close()
+    elif out_path.endswith(".zip"):
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for rel_path in rel_paths:
+                archive.write(os.path.join(content_dir, rel_path), rel_path)
+    elif out_path.endswith(ARCHIVE_EXTENSIONS):
+        with tarfile.open(out_path, "w:gz" if out_path.endswith(("gz", "tgz")) else "w") as archive:
+            for rel_path in rel_paths:
+                archive.add(os.path.join(content_dir, rel_path), rel_path)
+    else:
+        raise ValueError(f"Unsupported pack format: {out_path}")
+    return len(rel_paths)
+
+# --- END OF FILE content.py ---
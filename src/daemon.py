@@ -0,0 +1,183 @@
+# --- START OF FILE daemon.py ---
+
+import os
+import json
+import time
+import threading
+import socketserver
+
+from htmlnode import discover_pages, read_template
+from build import (build_pages, copy_static, create_pool, _remove_deleted_outputs, _remove_stale_outputs,
+                   _static_outputs)
+from compress import compress_outputs
+from manifest import write_manifest
+from metrics import write_prometheus
+
+
+class BuildDaemon:
+    """
+    Long-lived build server that keeps build state warm between requests.
+
+    Holds the template, the discovery index, a stat cache of every source
+    rendered so far and a warm worker pool, then serves line-based commands
+    over a local Unix socket:
+
+        build            Rebuild pages whose source or template changed, and
+                         delete outputs no longer produced.
+        build <paths>    Force a rebuild of the given markdown files.
+        status           Report index size, build count and the last summary.
+        stop             Shut the daemon down.
+
+    Every reply is a single JSON line.
+    """
+
+    def __init__(self, socket_path, static_dir, content_dir, template_path, docs_dir, options):
+        self.socket_path = socket_path
+        self.static_dir = static_dir
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.docs_dir = docs_dir
+        self.options = options
+
+        self.pool = create_pool(options)
+        self.index = {}         # discovery index: markdown path -> html dest path
+        self.source_stats = {}  # markdown path -> (mtime_ns, size) when last rendered
+        self.template_stamp = None
+        self.asset_map = None   # fingerprinted asset names from the last static copy
+        self.started = time.time()
+        self.builds = 0
+        self.last_summary = None
+        self.server = None
+
+    def refresh_index(self):
+        """Rediscovers content pages and drops the outputs and cache entries of deleted sources."""
+        index = dict(discover_pages(self.content_dir, self.docs_dir))
+        deleted = [os.path.relpath(src, self.content_dir).replace(os.sep, "/") for src in self.index if src not in index]
+        _remove_deleted_outputs(deleted, self.docs_dir)
+        self.index = index
+        for path in list(self.source_stats):
+            if path not in self.index:
+                del self.source_stats[path]
+
+    def _stat(self, path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def build(self, paths=None):
+        """
+        Rebuilds stale pages, or exactly the given paths when provided.
+
+        Returns:
+            The build_pages summary, plus the number of pages skipped as unchanged.
+        """
+        self.refresh_index()
+        read_template(self.template_path)  # keep the daemon's copy warm too
+        template_stamp = self._stat(self.template_path)
+        template_changed = template_stamp != self.template_stamp
+
+        if paths:
+            wanted = {os.path.normpath(path) for path in paths}
+            pages = [(src, dest) for src, dest in self.index.items() if os.path.normpath(src) in wanted]
+            missing = sorted(wanted - {os.path.normpath(src) for src in self.index})
+        else:
+            asset_map = copy_static(self.static_dir, self.docs_dir, self.options)
+            # Renamed assets invalidate every page that might reference them
+            assets_changed = asset_map != self.asset_map
+            self.asset_map = asset_map
+            pages = []
+            for src, dest in self.index.items():
+                if template_changed or assets_changed or self.source_stats.get(src) != self._stat(src):
+                    pages.append((src, dest))
+            missing = []
+
+        stamps = {src: self._stat(src) for src, _ in pages}
+        summary = build_pages(pages, self.template_path, self.options, self.pool, self.asset_map)
+        # Pages skipped over budget stay stale too, so the next build retries them
+        failed = {error["path"] for error in summary["errors"]} | set(summary["skipped_paths"])
+        for src, stamp in stamps.items():
+            if src not in failed:
+                self.source_stats[src] = stamp
+        if not paths:
+            self.template_stamp = template_stamp
+            # Renamed fingerprinted assets and outputs of pages deleted before
+            # the daemon started are only caught by reconciling the whole tree
+            outputs = _static_outputs(self.static_dir, self.docs_dir, self.asset_map)
+            outputs.update(os.path.normpath(dest) for dest in self.index.values())
+            summary["stale_removed"] = _remove_stale_outputs(self.docs_dir, outputs,
+                                                             keep_compressed=self.options.compress)
+        if self.options.compress:
+            summary["compression"] = compress_outputs(self.docs_dir, self.options.state_dir,
+                                                     jobs=max(self.options.jobs, 1))
+        if self.options.manifest_path:
+            summary["delta"] = write_manifest(self.docs_dir, self.options.manifest_path)["delta"]
+
+        summary["skipped"] = len(self.index) - len(pages) if not paths else 0
+        summary["missing"] = missing
+        if self.options.metrics_path:
+            write_prometheus(summary, self.options.metrics_path)
+        self.builds += 1
+        self.last_summary = summary
+        return summary
+
+    def status(self):
+        return {
+            "pages": len(self.index),
+            "cached": len(self.source_stats),
+            "builds": self.builds,
+            "jobs": self.options.jobs,
+            "uptime": time.time() - self.started,
+            "last_build": self.last_summary,
+        }
+
+    def handle_command(self, line):
+        """Executes one command line and returns the JSON-serializable reply."""
+        parts = line.split()
+        if not parts:
+            return {"ok": False, "error": "empty command"}
+        command, args = parts[0], parts[1:]
+        try:
+            if command == "build":
+                return {"ok": True, "result": self.build(args or None)}
+            if command == "status":
+                return {"ok": True, "result": self.status()}
+            if command == "stop":
+                return {"ok": True, "result": "stopping"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": False, "error": f"unknown command: {command}"}
+
+    def serve_forever(self):
+        """Binds the Unix socket and serves commands until 'stop' is received."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline().decode("utf-8").strip()
+                reply = daemon.handle_command(line)
+                self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+                if line == "stop":
+                    # shutdown() waits for serve_forever to return, so it
+                    # must not run on the serving thread itself
+                    threading.Thread(target=daemon.server.shutdown).start()
+
+        self.server = socketserver.UnixStreamServer(self.socket_path, Handler)
+        print(f"Build daemon listening on '{self.socket_path}'")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+# --- END OF FILE daemon.py ---
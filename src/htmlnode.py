@@ -1,8 +1,61 @@
 # --- In htmlnode.py ---
 import re
 import os # Add os import if not already present
-import shutil # Add shutil import if not already present
+import mmap
+import time
+import contextlib
 from textnode import TextNode, TextType, BlockType
+from minify import minify_html, minify_node
+from cache import page_cache_key
+from output import DiskBackend, copy_if_changed
+from assets import asset_map_key, file_digest, fingerprint_name, rewrite_asset_references
+from tracing import span
+from metrics import count_nodes
+
+# Markdown sources at least this large are memory-mapped and decoded one
+# block at a time instead of being read into a single string.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Byte buffers that iter_buffer_blocks and extract_title scan in place
+_BUFFER_TYPES = (bytes, bytearray, mmap.mmap)
+
+# One blank line between blocks, with any of the line endings text-mode
+# open() translates to '\n'
+_BUFFER_BLOCK_BREAK = re.compile(rb"(?:\r\n|\r(?!\n)|\n)(?:\r\n|\r(?!\n)|\n)")
+_BUFFER_LINE = re.compile(rb"[^\r\n]+")
+
+
+def normalize_newlines(text):
+    """Translates '\r\n' and lone '\r' line endings to '\n', as text-mode open() does."""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def escape_text(text):
+    """
+    Escapes '&', '<' and '>' in element text.
+
+    Returns text itself, without copying, when none of them is present,
+    which is the case for most leaves; the 'in' checks are C-level scans.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    """Like escape_text, and also escapes quotes, for attribute values."""
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value and "'" not in value:
+        return value
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("'", "&#x27;"))
+
+
+# Elements that never have content or an end tag
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                       "source", "track", "wbr"))
+
 
 class HTMLNode:
     def __init__(self, tag=None, value=None, children=None, props=None):
@@ -17,12 +70,7 @@ class HTMLNode:
     def props_to_html(self):
         if self.props is None:
             return ""
-        
-        props_string = ""
-        for key, value in self.props.items():
-            props_string += f' {key}="{value}"'
-        
-        return props_string
+        return "".join([f' {key}="{escape_attribute(str(value))}"' for key, value in self.props.items()])
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
@@ -37,13 +85,24 @@ class LeafNode(HTMLNode):
             raise ValueError("LeafNode must have a value")
 
     def to_html(self):
-        # If there's no tag, just return the value as raw text
-        if self.tag is None:
-            return self.value
-            
-        # Otherwise, render as HTML tag with props
-        props_html = self.props_to_html()
-        return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
+        # escape_text's fast path, inlined since this runs for every leaf
+        value = self.value
+        if "&" in value or "<" in value or ">" in value:
+            value = escape_text(value)
+
+        # If there's no tag, just return the value as escaped text
+        tag = self.tag
+        if tag is None:
+            return value
+
+        # Void elements (e.g. img) have no content and no end tag
+        if tag in VOID_TAGS:
+            return f"<{tag}{self.props_to_html()}>"
+
+        # Otherwise, render as HTML tag with props; most leaves have none
+        if not self.props:
+            return f"<{tag}>{value}</{tag}>"
+        return f"<{tag}{self.props_to_html()}>{value}</{tag}>"
     
     
 class ParentNode(HTMLNode):
@@ -74,11 +133,13 @@ class ParentNode(HTMLNode):
             children_html += child.to_html()
             
         # Return the parent tag wrapping the children HTML
-        props_html = self.props_to_html()
-        return f"<{self.tag}{props_html}>{children_html}</{self.tag}>"
+        if not self.props:
+            return f"<{self.tag}>{children_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
     
 
-def copy_directory_recursive(source_path, destination_path):
+def copy_directory_recursive(source_path, destination_path, asset_map=None, url_path="/", dedupe_index=None,
+                             backend=None):
     """
     Recursively copies all files and directories from source_path
     to destination_path.
@@ -86,11 +147,22 @@ def copy_directory_recursive(source_path, destination_path):
     Args:
         source_path (str): The path to the source directory.
         destination_path (str): The path to the destination directory.
+        asset_map (dict, optional): When given, every file is copied to a
+            content-fingerprinted name ('name.<hash>.ext') and the mapping
+            from its root-relative URL to the hashed URL is recorded here.
+        url_path (str): Root-relative URL of destination_path, used for
+            asset_map keys during recursion.
+        dedupe_index (DedupeIndex, optional): When given, files with identical
+            content are stored once and hardlinked everywhere else.
+        backend (OutputBackend, optional): Where copies are written; the
+            local filesystem when omitted.
     """
     # print(f"Copying contents from '{source_path}' to '{destination_path}'") # Optional: Log entering directory
 
     # Ensure the destination directory exists for this level
-    if not os.path.exists(destination_path):
+    if backend is not None:
+        pass # The backend creates whatever structure it needs
+    elif not os.path.exists(destination_path):
         print(f"  Creating destination directory: '{destination_path}'")
         os.mkdir(destination_path)
     elif not os.path.isdir(destination_path):
@@ -107,13 +179,37 @@ def copy_directory_recursive(source_path, destination_path):
         destination_item_path = os.path.join(destination_path, item)
 
         if os.path.isfile(source_item_path):
-            print(f"  Copying file: '{source_item_path}' -> '{destination_item_path}'")
-            shutil.copy(source_item_path, destination_item_path)
+            with span("copy", "asset", path=source_item_path):
+                _copy_asset(source_item_path, destination_path, item, asset_map, url_path, dedupe_index, backend)
         elif os.path.isdir(source_item_path):
             # Recursive call for subdirectory
-            copy_directory_recursive(source_item_path, destination_item_path)
+            copy_directory_recursive(source_item_path, destination_item_path,
+                                     asset_map, url_path + item + "/", dedupe_index, backend)
         # else: Could handle other types like symlinks if needed
-    
+
+
+def _copy_asset(source_item_path, destination_path, item, asset_map, url_path, dedupe_index, backend):
+    """Copies (or fingerprints, or dedupes) one file for copy_directory_recursive."""
+    destination_item_path = os.path.join(destination_path, item)
+    digest = None
+    if asset_map is not None or dedupe_index is not None:
+        digest = file_digest(source_item_path)
+    if asset_map is not None:
+        hashed_item = fingerprint_name(item, digest)
+        destination_item_path = os.path.join(destination_path, hashed_item)
+        asset_map[url_path + item] = url_path + hashed_item
+    if dedupe_index is not None:
+        if dedupe_index.place(source_item_path, destination_item_path, digest, backend):
+            print(f"  Linking duplicate: '{source_item_path}' -> '{destination_item_path}'")
+        else:
+            print(f"  Copying file: '{source_item_path}' -> '{destination_item_path}'")
+    elif backend is not None:
+        print(f"  Copying file: '{source_item_path}' -> '{destination_item_path}'")
+        backend.copy_file(source_item_path, destination_item_path)
+    else:
+        print(f"  Copying file: '{source_item_path}' -> '{destination_item_path}'")
+        copy_if_changed(source_item_path, destination_item_path)
+
 def extract_title(markdown: str) -> str:
     """
     Extracts the text content of the first H1 header (line starting with '# ')
@@ -129,6 +225,9 @@ def extract_title(markdown: str) -> str:
         ValueError: If no H1 header is found or if markdown is empty.
         AttributeError: If markdown input is None.
     """
+    if isinstance(markdown, _BUFFER_TYPES):
+        return _extract_title_from_buffer(markdown)
+
     # Let the AttributeError happen naturally if input is None
     # Then check for empty string if it's not None
     if markdown == "": # Check specifically for empty string
@@ -143,6 +242,162 @@ def extract_title(markdown: str) -> str:
     raise ValueError("No H1 header found in markdown content")
 
 
+def _extract_title_from_buffer(buffer) -> str:
+    """extract_title for a UTF-8 buffer, decoding only the title line."""
+    if len(buffer) == 0:
+        raise ValueError("Cannot extract title from empty markdown")
+    for match in _BUFFER_LINE.finditer(buffer):
+        line = match.group()
+        if line.lstrip().startswith(b"# "):
+            return line.decode("utf-8").strip()[2:].strip()
+    raise ValueError("No H1 header found in markdown content")
+
+
+@contextlib.contextmanager
+def open_markdown_source(path: str, mmap_threshold: int = None):
+    """
+    Opens a markdown source for rendering.
+
+    Files smaller than mmap_threshold (MMAP_THRESHOLD by default) are read
+    into a str as before. Larger files are memory-mapped read-only and
+    yielded as the mmap, which markdown_to_html_node and extract_title scan
+    block by block, so the whole document never exists as one Python string.
+    The mapping is closed when the with block exits.
+    """
+    if mmap_threshold is None:
+        mmap_threshold = MMAP_THRESHOLD
+    size = os.path.getsize(path)
+    if size < mmap_threshold or size == 0:
+        # Text mode translates CRLF and CR line endings, like the mmap path
+        with open(path, "r", encoding="utf-8") as md_file:
+            yield md_file.read()
+        return
+    with open(path, "rb") as md_file:
+        with mmap.mmap(md_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def discover_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    """
+    Builds the discovery index for a content tree without rendering anything.
+
+    Mirrors the path mapping used by generate_pages_recursive, so every
+    'name.md' under dir_path_content maps to 'name.html' under dest_dir_path.
+
+    Args:
+        dir_path_content: The content source directory.
+        dest_dir_path: The destination directory for generated pages.
+
+    Returns:
+        A sorted list of (markdown_path, html_dest_path) tuples.
+
+    Raises:
+        FileNotFoundError: If the content directory does not exist.
+    """
+    if not os.path.exists(dir_path_content):
+        raise FileNotFoundError(f"Content source directory not found: {dir_path_content}")
+
+    pages = []
+    pending = [(dir_path_content, dest_dir_path)]
+    while pending:
+        source_dir, dest_dir = pending.pop()
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".md"):
+                    base_name, _ = os.path.splitext(entry.name)
+                    pages.append((entry.path, os.path.join(dest_dir, base_name + ".html")))
+                elif entry.is_dir():
+                    pending.append((entry.path, os.path.join(dest_dir, entry.name)))
+    pages.sort()
+    return pages
+
+
+# Template contents keyed by path, revalidated against (mtime_ns, size) so a
+# long-lived process (pool worker or build daemon) reads each template once.
+_template_cache = {}
+
+def read_template(template_path: str) -> str:
+    """
+    Returns the contents of a template file, cached until the file changes.
+
+    Raises:
+        FileNotFoundError: If the template file does not exist.
+        RuntimeError: If the template cannot be read.
+    """
+    try:
+        stat = os.stat(template_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template file not found: {template_path}")
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(template_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    try:
+        with open(template_path, 'r', encoding='utf-8') as tmpl_file:
+            template_content = tmpl_file.read()
+    except Exception as e:
+        raise RuntimeError(f"Error reading template file {template_path}: {e}")
+    _template_cache[template_path] = (stamp, template_content)
+    return template_content
+
+
+# Compiled templates keyed by (path, minify, asset map key); each entry remembers the stamp
+# of the template it was compiled from.
+_compiled_template_cache = {}
+
+def compile_template(template_path: str, minify: bool = False, asset_map: dict = None) -> tuple[str, int]:
+    """
+    Returns the template prepared for page assembly, compiled once per change.
+
+    Args:
+        template_path: Path to the HTML template.
+        minify: Strip insignificant whitespace from the template.
+        asset_map: Optional fingerprinted asset mapping applied to the
+            template's href/src attributes.
+
+    Returns:
+        A (template_content, bytes_saved) tuple, where bytes_saved is what
+        minification removed from the template.
+    """
+    template_content = read_template(template_path)
+    stamp = _template_cache[template_path][0]
+    key = (template_path, minify, asset_map_key(asset_map))
+    cached = _compiled_template_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    template_content = rewrite_asset_references(template_content, asset_map)
+    saved = 0
+    if minify:
+        minified = minify_html(template_content)
+        saved = len(template_content.encode('utf-8')) - len(minified.encode('utf-8'))
+        template_content = minified
+    _compiled_template_cache[key] = (stamp, (template_content, saved))
+    return template_content, saved
+
+
+class PageResult:
+    """What generate_page produced for a single page."""
+
+    def __init__(self, source, dest, output_bytes=0, bytes_saved=0, cache_hit=False, changed=True):
+        self.source = source
+        self.dest = dest
+        self.output_bytes = output_bytes  # size of the written HTML
+        self.bytes_saved = bytes_saved    # bytes removed by minification
+        self.cache_hit = cache_hit        # served from the build cache without rendering
+        self.changed = changed            # False if dest already held these exact bytes
+        self.source_bytes = 0             # size of the markdown source
+        self.blocks = 0                   # markdown blocks parsed (0 on a cache hit)
+        self.nodes = 0                    # HTML nodes built (0 on a cache hit)
+        self.parse_seconds = 0.0          # markdown to HTML node tree
+        self.render_seconds = 0.0         # node tree to HTML, including minification
+
+    def __repr__(self):
+        return f"PageResult(source={self.source}, dest={self.dest}, output_bytes={self.output_bytes}, bytes_saved={self.bytes_saved}, cache_hit={self.cache_hit}, changed={self.changed})"
+
+
 def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, base_path: str = "/"): # Add base_path parameter with default
     """
     Recursively generates HTML pages from markdown files in a source directory.
@@ -183,75 +438,232 @@ def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir
                 base_path # Pass base_path along
             )
 
-def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/"): # Add base_path parameter with default
+def render_page(markdown_content: str, template_content: str, base_path: str = "/", minify: bool = False,
+                asset_map: dict = None, source_name: str = "<markdown>", stats: dict = None) -> tuple[str, int]:
     """
-    Generates an HTML page from a markdown file using a template.
-    # ... (rest of docstring) ...
+    Renders markdown into a compiled template.
+
     Args:
-        # ... (existing args) ...
+        markdown_content: The page's markdown source.
+        template_content: The compiled template (see compile_template).
         base_path: The base path string to prepend to root-relative links/sources.
-    """
-    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template_path}' (Base Path: {base_path})") # Added base_path to log
+        minify: Collapse insignificant whitespace in the generated content.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
+        source_name: Name of the source used in error messages.
+        stats: Optional dict receiving the page's 'blocks', 'nodes',
+            'parse_seconds' and 'render_seconds'.
 
-    # 1. Read markdown file
-    # ... (no change) ...
+    Returns:
+        A (final_html, bytes_saved) tuple, where bytes_saved is what
+        minification removed from the content.
+    """
+    # Convert markdown to HTML
+    bytes_saved = 0
     try:
-        with open(from_path, 'r', encoding='utf-8') as md_file:
-            markdown_content = md_file.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Markdown file not found: {from_path}")
+        parse_start = time.perf_counter()
+        with span("parse", "page"):
+            html_node = markdown_to_html_node(markdown_content, asset_map)
+        render_start = time.perf_counter()
+        with span("render", "page"):
+            if minify:
+                bytes_saved = minify_node(html_node)
+            html_content = html_node.to_html()
+        if stats is not None:
+            stats["parse_seconds"] = render_start - parse_start
+            stats["render_seconds"] = time.perf_counter() - render_start
+            stats["blocks"] = len(html_node.children)
+            stats["nodes"] = count_nodes(html_node)
     except Exception as e:
-        raise RuntimeError(f"Error reading markdown file {from_path}: {e}")
+        raise RuntimeError(f"Error converting markdown to HTML from {source_name}: {e}")
 
-    # 2. Read template file
-    # ... (no change) ...
+    # Extract title
     try:
-        with open(template_path, 'r', encoding='utf-8') as tmpl_file:
-            template_content = tmpl_file.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Template file not found: {template_path}")
-    except Exception as e:
-        raise RuntimeError(f"Error reading template file {template_path}: {e}")
+        title = extract_title(markdown_content)
+    except ValueError as e:
+        raise ValueError(f"Could not extract title from {source_name}: {e}")
 
-    # 3. Convert markdown to HTML
-    # ... (no change) ...
-    try:
-        html_node = markdown_to_html_node(markdown_content)
-        html_content = html_node.to_html()
-    except Exception as e:
-        raise RuntimeError(f"Error converting markdown to HTML from {from_path}: {e}")
+    # Replace placeholders
+    with span("template", "page"):
+        final_html = template_content.replace("{{ Title }}", escape_text(title))
+        final_html = final_html.replace("{{ Content }}", html_content)
 
-    # 4. Extract title
-    # ... (no change) ...
+        # --- ADD BASE PATH REPLACEMENT ---
+        print(f"  Applying base path '{base_path}' to links and sources...")
+        final_html = final_html.replace('href="/', f'href="{base_path}')
+        final_html = final_html.replace('src="/', f'src="{base_path}')
+        # --- / ADD BASE PATH REPLACEMENT ---
+    return final_html, bytes_saved
+
+
+def iter_rendered_page(markdown_content, template_content: str, base_path: str = "/", minify: bool = False,
+                       asset_map: dict = None, source_name: str = "<markdown>", stats: dict = None):
+    """
+    Streaming render_page: yields the page as str chunks, one per block
+    between the template halves, so a huge page is never held whole.
+
+    The output is identical to render_page's. The template must contain
+    exactly one '{{ Content }}' placeholder.
+
+    Args:
+        stats: Optional dict; its 'bytes_saved' entry is increased by what
+            minification removed, and 'blocks', 'nodes', 'parse_seconds'
+            and 'render_seconds' are filled in as in render_page.
+    """
     try:
         title = extract_title(markdown_content)
     except ValueError as e:
-        raise ValueError(f"Could not extract title from {from_path}: {e}")
+        raise ValueError(f"Could not extract title from {source_name}: {e}")
+    head, tail = template_content.replace("{{ Title }}", escape_text(title)).split("{{ Content }}")
 
-    # 5. Replace placeholders
-    # ... (warning checks no change) ...
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    def apply_base_path(html):
+        html = html.replace('href="/', f'href="{base_path}')
+        return html.replace('src="/', f'src="{base_path}')
 
-    # --- ADD BASE PATH REPLACEMENT ---
     print(f"  Applying base path '{base_path}' to links and sources...")
-    final_html = final_html.replace('href="/', f'href="{base_path}')
-    final_html = final_html.replace('src="/', f'src="{base_path}')
-    # --- / ADD BASE PATH REPLACEMENT ---
+    yield apply_base_path(head)
+    yield "<div>"
+    if stats is None:
+        stats = {}
+    for key in ("blocks", "nodes", "parse_seconds", "render_seconds"):
+        stats.setdefault(key, 0)
+    stats["nodes"] += 1  # the wrapping <div>
+    try:
+        nodes = iter_block_nodes(markdown_content, asset_map)
+        while True:
+            parse_start = time.perf_counter()
+            node = next(nodes, None)
+            render_start = time.perf_counter()
+            stats["parse_seconds"] += render_start - parse_start
+            if node is None:
+                break
+            stats["blocks"] += 1
+            stats["nodes"] += count_nodes(node)
+            if minify:
+                stats["bytes_saved"] = stats.get("bytes_saved", 0) + minify_node(node)
+            # Each block's markup is self-contained, so rewriting per block
+            # matches rewriting the whole page
+            html = apply_base_path(node.to_html())
+            stats["render_seconds"] += time.perf_counter() - render_start
+            yield html
+    except Exception as e:
+        raise RuntimeError(f"Error converting markdown to HTML from {source_name}: {e}")
+    yield "</div>"
+    yield apply_base_path(tail)
 
 
-    # 6. Write the new HTML to dest_path
+def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str = "/", minify: bool = False,
+                  asset_map: dict = None, cache=None, backend=None,
+                  markdown_content: str = None) -> PageResult: # Add base_path parameter with default
+    """
+    Generates an HTML page from a markdown file using a template.
+    # ... (rest of docstring) ...
+    Args:
+        # ... (existing args) ...
+        base_path: The base path string to prepend to root-relative links/sources.
+        minify: Collapse insignificant whitespace in the template and content.
+        asset_map: Optional fingerprinted asset mapping (see copy_directory_recursive).
+        cache: Optional BuildCache consulted before rendering and filled after.
+        backend: Optional OutputBackend receiving the page; defaults to disk.
+        markdown_content: The page's markdown when it was already read from a
+            packed content source; from_path is then only used as its name.
+            Otherwise from_path is read, memory-mapped when it is at least
+            MMAP_THRESHOLD bytes (see open_markdown_source). Mapped pages
+            rendered without a cache are streamed block by block into the
+            backend (see iter_rendered_page).
+
+    Returns:
+        A PageResult describing the written page.
+    """
+    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template_path}' (Base Path: {base_path})") # Added base_path to log
+
+    # 1. Read markdown file
     # ... (no change) ...
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        if markdown_content is None:
+            try:
+                with span("read", "page"):
+                    markdown_content = stack.enter_context(open_markdown_source(from_path))
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Markdown file not found: {from_path}")
+            except Exception as e:
+                raise RuntimeError(f"Error reading markdown file {from_path}: {e}")
+        if isinstance(markdown_content, _BUFFER_TYPES):
+            source_bytes = len(markdown_content)
+        else:
+            source_bytes = len(markdown_content.encode('utf-8'))
+
+        # 2. Read template file (compiled once, cached across pages)
+        template_content, bytes_saved = compile_template(template_path, minify, asset_map)
+
+        # Mapped (large) sources without a build cache stream straight to the backend
+        if (isinstance(markdown_content, _BUFFER_TYPES) and cache is None
+                and template_content.count("{{ Content }}") == 1):
+            if backend is None:
+                backend = DiskBackend()
+            stats = {}
+            chunks = iter_rendered_page(markdown_content, template_content, base_path, minify,
+                                        asset_map, from_path, stats)
+            try:
+                # Parsing, rendering and writing interleave block by block
+                with span("stream", "page"):
+                    changed, output_bytes = backend.write_chunks(dest_path, (chunk.encode('utf-8') for chunk in chunks))
+            except (ValueError, RuntimeError):
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Error writing HTML file to {dest_path}: {e}")
+            if not changed:
+                print(f"  Unchanged, not rewriting: '{dest_path}'")
+            bytes_saved += stats.get("bytes_saved", 0)
+            result = PageResult(from_path, dest_path, output_bytes, bytes_saved, False, changed)
+            _set_page_stats(result, source_bytes, stats)
+            return result
+
+        # 3. Fetch the rendered page from the build cache, or render and publish it
+        final_html = None
+        if cache is not None:
+            cache_key = page_cache_key(markdown_content, template_content, base_path,
+                                       minify, asset_map_key(asset_map))
+            final_html = cache.get(cache_key)
+        cache_hit = final_html is not None
+        stats = {}
+        if cache_hit:
+            print(f"  Build cache hit for '{from_path}'")
+        else:
+            final_html, content_saved = render_page(markdown_content, template_content, base_path,
+                                                    minify, asset_map, from_path, stats)
+            bytes_saved += content_saved
+            if cache is not None:
+                cache.put(cache_key, final_html)
+
+    # 4. Write the new HTML to dest_path, only if its bytes changed
+    if backend is None:
+        backend = DiskBackend()
+    data = final_html.encode('utf-8')
     try:
-        with open(dest_path, 'w', encoding='utf-8') as out_file:
-            out_file.write(final_html)
+        with span("write", "page", path=dest_path):
+            changed = backend.write_bytes(dest_path, data)
     except Exception as e:
         raise RuntimeError(f"Error writing HTML file to {dest_path}: {e}")
-
-def text_node_to_html_node(text_node):
+    if not changed:
+        print(f"  Unchanged, not rewriting: '{dest_path}'")
+
+    output_bytes = len(data)
+    if minify and not cache_hit:
+        print(f"  Minified '{dest_path}': saved {bytes_saved} bytes ({output_bytes} written)")
+    result = PageResult(from_path, dest_path, output_bytes, bytes_saved if not cache_hit else 0, cache_hit, changed)
+    _set_page_stats(result, source_bytes, stats)
+    return result
+
+
+def _set_page_stats(result, source_bytes, stats):
+    """Copies render_page/iter_rendered_page stats onto a PageResult."""
+    result.source_bytes = source_bytes
+    result.blocks = stats.get("blocks", 0)
+    result.nodes = stats.get("nodes", 0)
+    result.parse_seconds = stats.get("parse_seconds", 0.0)
+    result.render_seconds = stats.get("render_seconds", 0.0)
+
+def text_node_to_html_node(text_node, asset_map=None):
         if text_node.text_type == TextType.TEXT:
             return LeafNode(None, text_node.text)
         elif text_node.text_type == TextType.BOLD:
@@ -263,35 +675,36 @@ def text_node_to_html_node(text_node):
         elif text_node.text_type == TextType.LINK:
             if text_node.url is None:
                 raise ValueError("URL cannot be None for LINK type TextNode")
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            url = asset_map.get(text_node.url, text_node.url) if asset_map else text_node.url
+            return LeafNode("a", text_node.text, {"href": url})
         elif text_node.text_type == TextType.IMAGE:
             if text_node.url is None:
                 raise ValueError("URL cannot be None for IMAGE type TextNode")
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            url = asset_map.get(text_node.url, text_node.url) if asset_map else text_node.url
+            return LeafNode("img", "", {"src": url, "alt": text_node.text})
         else:
             raise ValueError(f"Invalid TextType: {text_node.text_type}")
     
 
-def split_nodes_delimiter(old_nodes, delimiter, text_type):
+def iter_split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
     Splits TextNodes of type TEXT based on a given delimiter.
 
     Args:
-        old_nodes (list[TextNode]): The list of nodes to process.
+        old_nodes (iterable[TextNode]): The nodes to process.
         delimiter (str): The delimiter string (e.g., "`", "**", "_").
         text_type (TextType): The TextType to apply to text between delimiters.
 
-    Returns:
-        list[TextNode]: A new list of nodes with TEXT nodes potentially split.
+    Yields:
+        TextNode: The nodes, with TEXT nodes potentially split.
 
     Raises:
         ValueError: If an unmatched closing delimiter is found.
     """
-    new_nodes = []
     for old_node in old_nodes:
         # Only process TEXT nodes
         if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+            yield old_node
             continue
 
         # Skip processing if the text node is empty
@@ -306,7 +719,7 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         # If only one part, the delimiter wasn't found
         if len(sections) == 1:
             # Append the original node since no splitting occurred
-            new_nodes.append(old_node)
+            yield old_node
             continue
 
         # Validate that delimiters are paired (must be an odd number of parts)
@@ -323,19 +736,79 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
             if is_inside_delimiters:
                 # print(f"    -> Creating Node: TextNode('{section}', {text_type})") # DEBUG
-                new_nodes.append(TextNode(section, text_type))
+                yield TextNode(section, text_type)
             else:
                 is_empty_from_adjacent_delimiters = (section == "" and i > 0 and i < len(sections) - 1)
                 if is_empty_from_adjacent_delimiters:
                     #print(f"    -> Creating Node (adjacent empty): TextNode('', {text_type})") # DEBUG
-                     new_nodes.append(TextNode("", text_type))
+                     yield TextNode("", text_type)
                 elif section:
                     #print(f"    -> Creating Node: TextNode('{section}', {TextType.TEXT})") # DEBUG
-                    new_nodes.append(TextNode(section, TextType.TEXT))
+                    yield TextNode(section, TextType.TEXT)
                 #else:
                     #print(f"    -> Skipping empty section at i={i}") # DEBUG
 
-    return new_nodes
+def split_nodes_delimiter(old_nodes, delimiter, text_type):
+    """
+    Splits TextNodes of type TEXT based on a given delimiter.
+
+    List-returning wrapper around iter_split_nodes_delimiter.
+    """
+    return list(iter_split_nodes_delimiter(old_nodes, delimiter, text_type))
+
+def iter_inline_links(text, image):
+    """
+    Scans text for inline images ![alt](url) or links [text](url) in one
+    left-to-right pass.
+
+    Matches exactly what the patterns r"!\[(.*?)\]\((.*?)\)" (images) and
+    r"(?<!\!)\[(.*?)\]\((.*?)\)" (links) match with re.finditer: the label
+    runs to the first '](' after the opening bracket and the URL to the
+    first ')' after that, neither crossing a newline.
+
+    Runs in O(n): each line end is searched for once, every other
+    str.find starts after the previous match, and a failed candidate skips
+    the rest of its line.
+    A candidate fails only when its line has no '](' after it or no ')'
+    after that '](', and both conditions hold for every later candidate on
+    the same line too, so no candidate is scanned twice. The regex
+    versions retry each opening bracket to the end of the line, which is
+    quadratic on inputs such as thousands of unclosed '!['.
+
+    Args:
+        text (str): The raw markdown text.
+        image (bool): True for images, False for (non-image) links.
+
+    Yields:
+        tuple[int, int, str, str]: (start, end, label, url) for each match,
+            where text[start:end] is the full markdown construct.
+    """
+    opener = "![" if image else "["
+    length = len(text)
+    pos = 0
+    line_end = -1
+    while True:
+        start = text.find(opener, pos)
+        if start == -1:
+            return
+        if not image and start > 0 and text[start - 1] == "!":
+            pos = start + 1  # an image, not a link
+            continue
+        if start > line_end:
+            # Found once per line, not once per candidate
+            line_end = text.find("\n", start)
+            if line_end == -1:
+                line_end = length
+        label_start = start + len(opener)
+        label_end = text.find("](", label_start, line_end)
+        url_end = -1 if label_end == -1 else text.find(")", label_end + 2, line_end)
+        if url_end == -1:
+            # Every later candidate on this line fails the same way
+            pos = line_end + 1
+            continue
+        yield start, url_end + 1, text[label_start:label_end], text[label_end + 2:url_end]
+        pos = url_end + 1
+
 
 def extract_markdown_images(text):
     """
@@ -349,16 +822,7 @@ def extract_markdown_images(text):
                                 the alt text and the URL of an image.
                                 e.g., [("alt text", "url"), ...]
     """
-    # Pattern: ![alt text](url)
-    # - \!\[ : Matches the literal '!['
-    # - (.*?) : Captures the alt text (non-greedy)
-    # - \] : Matches the literal ']'
-    # - \( : Matches the literal '('
-    # - (.*?) : Captures the URL (non-greedy)
-    # - \) : Matches the literal ')'
-    pattern = r"!\[(.*?)\]\((.*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return [(alt, url) for _, _, alt, url in iter_inline_links(text, image=True)]
 
 def extract_markdown_links(text):
     """
@@ -372,36 +836,22 @@ def extract_markdown_links(text):
                                 the anchor text and the URL of a link.
                                 e.g., [("anchor text", "url"), ...]
     """
-    # Pattern: [anchor text](url) but NOT preceded by !
-    # - (?<!\!) : Negative lookbehind - asserts that '!' does not precede
-    # - \[ : Matches the literal '['
-    # - (.*?) : Captures the anchor text (non-greedy)
-    # - \] : Matches the literal ']'
-    # - \( : Matches the literal '('
-    # - (.*?) : Captures the URL (non-greedy)
-    # - \) : Matches the literal ')'
-    # Note: We need to find non-image links. The lookbehind (?<!\!) ensures
-    # that we only match patterns like '[text](url)' that are NOT immediately
-    # preceded by a '!'.
-    pattern = r"(?<!\!)\[(.*?)\]\((.*?)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return [(anchor, url) for _, _, anchor, url in iter_inline_links(text, image=False)]
 
-def split_nodes_image(old_nodes):
+def iter_split_nodes_image(old_nodes):
     """
     Splits TEXT nodes based on Markdown image syntax ![alt](url).
 
     Args:
-        old_nodes (list[TextNode]): A list of nodes to process.
+        old_nodes (iterable[TextNode]): The nodes to process.
 
-    Returns:
-        list[TextNode]: A new list with TEXT nodes split by images.
+    Yields:
+        TextNode: The nodes, with TEXT nodes split by images.
     """
-    new_nodes = []
     for old_node in old_nodes:
         # Skip non-TEXT nodes
         if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+            yield old_node
             continue
 
         original_text = old_node.text
@@ -409,70 +859,43 @@ def split_nodes_image(old_nodes):
         if not original_text:
             continue
 
-        # Extract all images from the node's text
-        images = extract_markdown_images(original_text)
-
-        # If no images, add the original node (if it has text) and continue
-        if not images:
-            new_nodes.append(old_node)
-            continue
-
-        # Start with the full text as the part to process
-        remaining_text = original_text
-        for img_alt, img_url in images:
-            # Construct the full Markdown string for the current image
-            md_image = f"![{img_alt}]({img_url})"
-
-            # Split the *remaining* text segment at the first occurrence of this image
-            parts = remaining_text.split(md_image, 1)
-
-            # If split didn't work (e.g., text somehow changed), skip adding parts for safety
-            # but this shouldn't happen if extract_markdown_images worked correctly.
-            if len(parts) < 2:
-                 # If the remaining text *is* the image, parts will be ['', '']
-                 if remaining_text != md_image:
-                     # Log or raise error? For now, just break processing this node if inconsistent
-                     print(f"Warning: Could not split text '{remaining_text}' on image '{md_image}'")
-                     # Add whatever was left as plain text? Or just stop?
-                     # Let's add the problematic remaining text as-is and stop for this node.
-                     if remaining_text:
-                        new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-                     remaining_text = "" # Prevent adding it again later
-                     break # Stop processing images for this node
-
-            # Get the text before the image
-            text_before = parts[0]
-            if text_before: # Don't add empty strings
-                new_nodes.append(TextNode(text_before, TextType.TEXT))
-
-            # Add the image node itself
-            new_nodes.append(TextNode(img_alt, TextType.IMAGE, img_url))
-
-            # Update remaining_text to the part *after* this image for the next iteration
-            remaining_text = parts[1]
+        # Slice around each match span; the text is scanned once
+        pos = 0
+        for match_start, match_end, img_alt, url in iter_inline_links(original_text, image=True):
+            if match_start > pos: # Don't add empty strings
+                yield TextNode(original_text[pos:match_start], TextType.TEXT)
+            yield TextNode(img_alt, TextType.IMAGE, url)
+            pos = match_end
+
+        if pos == 0:
+            # No matches: keep the original node
+            yield old_node
+        elif pos < len(original_text):
+            # After the loop, if there's any text left over, add it as a text node
+            yield TextNode(original_text[pos:], TextType.TEXT)
 
-        # After the loop, if there's any text left over, add it as a text node
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-
-    return new_nodes
+def split_nodes_image(old_nodes):
+    """
+    Splits TEXT nodes based on Markdown image syntax ![alt](url).
 
+    List-returning wrapper around iter_split_nodes_image.
+    """
+    return list(iter_split_nodes_image(old_nodes))
 
-def split_nodes_link(old_nodes):
+def iter_split_nodes_link(old_nodes):
     """
     Splits TEXT nodes based on Markdown link syntax [text](url).
 
     Args:
-        old_nodes (list[TextNode]): A list of nodes to process.
+        old_nodes (iterable[TextNode]): The nodes to process.
 
-    Returns:
-        list[TextNode]: A new list with TEXT nodes split by links.
+    Yields:
+        TextNode: The nodes, with TEXT nodes split by links.
     """
-    new_nodes = []
     for old_node in old_nodes:
         # Skip non-TEXT nodes
         if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+            yield old_node
             continue
 
         original_text = old_node.text
@@ -480,48 +903,91 @@ def split_nodes_link(old_nodes):
         if not original_text:
             continue
 
-        # Extract all links from the node's text
-        links = extract_markdown_links(original_text)
+        # Slice around each match span; the text is scanned once
+        pos = 0
+        for match_start, match_end, link_text, url in iter_inline_links(original_text, image=False):
+            if match_start > pos: # Don't add empty strings
+                yield TextNode(original_text[pos:match_start], TextType.TEXT)
+            yield TextNode(link_text, TextType.LINK, url)
+            pos = match_end
+
+        if pos == 0:
+            # No matches: keep the original node
+            yield old_node
+        elif pos < len(original_text):
+            # After the loop, if there's any text left over, add it as a text node
+            yield TextNode(original_text[pos:], TextType.TEXT)
 
-        # If no links, add the original node (if it has text) and continue
-        if not links:
-            new_nodes.append(old_node)
-            continue
+def split_nodes_link(old_nodes):
+    """
+    Splits TEXT nodes based on Markdown link syntax [text](url).
+
+    List-returning wrapper around iter_split_nodes_link.
+    """
+    return list(iter_split_nodes_link(old_nodes))
 
-        # Start with the full text as the part to process
-        remaining_text = original_text
-        for link_text, link_url in links:
-            # Construct the full Markdown string for the current link
-            md_link = f"[{link_text}]({link_url})"
+# Inline markers found by scan_inline_markers, one bit each
+MARK_IMAGE = 1
+MARK_LINK = 2
+MARK_BOLD = 4
+MARK_ASTERISK = 8
+MARK_UNDERSCORE = 16
+MARK_BACKTICK = 32
 
-            # Split the *remaining* text segment at the first occurrence of this link
-            parts = remaining_text.split(md_link, 1)
+# (marker bit, stage name) of each iter_text_to_textnodes pass, in order
+INLINE_STAGES = ((MARK_IMAGE, "image"), (MARK_LINK, "link"), (MARK_BOLD, "bold"),
+                 (MARK_ASTERISK, "italic_asterisk"), (MARK_UNDERSCORE, "italic_underscore"),
+                 (MARK_BACKTICK, "code"))
 
-            # If split didn't work (shouldn't normally happen)
-            if len(parts) < 2:
-                 if remaining_text != md_link:
-                     print(f"Warning: Could not split text '{remaining_text}' on link '{md_link}'")
-                     if remaining_text:
-                         new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-                     remaining_text = ""
-                     break # Stop processing links for this node
+# Texts parsed per marker mask since the last reset_inline_stage_stats();
+# one increment per text keeps the counting off the per-node path
+_inline_mask_counts = [0] * 64
 
-            # Get the text before the link
-            text_before = parts[0]
-            if text_before: # Don't add empty strings
-                new_nodes.append(TextNode(text_before, TextType.TEXT))
 
-            # Add the link node itself
-            new_nodes.append(TextNode(link_text, TextType.LINK, link_url))
+def scan_inline_markers(text):
+    """
+    Returns the bitmask of inline markers present in text.
+
+    A clear bit means that stage cannot match anywhere in text, nor in any
+    fragment an earlier stage cuts from it. Each check is a C-level
+    substring search, far cheaper than a Python loop over the characters.
+    """
+    mask = 0
+    if "](" in text:
+        mask |= MARK_LINK
+        if "![" in text:
+            mask |= MARK_IMAGE
+    if "*" in text:
+        mask |= MARK_ASTERISK
+        if "**" in text:
+            mask |= MARK_BOLD
+    if "_" in text:
+        mask |= MARK_UNDERSCORE
+    if "`" in text:
+        mask |= MARK_BACKTICK
+    return mask
+
+
+def inline_stage_stats():
+    """
+    Counts of the texts parsed since the last reset in this process, and
+    of how often each inline stage was skipped by the marker prescan.
+
+    Returns:
+        dict: {"texts": int, "skipped": {stage name: int}}
+    """
+    skipped = dict.fromkeys((name for _, name in INLINE_STAGES), 0)
+    for mask, count in enumerate(_inline_mask_counts):
+        if count:
+            for bit, name in INLINE_STAGES:
+                if not mask & bit:
+                    skipped[name] += count
+    return {"texts": sum(_inline_mask_counts), "skipped": skipped}
 
-            # Update remaining_text to the part *after* this link for the next iteration
-            remaining_text = parts[1]
 
-        # After the loop, if there's any text left over, add it as a text node
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+def reset_inline_stage_stats():
+    _inline_mask_counts[:] = [0] * len(_inline_mask_counts)
 
-    return new_nodes
 
 def text_to_textnodes(text):
     """
@@ -533,17 +999,39 @@ def text_to_textnodes(text):
     if not text:
         return []
 
-    nodes = [TextNode(text, TextType.TEXT)]
+    return list(iter_text_to_textnodes(text))
+
+
+def iter_text_to_textnodes(text):
+    """
+    Lazy text_to_textnodes: chains the iter_split_nodes_* passes so each
+    node flows through every stage without intermediate lists.
+
+    Stages whose marker scan_inline_markers did not find are left out of
+    the chain; plain text comes back as a single node.
+    """
+    if not text:
+        return iter(())
+
+    mask = scan_inline_markers(text)
+    _inline_mask_counts[mask] += 1
+    nodes = iter((TextNode(text, TextType.TEXT),))
 
     # Apply splitters in order
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    if mask & MARK_IMAGE:
+        nodes = iter_split_nodes_image(nodes)
+    if mask & MARK_LINK:
+        nodes = iter_split_nodes_link(nodes)
+    if mask & MARK_BOLD:
+        nodes = iter_split_nodes_delimiter(nodes, "**", TextType.BOLD)
     # --- ADDED/MODIFIED FOR ITALICS ---
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC) # Process * italics
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC) # Process _ italics
+    if mask & MARK_ASTERISK:
+        nodes = iter_split_nodes_delimiter(nodes, "*", TextType.ITALIC) # Process * italics
+    if mask & MARK_UNDERSCORE:
+        nodes = iter_split_nodes_delimiter(nodes, "_", TextType.ITALIC) # Process _ italics
     # --- / ADDED/MODIFIED FOR ITALICS ---
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    if mask & MARK_BACKTICK:
+        nodes = iter_split_nodes_delimiter(nodes, "`", TextType.CODE)
 
     return nodes
 
@@ -579,6 +1067,65 @@ def markdown_to_blocks(markdown: str) -> list[str]:
 
     return final_blocks
 
+
+def iter_line_blocks(lines):
+    """Yields the blocks markdown_to_blocks would return for an iterable of lines.
+
+    Lines may keep their trailing newline (as when iterating a text file).
+    Only the current block is held in memory, so the input can be
+    arbitrarily long.
+
+    Args:
+        lines: An iterable of markdown lines, e.g. an open text file.
+
+    Yields:
+        Stripped, non-empty block strings.
+    """
+    current = []
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line:
+            current.append(line)
+            continue
+        # An empty line means two newlines in a row: a block boundary
+        if current:
+            block = "\n".join(current).strip()
+            if block:
+                yield block
+            current = []
+    if current:
+        block = "\n".join(current).strip()
+        if block:
+            yield block
+
+
+def iter_buffer_blocks(buffer):
+    """Yields the blocks markdown_to_blocks would return for a UTF-8 buffer.
+
+    Scans a bytes-like object (typically an mmap) for blank-line separators
+    and decodes each block on its own, so only one block at a time is
+    copied out of the buffer. Line endings are normalized like text-mode
+    open() would, so CRLF files split into the same blocks. CR and LF bytes
+    never occur inside a multi-byte UTF-8 sequence, so splitting the raw
+    bytes is safe.
+
+    Args:
+        buffer: bytes, bytearray or mmap holding UTF-8 markdown.
+
+    Yields:
+        Stripped, non-empty block strings.
+    """
+    start = 0
+    for match in _BUFFER_BLOCK_BREAK.finditer(buffer):
+        block = normalize_newlines(buffer[start:match.start()].decode("utf-8")).strip()
+        if block:
+            yield block
+        start = match.end()
+    block = normalize_newlines(buffer[start:].decode("utf-8")).strip()
+    if block:
+        yield block
+
 def block_to_block_type(block: str) -> BlockType:
     """Determines the BlockType of a given markdown block string.
 
@@ -637,103 +1184,171 @@ def block_to_block_type(block: str) -> BlockType:
 # --- In htmlnode.py ---
 # ... (keep existing imports and code including text_to_textnodes, text_node_to_html_node) ...
 
-def text_to_children(text: str) -> list[HTMLNode]:
+def text_to_children(text: str, asset_map: dict = None) -> list[HTMLNode]:
     """Converts text with inline markdown into a list of HTMLNode children.
 
     Args:
         text: The raw text string potentially containing inline markdown.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
 
     Returns:
         A list of HTMLNode objects (usually LeafNode) representing the parsed text.
     """
-    text_nodes = text_to_textnodes(text)
+    text_nodes = iter_text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, asset_map)
         children.append(html_node)
     return children
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+def block_to_html_node(block: str, asset_map: dict = None) -> HTMLNode:
+    """Converts one markdown block into its HTMLNode.
+
+    Args:
+        block: A single block, as produced by markdown_to_blocks.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
+
+    Returns:
+        The block's HTMLNode, or None for a block type with no output.
+    """
+    block_type = block_to_block_type(block)
+
+    if block_type == BlockType.HEADING:
+        # Determine level and extract text
+        level = 0
+        while block[level] == '#':
+            level += 1
+        # Ensure there's a space after hashes and text exists
+        if level < len(block) and block[level] == ' ':
+             text_content = block[level + 1:].strip()
+             children = text_to_children(text_content, asset_map)
+             return ParentNode(f"h{level}", children)
+        else: # Treat as paragraph if format is wrong (e.g. #NoSpace)
+             children = text_to_children(block, asset_map) # Parse the original block text
+             return ParentNode("p", children)
+
+
+    elif block_type == BlockType.PARAGRAPH:
+        children = text_to_children(block, asset_map)
+        return ParentNode("p", children)
+
+    elif block_type == BlockType.CODE:
+        # Remove fences, treat content as plain text
+        # Strip leading/trailing newlines often present inside fences
+        code_content = block.strip("```").strip('\n')
+        # Create LeafNode for code, wrap in ParentNode for pre
+        code_leaf = LeafNode("code", code_content)
+        return ParentNode("pre", [code_leaf])
+
+    elif block_type == BlockType.QUOTE:
+        # Process lines, remove '>', join, then parse inline
+        lines = block.split('\n')
+        processed_lines = []
+        for line in lines:
+            # Remove '>' and optional leading space
+            cleaned_line = line.lstrip('>').lstrip()
+            processed_lines.append(cleaned_line)
+        quote_content = "\n".join(processed_lines)
+        children = text_to_children(quote_content, asset_map)
+        return ParentNode("blockquote", children)
+
+    elif block_type == BlockType.UNORDERED_LIST:
+        list_item_nodes = []
+        lines = block.split('\n')
+        for line in lines:
+            # Remove marker ('* ' or '- ') and parse inline content
+            # Slice from index 2 assuming marker is always 2 chars
+            item_content = line[2:]
+            children = text_to_children(item_content, asset_map)
+            list_item_nodes.append(ParentNode("li", children))
+        return ParentNode("ul", list_item_nodes)
+
+    elif block_type == BlockType.ORDERED_LIST:
+        list_item_nodes = []
+        lines = block.split('\n')
+        for line in lines:
+            # Find the position of '. ' and slice after it
+            marker_end_pos = line.find(". ")
+            if marker_end_pos != -1:
+                item_content = line[marker_end_pos + 2:]
+                children = text_to_children(item_content, asset_map)
+                list_item_nodes.append(ParentNode("li", children))
+            # else: handle malformed line? For now, assume block_to_block_type was correct
+        return ParentNode("ol", list_item_nodes)
+
+    # else: Should not happen if block_to_block_type is exhaustive
+    return None
+
+
+def iter_block_nodes(source, asset_map: dict = None):
+    """Yields one HTMLNode per markdown block, parsing lazily.
+
+    The streaming counterpart of markdown_to_html_node: each node can be
+    rendered and written before the next block is read, so memory use
+    does not grow with the length of the document.
+
+    Args:
+        source: A markdown string, a UTF-8 buffer (e.g. an mmap), or an
+            iterable of lines such as an open text file.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
+
+    Yields:
+        The HTMLNode of each block, in document order.
+    """
+    if isinstance(source, str):
+        blocks = markdown_to_blocks(source)
+    elif isinstance(source, _BUFFER_TYPES):
+        blocks = iter_buffer_blocks(source)
+    else:
+        blocks = iter_line_blocks(source)
+    for block in blocks:
+        node = block_to_html_node(block, asset_map)
+        if node is not None:
+            yield node
+
+
+def render_markdown_stream(source, out, asset_map: dict = None, minify: bool = False) -> int:
+    """Renders markdown block by block, writing each block's HTML to out.
+
+    Produces the same markup as markdown_to_html_node(...).to_html().
+
+    Args:
+        source: Anything iter_block_nodes accepts.
+        out: A text stream with a write method.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
+        minify: Collapse insignificant whitespace in each block.
+
+    Returns:
+        The number of blocks written.
+    """
+    out.write("<div>")
+    count = 0
+    for node in iter_block_nodes(source, asset_map):
+        if minify:
+            minify_node(node)
+        out.write(node.to_html())
+        count += 1
+    out.write("</div>")
+    return count
+
+
+def markdown_to_html_node(markdown: str, asset_map: dict = None) -> ParentNode:
     """Converts a full markdown document string into a parent HTMLNode.
 
     Args:
-        markdown: The raw markdown string document.
+        markdown: The raw markdown string document, or a UTF-8 buffer (e.g.
+            the mmap from open_markdown_source), which is decoded block by block.
+        asset_map: Optional fingerprinted asset mapping for image/link URLs.
 
     Returns:
         A single ParentNode ("div") containing children HTMLNodes
         representing the parsed markdown document.
     """
-    blocks = markdown_to_blocks(markdown)
-    block_nodes = []
-
-    for block in blocks:
-        block_type = block_to_block_type(block)
-
-        if block_type == BlockType.HEADING:
-            # Determine level and extract text
-            level = 0
-            while block[level] == '#':
-                level += 1
-            # Ensure there's a space after hashes and text exists
-            if level < len(block) and block[level] == ' ':
-                 text_content = block[level + 1:].strip()
-                 children = text_to_children(text_content)
-                 block_nodes.append(ParentNode(f"h{level}", children))
-            else: # Treat as paragraph if format is wrong (e.g. #NoSpace)
-                 children = text_to_children(block) # Parse the original block text
-                 block_nodes.append(ParentNode("p", children))
-
-
-        elif block_type == BlockType.PARAGRAPH:
-            children = text_to_children(block)
-            block_nodes.append(ParentNode("p", children))
-
-        elif block_type == BlockType.CODE:
-            # Remove fences, treat content as plain text
-            # Strip leading/trailing newlines often present inside fences
-            code_content = block.strip("```").strip('\n')
-            # Create LeafNode for code, wrap in ParentNode for pre
-            code_leaf = LeafNode("code", code_content)
-            block_nodes.append(ParentNode("pre", [code_leaf]))
-
-        elif block_type == BlockType.QUOTE:
-            # Process lines, remove '>', join, then parse inline
-            lines = block.split('\n')
-            processed_lines = []
-            for line in lines:
-                # Remove '>' and optional leading space
-                cleaned_line = line.lstrip('>').lstrip()
-                processed_lines.append(cleaned_line)
-            quote_content = "\n".join(processed_lines)
-            children = text_to_children(quote_content)
-            block_nodes.append(ParentNode("blockquote", children))
-
-        elif block_type == BlockType.UNORDERED_LIST:
-            list_item_nodes = []
-            lines = block.split('\n')
-            for line in lines:
-                # Remove marker ('* ' or '- ') and parse inline content
-                # Slice from index 2 assuming marker is always 2 chars
-                item_content = line[2:]
-                children = text_to_children(item_content)
-                list_item_nodes.append(ParentNode("li", children))
-            block_nodes.append(ParentNode("ul", list_item_nodes))
-
-        elif block_type == BlockType.ORDERED_LIST:
-            list_item_nodes = []
-            lines = block.split('\n')
-            for line in lines:
-                # Find the position of '. ' and slice after it
-                marker_end_pos = line.find(". ")
-                if marker_end_pos != -1:
-                    item_content = line[marker_end_pos + 2:]
-                    children = text_to_children(item_content)
-                    list_item_nodes.append(ParentNode("li", children))
-                # else: handle malformed line? For now, assume block_to_block_type was correct
-            block_nodes.append(ParentNode("ol", list_item_nodes))
-
-        # else: Should not happen if block_to_block_type is exhaustive
+    if markdown is None:
+        block_nodes = []
+    else:
+        block_nodes = list(iter_block_nodes(markdown, asset_map))
 
     # Wrap all block nodes in a single root div
     root_node = ParentNode("div", block_nodes)
-    return root_node
\ No newline at end of file
+    return root_node
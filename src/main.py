@@ -2,63 +2,195 @@
 
 import os
 import sys # Import sys module
-import shutil
+import argparse
 # Import necessary functions from your module
-from htmlnode import (
-    copy_directory_recursive,
-    generate_pages_recursive
-)
+from build import BuildOptions, build_site
+from cache import LocalDirectoryCache
+from budget import PageBudget
+from output import ArchiveBackend
+from content import open_content_source
+from metrics import format_page_report
+from manifest import default_manifest_path
+
+
+def normalize_base_path(base_path):
+    # Ensure it starts and ends with a slash for consistency
+    if not base_path.startswith("/"):
+        base_path = "/" + base_path
+    if not base_path.endswith("/"):
+        base_path += "/"
+    return base_path
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument("base_path", nargs="?", default="/",
+                        help="Base path prepended to root-relative links (default: /)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes used to render pages")
+    parser.add_argument("--compress", action="store_true",
+                        help="Write pre-compressed .gz (and .br) siblings for text outputs")
+    parser.add_argument("--minify", action="store_true",
+                        help="Collapse insignificant whitespace in generated pages")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Copy static assets to content-hashed names and rewrite references")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Store identical static files once and hardlink the copies")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep the output and render only content changed since the last build "
+                             "(asks git when available, otherwise compares stats/hashes)")
+    parser.add_argument("--manifest",
+                        help="Where to write the output manifest and delta "
+                             "(default: one file per output directory under .staticweb/)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Do not write an output manifest")
+    parser.add_argument("--no-schedule", action="store_true",
+                        help="Submit pages in discovery order instead of largest-first batches")
+    parser.add_argument("--page-timeout", type=float, metavar="SECONDS",
+                        help="Kill and report any page that renders for longer than this")
+    parser.add_argument("--page-memory", type=float, metavar="MB",
+                        help="Kill and report any page whose worker grows by more than this many MiB")
+    parser.add_argument("--skip-over-budget", action="store_true",
+                        help="Skip pages that exceed a budget instead of counting them as failures")
+    parser.add_argument("--trace", metavar="OUT.json",
+                        help="Write Chrome/Perfetto trace-event JSON of the build's stages, pages and asset copies")
+    parser.add_argument("--top-pages", type=int, default=5, metavar="N",
+                        help="List the N slowest and N largest pages after the build (0 to disable)")
+    parser.add_argument("--page-metrics", metavar="OUT.csv|OUT.json",
+                        help="Write per-page source bytes, blocks, nodes, parse/render times and output bytes")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="Write build metrics in Prometheus text format (e.g. for node_exporter's textfile collector)")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Shared build cache directory for rendered pages")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="Stream the site into a .tar, .tar.gz/.tgz or .zip archive instead of "
+                             "writing the output directory")
+    parser.add_argument("--content", metavar="PATH", default="content",
+                        help="Content source: a directory, a .tar/.tar.gz/.tgz/.zip archive or a "
+                             ".db/.sqlite database of (path, markdown, mtime) (default: content)")
+    parser.add_argument("--pack-content", metavar="OUT",
+                        help="Pack the content directory into an archive or SQLite database and exit")
+    parser.add_argument("--output", "-o", default="docs",
+                        help="Output directory (default: docs)")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Render only shard I of N (1-based) of the content pages")
+    parser.add_argument("--merge-shards", nargs="+", metavar="SHARD_DIR",
+                        help="Merge shard output trees into the output directory and exit")
+    parser.add_argument("--daemon", metavar="SOCKET",
+                        help="Run as a build daemon listening on this Unix socket")
+    return parser.parse_args(argv)
+
 
 def main():
+    args = parse_args(sys.argv[1:])
+
     # --- Base Path Handling ---
-    base_path = "/" # Default for local testing
-    if len(sys.argv) > 1:
-        # Use the first argument from the command line if provided
-        base_path = sys.argv[1]
-        # Ensure it starts and ends with a slash for consistency
-        if not base_path.startswith("/"):
-            base_path = "/" + base_path
-        if not base_path.endswith("/"):
-            base_path += "/"
+    base_path = normalize_base_path(args.base_path)
     print(f"Using base path: {base_path}")
     # --- / Base Path Handling ---
 
     # Define source and destination directories
     static_dir = "static"
-    content_dir = "content"
-    docs_dir = "docs" # Changed destination directory name
+    content_dir = args.content
+    docs_dir = args.output # Changed destination directory name
     template_path = "template.html"
 
-    print("--- Static Site Generation ---")
+    if args.merge_shards:
+        from shard import merge_shards
+        print(f"Merging {len(args.merge_shards)} shards into '{docs_dir}'...")
+        try:
+            merged = merge_shards(args.merge_shards, docs_dir)
+        except (ValueError, FileNotFoundError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Merged {len(merged['pages'])} pages from {merged['count']} shards.")
+        return
 
-    # 1. Clean the destination directory
-    if os.path.exists(docs_dir):
-        print(f"Deleting existing directory: '{docs_dir}'")
-        shutil.rmtree(docs_dir)
-    print(f"Creating destination directory: '{docs_dir}'")
-    os.mkdir(docs_dir)
-
-    # 2. Copy static assets to destination directory
-    print(f"\nCopying static assets from '{static_dir}' to '{docs_dir}'...")
-    if os.path.exists(static_dir):
-        # Pass docs_dir as the destination
-        copy_directory_recursive(static_dir, docs_dir)
-        print("Static assets copied successfully.")
-    else:
-        print(f"Warning: Static directory '{static_dir}' not found. Skipping copy.")
+    if args.pack_content:
+        from content import pack_content
+        try:
+            count = pack_content(content_dir, args.pack_content)
+        except (ValueError, OSError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Packed {count} content files from '{content_dir}' into '{args.pack_content}'.")
+        return
+
+    shard = None
+    if args.shard:
+        from shard import parse_shard
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(2)
 
+    manifest_path = args.manifest or default_manifest_path(".staticweb", args.output)
+    options = BuildOptions(base_path=base_path, jobs=args.jobs, compress=args.compress,
+                           minify=args.minify, fingerprint=args.fingerprint,
+                           dedupe=args.dedupe, shard=shard, incremental=args.incremental,
+                           manifest_path=None if args.no_manifest else manifest_path,
+                           cache=LocalDirectoryCache(args.cache_dir) if args.cache_dir else None,
+                           schedule=not args.no_schedule, trace_path=args.trace,
+                           top_pages=args.top_pages, page_metrics_path=args.page_metrics,
+                           metrics_path=args.metrics_file,
+                           budget=PageBudget(args.page_timeout, args.page_memory, args.skip_over_budget))
+
+    if args.daemon:
+        from daemon import BuildDaemon
+        unsupported = [flag for flag, value in (("--shard", args.shard), ("--incremental", args.incremental),
+                                                ("--trace", args.trace), ("--archive", args.archive)) if value]
+        if unsupported:
+            print(f"Error: The build daemon does not support {', '.join(unsupported)}.")
+            sys.exit(2)
+        if not os.path.isdir(content_dir):
+            print("Error: The build daemon needs a content directory, not a packed source.")
+            sys.exit(2)
+        daemon = BuildDaemon(args.daemon, static_dir, content_dir, template_path, docs_dir, options)
+        daemon.serve_forever()
+        return
+
+    print("--- Static Site Generation ---")
 
-    # 3. Generate content pages recursively
-    print("\nGenerating content pages...")
     if not os.path.exists(content_dir):
-         print(f"Error: Content directory '{content_dir}' not found.")
+         print(f"Error: Content source '{content_dir}' not found.")
     elif not os.path.exists(template_path):
         print(f"Error: Template file '{template_path}' not found.")
     else:
         try:
-            # Pass base_path and docs_dir to the generator
-            generate_pages_recursive(content_dir, template_path, docs_dir, base_path)
-            print("\nContent generation complete.")
+            with open_content_source(content_dir) as source:
+                if args.archive:
+                    print(f"Streaming outputs into archive '{args.archive}'")
+                    with ArchiveBackend(args.archive, root=docs_dir) as backend:
+                        summary = build_site(static_dir, content_dir, template_path, docs_dir, options,
+                                             backend=backend, source=source)
+                else:
+                    summary = build_site(static_dir, content_dir, template_path, docs_dir, options,
+                                         source=source)
+            print(f"\nContent generation complete: {summary['rendered']} rendered, "
+                  f"{summary['failed']} failed in {summary['seconds']:.2f}s; "
+                  f"{len(summary['changed_outputs'])} outputs changed.")
+            if options.cache is not None:
+                print(f"Build cache: {summary['cache_hits']} of {summary['rendered']} pages served from cache.")
+            for line in format_page_report(summary["slowest"], summary["largest"]):
+                print(line)
+            if options.page_metrics_path:
+                print(f"Per-page metrics written to '{options.page_metrics_path}'.")
+            if "schedule" in summary:
+                stats = summary["schedule"]
+                line = f"Scheduler: {stats['pages']} pages in {stats['batches']} tasks"
+                if "utilization" in stats:
+                    line += (f", worker utilization {stats['utilization']:.0%}, tail {stats['tail']:.2f}s "
+                             f"of {stats['makespan']:.2f}s")
+                print(line + ".")
+            if summary["over_budget"]:
+                print(f"Over budget: {len(summary['over_budget'])} pages "
+                      f"({summary['budget_skipped']} skipped):")
+                for entry in summary["over_budget"]:
+                    memory = "" if entry["memory_bytes"] is None else f", {entry['memory_bytes'] / 2**20:.1f} MiB"
+                    print(f"  {entry['path']}: {entry['reason']} ({entry['seconds']:.2f}s{memory})")
+            if options.minify:
+                print(f"Minification saved {summary['bytes_saved']} bytes in total.")
         except Exception as e:
             print(f"\nError during recursive page generation: {e}")
 
@@ -69,4 +201,4 @@ def main():
 if __name__ == "__main__":
     main()
 
-# --- END OF FILE main.py ---
\ No newline at end of file
+# --- END OF FILE main.py ---
@@ -0,0 +1,103 @@
+# --- START OF FILE manifest.py ---
+
+import os
+import json
+import hashlib
+
+from assets import file_digest
+
+
+# Build bookkeeping that lives in the output tree but is never deployed
+INTERNAL_FILES = {".shard-manifest.json"}
+
+
+def default_manifest_path(state_dir, output_dir):
+    """The manifest path in state_dir for output_dir, so each output tree keeps its own."""
+    key = hashlib.sha256(os.path.abspath(output_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir, f"manifest-{key}.json")
+
+
+def load_manifest(manifest_path):
+    """Returns the manifest stored at manifest_path, or an empty one."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"files": {}}
+
+
+def scan_outputs(output_dir, previous_files=None):
+    """
+    Lists every deployable file under output_dir with its hash and size.
+
+    Hashes are reused from previous_files when a file's (mtime_ns, size) is
+    unchanged, which holds for every output write_if_changed left alone.
+
+    Returns:
+        A dict of '/'-separated relative path -> {"sha256", "size", "mtime_ns"}.
+    """
+    previous_files = previous_files or {}
+    files = {}
+    for dir_path, _, file_names in os.walk(output_dir):
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if rel_path in INTERNAL_FILES:
+                continue
+            stat = os.stat(path)
+            entry = previous_files.get(rel_path)
+            if entry is not None and entry["size"] == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                sha256 = entry["sha256"]
+            else:
+                sha256 = file_digest(path)
+            files[rel_path] = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return files
+
+
+def diff_manifests(previous_files, current_files):
+    """
+    Compares two file listings by content hash.
+
+    Returns:
+        A dict with sorted 'added', 'modified' and 'removed' path lists.
+    """
+    added = sorted(set(current_files) - set(previous_files))
+    removed = sorted(set(previous_files) - set(current_files))
+    modified = sorted(path for path in set(current_files) & set(previous_files)
+                      if current_files[path]["sha256"] != previous_files[path]["sha256"])
+    return {"added": added, "modified": modified, "removed": removed}
+
+
+def write_manifest(output_dir, manifest_path):
+    """
+    Records every output file and the delta against the previous manifest.
+
+    The manifest document holds 'files' (path -> sha256/size) and 'delta'
+    (added/modified/removed since the previous manifest at manifest_path),
+    so a deploy step can upload only what changed. A previous manifest of
+    a different output directory says nothing about this one, so every file
+    is then reported as added.
+
+    Returns:
+        The new manifest dict.
+    """
+    output_dir = os.path.abspath(output_dir)
+    previous = load_manifest(manifest_path)
+    if "output_dir" in previous and os.path.abspath(previous["output_dir"]) != output_dir:
+        previous = {"files": {}}
+    files = scan_outputs(output_dir, previous.get("files"))
+    manifest = {
+        "output_dir": output_dir,
+        "files": files,
+        "delta": diff_manifests(previous.get("files", {}), files),
+    }
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+# --- END OF FILE manifest.py ---
@@ -0,0 +1,244 @@
+# --- START OF FILE metrics.py ---
+
+import os
+import sys
+import csv
+import json
+import time
+import heapq
+import bisect
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Columns of the per-page metrics table, in CSV order
+PAGE_METRIC_FIELDS = ("source", "dest", "seconds", "source_bytes", "blocks", "nodes",
+                      "parse_seconds", "render_seconds", "output_bytes", "cache_hit")
+
+# Upper bounds (seconds) of the page duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def count_nodes(node):
+    """Counts an HTML node and all of its descendants."""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+
+def page_metrics_row(result, seconds):
+    """The metrics table row for a rendered page's PageResult and task time."""
+    return {
+        "source": result.source,
+        "dest": result.dest,
+        "seconds": round(seconds, 6),
+        "source_bytes": result.source_bytes,
+        "blocks": result.blocks,
+        "nodes": result.nodes,
+        "parse_seconds": round(result.parse_seconds, 6),
+        "render_seconds": round(result.render_seconds, 6),
+        "output_bytes": result.output_bytes,
+        "cache_hit": result.cache_hit,
+    }
+
+
+class PageMetrics:
+    """
+    Collects per-page metrics rows during a build.
+
+    Only the top slowest and largest pages are kept in memory; the full
+    table is streamed to path as it grows, as CSV or as a JSON array
+    depending on the extension, so huge sites cost no more than small ones.
+    """
+
+    def __init__(self, top=10, path=None):
+        self.top = top
+        self.path = path
+        self.count = 0
+        self._slowest = []  # min-heaps of (key, sequence, row)
+        self._largest = []
+        self._file = None
+        self._csv = None
+        if path is not None:
+            if not path.endswith((".csv", ".json")):
+                raise ValueError(f"Unsupported page metrics format: {path} (use .csv or .json)")
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if path.endswith(".csv"):
+                self._csv = csv.DictWriter(self._file, PAGE_METRIC_FIELDS)
+                self._csv.writeheader()
+            else:
+                self._file.write("[")
+
+    def add(self, row):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        elif self._file is not None:
+            self._file.write(("\n" if self.count == 0 else ",\n") + json.dumps(row))
+        self.count += 1
+        if self.top > 0:
+            for heap, key in ((self._slowest, row["seconds"]), (self._largest, row["source_bytes"])):
+                item = (key, self.count, row)
+                if len(heap) < self.top:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    def slowest(self):
+        """The top slowest rows, slowest first."""
+        return [row for _, _, row in sorted(self._slowest, reverse=True)]
+
+    def largest(self):
+        """The top rows by source size, largest first."""
+        return [row for _, _, row in sorted(self._largest, reverse=True)]
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._csv is None:
+            self._file.write("\n]\n")
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Histogram:
+    """Fixed-bucket histogram of observations, like a Prometheus histogram."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)  # per bucket, not cumulative
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "count": self.count,
+                "sum": round(self.sum, 6)}
+
+
+# ru_maxrss is in bytes on macOS and in KiB on Linux and the BSDs
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_bytes():
+    """
+    Returns (this process, largest finished child) peak resident set sizes
+    in bytes, or None where the resource module is unavailable. The child
+    peak is None until a child process has been reaped, e.g. while a
+    daemon's long-lived pool is still running.
+    """
+    if resource is None:
+        return None
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT,
+            children * _MAXRSS_UNIT if children else None)
+
+
+def _prometheus_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def format_prometheus(summary, prefix="staticweb"):
+    """
+    Formats a build summary in the Prometheus text exposition format.
+
+    Every sample describes the most recent build, so counts are exported as
+    gauges; page durations are histograms labelled by stage.
+    """
+    lines = []
+
+    def gauge(name, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{prefix}_{name}{{{label_text}}} {_prometheus_value(value)}" if label_text
+                         else f"{prefix}_{name} {_prometheus_value(value)}")
+
+    rendered = summary["rendered"]
+    gauge("build_pages_rendered", "Pages rendered by the last build, including cache hits.", [((), rendered)])
+    gauge("build_pages_failed", "Pages that failed to render.", [((), summary["failed"])])
+    gauge("build_pages_cache_hits", "Pages served from the build cache without rendering.",
+          [((), summary["cache_hits"])])
+    gauge("build_pages_unchanged", "Pages skipped by incremental change detection.",
+          [((), summary.get("pages_unchanged", summary.get("skipped", 0)))])
+    gauge("build_cache_hit_ratio", "Share of rendered pages served from the build cache.",
+          [((), summary["cache_hits"] / rendered if rendered else 0.0)])
+    gauge("build_bytes_read", "Markdown source bytes read.", [((), summary.get("bytes_read", 0))])
+    gauge("build_bytes_written", "HTML bytes written.", [((), summary["bytes_written"])])
+    gauge("build_outputs_changed", "Outputs whose bytes changed.", [((), len(summary["changed_outputs"]))])
+    stages = summary.get("stages") or {"pages": summary["seconds"]}
+    gauge("build_duration_seconds", "Wall time of the last build by stage.",
+          [((("stage", stage),), round(seconds, 6)) for stage, seconds in stages.items()])
+    peak = peak_rss_bytes()
+    if peak is not None:
+        samples = [((("process", "main"),), peak[0])]
+        if peak[1] is not None:
+            samples.append(((("process", "worker"),), peak[1]))
+        gauge("build_peak_rss_bytes", "Peak resident set size of the build process and of its largest worker.",
+              samples)
+    gauge("build_last_timestamp_seconds", "When the last build finished.", [((), round(time.time(), 3))])
+
+    name = f"{prefix}_page_stage_seconds"
+    lines.append(f"# HELP {name} Per-page duration of each rendering stage.")
+    lines.append(f"# TYPE {name} histogram")
+    for stage, histogram in summary.get("histograms", {}).items():
+        cumulative = 0
+        for bound, count in zip(histogram["buckets"], histogram["counts"]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum"]!r}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(summary, path):
+    """
+    Writes format_prometheus(summary) to path for node_exporter's textfile
+    collector, through a temporary file so a scrape never sees half a file.
+    """
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(format_prometheus(summary))
+    os.replace(tmp_path, path)
+
+
+def format_page_report(slowest, largest):
+    """Human-readable lines listing the slowest and largest pages."""
+    lines = []
+    if slowest:
+        lines.append("Slowest pages:")
+        for row in slowest:
+            lines.append(f"  {row['seconds'] * 1000:9.1f} ms  parse {row['parse_seconds'] * 1000:.1f} ms, "
+                         f"render {row['render_seconds'] * 1000:.1f} ms, {row['nodes']} nodes  {row['source']}")
+    if largest:
+        lines.append("Largest pages:")
+        for row in largest:
+            lines.append(f"  {row['source_bytes']:>11} B  {row['blocks']} blocks, "
+                         f"{row['output_bytes']} B output  {row['source']}")
+    return lines
+
+# --- END OF FILE metrics.py ---
@@ -0,0 +1,141 @@
+# --- START OF FILE minify.py ---
+
+# HTML minification that never runs a regex over a whole page. Templates
+# go through a single-pass tag tokenizer; generated content is compacted on
+# the node tree before it is rendered.
+
+import re
+
+# HTML's whitespace characters. Other Unicode spaces, such as the no-break
+# space U+00A0, are content and must survive minification.
+HTML_WHITESPACE = " \t\n\r\f"
+_WHITESPACE_RUN = re.compile(f"[{re.escape(HTML_WHITESPACE)}]+")
+
+# Elements whose text content must be kept byte-for-byte
+PRESERVE_TAGS = {"pre", "code", "textarea", "script", "style"}
+
+# Elements around which whitespace never renders
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "article", "section",
+    "header", "footer", "nav", "main", "aside", "div", "p", "h1", "h2", "h3",
+    "h4", "h5", "h6", "ul", "ol", "li", "blockquote", "pre", "table", "thead",
+    "tbody", "tr", "td", "th", "hr", "br", "!doctype", "script", "style",
+}
+
+
+def collapse_whitespace(text):
+    """
+    Collapses every run of HTML whitespace in text to a single space, so a
+    single space is kept at either end if the original had whitespace there.
+    """
+    if not text:
+        return text
+    return _WHITESPACE_RUN.sub(" ", text)
+
+
+def _tag_name(tag_text):
+    """Returns (name, is_closing) for a raw tag like '<a href=..>' or '</p>'."""
+    body = tag_text[1:-1].strip()
+    closing = body.startswith("/")
+    if closing:
+        body = body[1:]
+    end = 0
+    while end < len(body) and not body[end].isspace() and body[end] not in "/>":
+        end += 1
+    return body[:end].lower(), closing
+
+
+def iter_tokens(html):
+    """
+    Yields ('tag', text) and ('text', text) tokens from an HTML string in a
+    single left-to-right pass. Comments are yielded as tags.
+    """
+    pos = 0
+    length = len(html)
+    while pos < length:
+        start = html.find("<", pos)
+        if start == -1:
+            yield "text", html[pos:]
+            return
+        if start > pos:
+            yield "text", html[pos:start]
+        if html.startswith("<!--", start):
+            end = html.find("-->", start + 4)
+            end = length if end == -1 else end + 3
+        else:
+            end = html.find(">", start + 1)
+            end = length if end == -1 else end + 1
+        yield "tag", html[start:end]
+        pos = end
+
+
+def iter_minified(html):
+    """
+    Yields minified fragments of an HTML document.
+
+    Whitespace-only text next to a block-level tag is dropped, other text has
+    its whitespace runs collapsed, and everything inside PRESERVE_TAGS is
+    passed through untouched.
+    """
+    preserve_depth = 0
+    pending_space = ""
+    previous_block = True
+    for kind, text in iter_tokens(html):
+        if kind == "text":
+            if preserve_depth:
+                yield text
+                continue
+            collapsed = collapse_whitespace(text)
+            if previous_block:
+                collapsed = collapsed.lstrip(" ")
+            # A trailing space only matters if the next tag is inline
+            if collapsed.endswith(" "):
+                collapsed = collapsed[:-1]
+                pending_space = " "
+            if collapsed:
+                yield collapsed
+                previous_block = False
+            continue
+
+        name, closing = _tag_name(text)
+        if name in PRESERVE_TAGS:
+            preserve_depth += -1 if closing else 1
+            preserve_depth = max(preserve_depth, 0)
+        is_block = name in BLOCK_TAGS
+        if pending_space and not is_block:
+            yield pending_space
+        pending_space = ""
+        previous_block = is_block
+        yield text
+
+
+def minify_html(html):
+    """Returns html with insignificant whitespace removed."""
+    return "".join(iter_minified(html))
+
+
+def minify_node(node):
+    """
+    Collapses whitespace in the text leaves of an HTML node tree, in place.
+
+    Subtrees rooted at a PRESERVE_TAGS element are left untouched.
+
+    Returns:
+        The number of bytes removed from the UTF-8 output. Only ASCII
+        whitespace is ever removed, so this is also the character count.
+    """
+    if node.tag in PRESERVE_TAGS:
+        return 0
+    if node.children is None:
+        if not node.value:
+            return 0
+        collapsed = collapse_whitespace(node.value)
+        saved = len(node.value) - len(collapsed)
+        node.value = collapsed
+        return saved
+    saved = 0
+    for child in node.children:
+        saved += minify_node(child)
+    return saved
+
+# --- END OF FILE minify.py ---
@@ -0,0 +1,336 @@
+# --- START OF FILE output.py ---
+
+import os
+import io
+import stat
+import time
+import shutil
+import tarfile
+import hashlib
+import zipfile
+import tempfile
+
+from assets import file_digest
+
+
+# The process umask, read once at import; os.umask can only be read by setting it
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def _output_mode(dest_path):
+    """Mode for a new dest_path: the existing file's, else 0o666 less the umask, like open()."""
+    try:
+        return stat.S_IMODE(os.stat(dest_path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_if_changed(dest_path: str, data: bytes) -> bool:
+    """
+    Writes data to dest_path unless the file already holds exactly these bytes.
+
+    The existing file is compared by size first and by SHA-256 only when the
+    sizes match. New contents go to a temporary file in the same directory
+    that is renamed over dest_path, so readers never see a partial file and
+    unchanged files keep their mtime.
+
+    Returns:
+        True if the file was written, False if it was left untouched.
+    """
+    try:
+        existing_size = os.path.getsize(dest_path)
+    except OSError:
+        existing_size = None
+    if existing_size == len(data):
+        if file_digest(dest_path) == hashlib.sha256(data).hexdigest():
+            return False
+
+    dest_dir = os.path.dirname(dest_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.chmod(tmp_path, _output_mode(dest_path))
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def write_chunks_if_changed(dest_path: str, chunks) -> tuple[bool, int]:
+    """
+    Streaming write_if_changed: writes an iterable of byte chunks to a
+    temporary file while hashing them, then renames it over dest_path only
+    if the result differs from the existing file. At most one chunk is held
+    in memory.
+
+    Returns:
+        A (changed, size) tuple.
+    """
+    dest_dir = os.path.dirname(dest_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".tmp-")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                tmp_file.write(chunk)
+        try:
+            unchanged = (os.path.getsize(dest_path) == size
+                         and file_digest(dest_path) == digest.hexdigest())
+        except OSError:
+            unchanged = False
+        if unchanged:
+            os.remove(tmp_path)
+            return False, size
+        os.chmod(tmp_path, _output_mode(dest_path))
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True, size
+
+
+def copy_if_changed(source_path: str, dest_path: str) -> bool:
+    """
+    Copies source_path to dest_path, with its permission bits, unless
+    dest_path already holds the same bytes.
+
+    Like write_if_changed, the copy goes through a renamed temporary file,
+    so unchanged files keep their mtime and a hardlinked dest_path is
+    replaced rather than written through.
+
+    Returns:
+        True if the file was copied, False if it was left untouched.
+    """
+    try:
+        unchanged = (os.path.getsize(dest_path) == os.path.getsize(source_path)
+                     and file_digest(dest_path) == file_digest(source_path))
+    except OSError:
+        unchanged = False
+    if unchanged:
+        return False
+    dest_dir = os.path.dirname(dest_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copy(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+class OutputBackend:
+    """
+    Destination for build outputs. Paths passed in are the same paths the
+    build would use on disk; backends that do not write to disk store them
+    relative to root.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    def rel_path(self, path):
+        """Returns path relative to root, '/'-separated."""
+        if self.root is None:
+            return path.replace(os.sep, "/")
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def write_bytes(self, path, data):
+        """Stores data at path; returns True if the stored bytes changed."""
+        raise NotImplementedError("write_bytes method not implemented")
+
+    def write_chunks(self, path, chunks):
+        """
+        Stores an iterable of byte chunks at path.
+
+        Returns:
+            A (changed, size) tuple. Backends that can stream override this;
+            the default joins the chunks and calls write_bytes.
+        """
+        data = b"".join(chunks)
+        return self.write_bytes(path, data), len(data)
+
+    def copy_file(self, source_path, path):
+        """Stores the contents of the local file source_path at path."""
+        with open(source_path, "rb") as f:
+            self.write_bytes(path, f.read())
+
+    def link_file(self, existing_path, path):
+        """
+        Stores path as another name for the already-written existing_path.
+
+        Returns:
+            True if the backend stored a link, False if the caller should
+            write a full copy instead.
+        """
+        return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DiskBackend(OutputBackend):
+    """Writes outputs to the local filesystem at the given paths."""
+
+    def write_bytes(self, path, data):
+        dest_dir = os.path.dirname(path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        return write_if_changed(path, data)
+
+    def write_chunks(self, path, chunks):
+        dest_dir = os.path.dirname(path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        return write_chunks_if_changed(path, chunks)
+
+    def _prepare(self, path):
+        dest_dir = os.path.dirname(path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+
+    def copy_file(self, source_path, path):
+        self._prepare(path)
+        copy_if_changed(source_path, path)
+
+    def link_file(self, existing_path, path):
+        self._prepare(path)
+        if os.path.lexists(path):
+            if os.path.samefile(existing_path, path):
+                return True  # linked by an earlier build; keep its mtime
+            # Never write through an existing hardlink into another file's data
+            os.remove(path)
+        try:
+            os.link(existing_path, path)
+        except OSError:
+            return False  # e.g. cross-device or no hardlink support
+        return True
+
+
+class MemoryBackend(OutputBackend):
+    """Keeps outputs in a dict of relative path -> bytes, for tests and previews."""
+
+    def __init__(self, root=None):
+        super().__init__(root)
+        self.files = {}
+
+    def write_bytes(self, path, data):
+        rel_path = self.rel_path(path)
+        changed = self.files.get(rel_path) != data
+        self.files[rel_path] = bytes(data)
+        return changed
+
+    def link_file(self, existing_path, path):
+        # Share the same bytes object, the in-memory equivalent of a hardlink
+        self.files[self.rel_path(path)] = self.files[self.rel_path(existing_path)]
+        return True
+
+    def read_bytes(self, path):
+        return self.files[self.rel_path(path)]
+
+
+class ArchiveBackend(OutputBackend):
+    """
+    Streams outputs straight into a .tar, .tar.gz/.tgz or .zip archive, so a
+    deploy artifact never needs a materialized output directory.
+
+    Every member gets the same timestamp (the backend's creation time) and
+    tar archives store deduplicated files as hardlink members.
+    """
+
+    def __init__(self, archive_path, root=None, fileobj=None, mtime=None):
+        super().__init__(root)
+        self.archive_path = archive_path
+        self.mtime = int(time.time()) if mtime is None else mtime
+        self.names = set()
+        if archive_path.endswith(".zip"):
+            self.kind = "zip"
+            self.archive = zipfile.ZipFile(fileobj or archive_path, "w", zipfile.ZIP_DEFLATED)
+        elif archive_path.endswith((".tar.gz", ".tgz")):
+            self.kind = "tar"
+            self.archive = tarfile.open(archive_path, "w|gz", fileobj=fileobj)
+        elif archive_path.endswith(".tar"):
+            self.kind = "tar"
+            self.archive = tarfile.open(archive_path, "w|", fileobj=fileobj)
+        else:
+            raise ValueError(f"Unsupported archive type: {archive_path} (use .tar, .tar.gz, .tgz or .zip)")
+
+    def _claim(self, path):
+        name = self.rel_path(path)
+        if name in self.names:
+            raise ValueError(f"Archive member written twice: {name}")
+        self.names.add(name)
+        return name
+
+    def _zip_info(self, name):
+        info = zipfile.ZipInfo(name, time.localtime(self.mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        return info
+
+    def write_bytes(self, path, data):
+        name = self._claim(path)
+        if self.kind == "zip":
+            self.archive.writestr(self._zip_info(name), data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = self.mtime
+            info.mode = 0o644
+            self.archive.addfile(info, io.BytesIO(data))
+        return True
+
+    def copy_file(self, source_path, path):
+        name = self._claim(path)
+        if self.kind == "zip":
+            info = self._zip_info(name)
+            # A known size lets zipfile pick ZIP64 up front for large assets
+            info.file_size = os.path.getsize(source_path)
+            with open(source_path, "rb") as f, self.archive.open(info, "w") as member:
+                shutil.copyfileobj(f, member)
+            return
+        info = tarfile.TarInfo(name)
+        info.size = os.path.getsize(source_path)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        with open(source_path, "rb") as f:
+            self.archive.addfile(info, f)
+
+    def link_file(self, existing_path, path):
+        if self.kind != "tar":
+            return False
+        info = tarfile.TarInfo(self._claim(path))
+        info.type = tarfile.LNKTYPE
+        info.linkname = self.rel_path(existing_path)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        self.archive.addfile(info)
+        return True
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+
+def is_disk(backend):
+    """True when outputs land on the local filesystem (the default)."""
+    return backend is None or isinstance(backend, DiskBackend)
+
+# --- END OF FILE output.py ---
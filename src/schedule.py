@@ -0,0 +1,129 @@
+# --- START OF FILE schedule.py ---
+
+import os
+import json
+
+
+RENDER_TIMES_FILE = "render-times.json"
+
+# Cost assumed for pages never rendered before, until history gives a rate
+DEFAULT_SECONDS_PER_BYTE = 1e-6
+
+# Small pages are grouped so each worker gets about this many tasks
+TASKS_PER_WORKER = 4
+
+
+def load_render_times(state_dir):
+    """Returns {source_path: seconds} recorded by the last builds."""
+    try:
+        with open(os.path.join(state_dir, RENDER_TIMES_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def record_render_times(state_dir, times):
+    """
+    Merges this build's render times ({source_path: seconds}) into the
+    recorded history. Entries of deleted pages are never looked up again
+    and stay harmless.
+    """
+    history = load_render_times(state_dir)
+    history.update(times)
+    os.makedirs(state_dir, exist_ok=True)
+    tmp_path = os.path.join(state_dir, RENDER_TIMES_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, sort_keys=True)
+    os.replace(tmp_path, os.path.join(state_dir, RENDER_TIMES_FILE))
+
+
+def estimate_costs(pages, history):
+    """
+    Estimates the render time of each page.
+
+    Pages rendered before use their recorded time. Others use their source
+    size times the seconds-per-byte rate seen across the recorded pages, or
+    DEFAULT_SECONDS_PER_BYTE without any history.
+
+    Returns:
+        A list of estimated seconds, parallel to pages.
+    """
+    sizes = []
+    for src, _ in pages:
+        try:
+            sizes.append(os.path.getsize(src))
+        except OSError:
+            sizes.append(0)
+    known_seconds = known_bytes = 0
+    for (src, _), size in zip(pages, sizes):
+        if src in history:
+            known_seconds += history[src]
+            known_bytes += size
+    rate = known_seconds / known_bytes if known_bytes else DEFAULT_SECONDS_PER_BYTE
+    return [history[src] if src in history else size * rate for (src, _), size in zip(pages, sizes)]
+
+
+def plan_batches(pages, costs, jobs, tasks_per_worker=TASKS_PER_WORKER):
+    """
+    Orders pages largest-first and groups the small ones into batches.
+
+    A page costing at least total / (jobs * tasks_per_worker) gets a task
+    of its own; smaller pages are packed, largest first, into batches of
+    about that cost. Expensive pages then start first instead of running
+    alone at the end, and cheap pages share one round trip per batch.
+
+    Returns:
+        A list of batches (lists of pages), most expensive first.
+    """
+    order = sorted(range(len(pages)), key=lambda i: costs[i], reverse=True)
+    target = sum(costs) / max(jobs * tasks_per_worker, 1)
+    batches = []
+    current = []
+    current_cost = 0.0
+    for i in order:
+        if costs[i] >= target:
+            batches.append([pages[i]])
+            continue
+        current.append(pages[i])
+        current_cost += costs[i]
+        if current_cost >= target:
+            batches.append(current)
+            current = []
+            current_cost = 0.0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def schedule_stats(spans, jobs):
+    """
+    Summarizes how well the workers were kept busy.
+
+    Args:
+        spans: (worker_pid, start, end) wall-clock times of every task.
+        jobs: Number of workers in the pool.
+
+    Returns:
+        A dict with 'tasks', 'makespan' (first start to last end),
+        'utilization' (busy time over jobs * makespan) and 'tail' (time
+        from the first worker running out of work to the build's end).
+    """
+    if not spans:
+        return {"tasks": 0, "makespan": 0.0, "utilization": 0.0, "tail": 0.0}
+    first_start = min(start for _, start, _ in spans)
+    last_end = max(end for _, _, end in spans)
+    makespan = last_end - first_start
+    busy = sum(end - start for _, start, end in spans)
+    worker_last_end = {}
+    for pid, _, end in spans:
+        worker_last_end[pid] = max(end, worker_last_end.get(pid, end))
+    # A worker that never got a task was idle for the whole build
+    first_idle = min(worker_last_end.values()) if len(worker_last_end) >= jobs else first_start
+    return {
+        "tasks": len(spans),
+        "makespan": round(makespan, 3),
+        "utilization": round(busy / (jobs * makespan), 3) if makespan > 0 else 1.0,
+        "tail": round(last_end - first_idle, 3),
+    }
+
+# --- END OF FILE schedule.py ---
@@ -0,0 +1,189 @@
+# --- START OF FILE shard.py ---
+
+import os
+import json
+import shutil
+import hashlib
+
+
+MANIFEST_FILE = ".shard-manifest.json"
+
+
+def parse_shard(spec):
+    """
+    Parses a shard spec like '2/4' into (index, count), with 1 <= index <= count.
+
+    Raises:
+        ValueError: If the spec is malformed or out of range.
+    """
+    try:
+        index_text, count_text = spec.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected i/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard spec '{spec}', need 1 <= i <= N")
+    return index, count
+
+
+def shard_of(rel_path, count):
+    """
+    Returns the 1-based shard that owns rel_path.
+
+    Uses a SHA-1 of the '/'-separated path, so the assignment is the same on
+    every machine, OS and Python process (unlike hash()).
+    """
+    key = rel_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha1(key).digest()[:8], "big") % count + 1
+
+
+def pages_digest(rel_paths):
+    """Digest of a full page list, so shards can prove they saw the same content."""
+    digest = hashlib.sha256()
+    for rel_path in sorted(rel_paths):
+        digest.update(rel_path.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def select_shard(pages, content_dir, index, count):
+    """
+    Filters discovered pages down to the ones owned by shard index of count.
+
+    Args:
+        pages: (markdown_path, html_dest_path) tuples from discover_pages.
+        content_dir: The content root the markdown paths are relative to.
+        index: 1-based shard index.
+        count: Total number of shards.
+
+    Returns:
+        A (selected_pages, all_rel_paths) tuple.
+    """
+    rel_paths = [os.path.relpath(src, content_dir).replace(os.sep, "/") for src, _ in pages]
+    selected = [page for page, rel_path in zip(pages, rel_paths) if shard_of(rel_path, count) == index]
+    return selected, rel_paths
+
+
+def write_shard_manifest(output_dir, index, count, pages, all_rel_paths, backend=None):
+    """
+    Records which pages this shard rendered, relative to its output tree.
+
+    Written through backend when one is given, otherwise to output_dir.
+    """
+    manifest = {
+        "shard": index,
+        "count": count,
+        "total": len(all_rel_paths),
+        "digest": pages_digest(all_rel_paths),
+        "pages": sorted(os.path.relpath(dest, output_dir).replace(os.sep, "/") for _, dest in pages),
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if backend is not None:
+        backend.write_bytes(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+        return manifest
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def _read_manifest(shard_dir):
+    path = os.path.join(shard_dir, MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Shard manifest not found: {path}")
+
+
+def verify_shards(manifests):
+    """
+    Checks that a set of shard manifests covers every page exactly once.
+
+    Raises:
+        ValueError: Describing the first inconsistency found.
+    """
+    if not manifests:
+        raise ValueError("No shards to merge")
+    count = manifests[0]["count"]
+    digest = manifests[0]["digest"]
+    total = manifests[0]["total"]
+    seen_shards = set()
+    owners = {}
+    for manifest in manifests:
+        if manifest["count"] != count or manifest["digest"] != digest:
+            raise ValueError(f"Shard {manifest['shard']}/{manifest['count']} was built from a different "
+                             f"content snapshot or shard count")
+        if manifest["shard"] in seen_shards:
+            raise ValueError(f"Shard {manifest['shard']}/{count} given more than once")
+        seen_shards.add(manifest["shard"])
+        for page in manifest["pages"]:
+            if page in owners:
+                raise ValueError(f"Page '{page}' rendered by shards {owners[page]} and {manifest['shard']}")
+            owners[page] = manifest["shard"]
+    missing_shards = sorted(set(range(1, count + 1)) - seen_shards)
+    if missing_shards:
+        raise ValueError(f"Missing shards: {', '.join(f'{i}/{count}' for i in missing_shards)}")
+    if len(owners) != total:
+        raise ValueError(f"Shards rendered {len(owners)} pages but {total} were discovered")
+
+
+def _merge_file(source_path, dest_path, merged_links):
+    """
+    Copies one shard file into the merged tree. Files that --dedupe
+    hardlinked in the shard are linked again in the merged tree, so the
+    deduplication survives the merge.
+    """
+    stat = os.stat(source_path)
+    # Never write through an existing hardlink into another file's data
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if stat.st_nlink > 1:
+        first = merged_links.get((stat.st_dev, stat.st_ino))
+        if first is not None:
+            try:
+                os.link(first, dest_path)
+                return
+            except OSError:
+                pass  # e.g. cross-device; fall back to a copy
+        merged_links[(stat.st_dev, stat.st_ino)] = dest_path
+    # copy2 keeps mtimes; compressed siblings are copied like any other file
+    shutil.copy2(source_path, dest_path)
+
+
+def merge_shards(shard_dirs, output_dir):
+    """
+    Combines shard output trees into output_dir after verifying that every
+    page is present exactly once.
+
+    Returns:
+        The merged manifest dict, also written to output_dir.
+    """
+    manifests = [_read_manifest(shard_dir) for shard_dir in shard_dirs]
+    verify_shards(manifests)
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        for page in manifest["pages"]:
+            if not os.path.isfile(os.path.join(shard_dir, page)):
+                raise ValueError(f"Page '{page}' listed by shard {manifest['shard']} is missing from {shard_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    merged_links = {}  # (st_dev, st_ino) of a hardlinked shard file -> its first merged path
+    for shard_dir in shard_dirs:
+        for dir_path, _, file_names in os.walk(shard_dir):
+            rel_dir = os.path.relpath(dir_path, shard_dir)
+            os.makedirs(os.path.join(output_dir, rel_dir), exist_ok=True)
+            for name in file_names:
+                if rel_dir == "." and name == MANIFEST_FILE:
+                    continue
+                _merge_file(os.path.join(dir_path, name), os.path.join(output_dir, rel_dir, name), merged_links)
+
+    merged = {
+        "shard": None,
+        "count": manifests[0]["count"],
+        "total": manifests[0]["total"],
+        "digest": manifests[0]["digest"],
+        "pages": sorted(page for manifest in manifests for page in manifest["pages"]),
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=1, sort_keys=True)
+    return merged
+
+# --- END OF FILE shard.py ---
@@ -0,0 +1,87 @@
+# --- START OF FILE test_assets.py ---
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from textnode import TextNode, TextType
+    from assets import AssetMap, fingerprint_name, rewrite_asset_references
+    from htmlnode import copy_directory_recursive, text_node_to_html_node, compile_template
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from textnode import TextNode, TextType
+    from assets import AssetMap, fingerprint_name, rewrite_asset_references
+    from htmlnode import copy_directory_recursive, text_node_to_html_node, compile_template
+
+
+class TestFingerprinting(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        with open(os.path.join(self.static, "index.css"), "w") as f:
+            f.write("body {}")
+        with open(os.path.join(self.static, "images", "tom.png"), "wb") as f:
+            f.write(b"\x89PNG tom")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("tom.png", "abcdef0123456789"), "tom.abcdef0123.png")
+        self.assertEqual(fingerprint_name("LICENSE", "abcdef0123456789"), "LICENSE.abcdef0123")
+
+    def test_copy_records_hashed_names(self):
+        asset_map = AssetMap()
+        copy_directory_recursive(self.static, self.docs, asset_map)
+        self.assertEqual(set(asset_map), {"/index.css", "/images/tom.png"})
+        for url, hashed_url in asset_map.items():
+            self.assertRegex(hashed_url, r"\.[0-9a-f]{10}\.(css|png)$")
+            self.assertTrue(os.path.exists(os.path.join(self.docs, hashed_url.lstrip("/"))))
+            self.assertFalse(os.path.exists(os.path.join(self.docs, url.lstrip("/"))))
+
+    def test_hash_follows_content(self):
+        first, second = AssetMap(), AssetMap()
+        copy_directory_recursive(self.static, self.docs, first)
+        with open(os.path.join(self.static, "index.css"), "w") as f:
+            f.write("body { color: red }")
+        copy_directory_recursive(self.static, self.docs, second)
+        self.assertNotEqual(first["/index.css"], second["/index.css"])
+        self.assertEqual(first["/images/tom.png"], second["/images/tom.png"])
+        self.assertNotEqual(first.digest(), second.digest())
+
+    def test_text_nodes_use_hashed_urls(self):
+        asset_map = {"/images/tom.png": "/images/tom.1234567890.png"}
+        image = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"), asset_map)
+        self.assertEqual(image.props["src"], "/images/tom.1234567890.png")
+        link = text_node_to_html_node(TextNode("home", TextType.LINK, "/"), asset_map)
+        self.assertEqual(link.props["href"], "/")
+
+    def test_rewrite_only_touches_attributes(self):
+        asset_map = {"/index.css": "/index.aaaaaaaaaa.css"}
+        html = '<link href="/index.css" rel="stylesheet" /><p>href="/index.css"</p><img data-src="/index.css">'
+        self.assertEqual(
+            rewrite_asset_references(html, asset_map),
+            '<link href="/index.aaaaaaaaaa.css" rel="stylesheet" /><p>href="/index.css"</p><img data-src="/index.css">',
+        )
+
+    def test_compiled_template_uses_hashed_names(self):
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write('<link href="/index.css" rel="stylesheet" />{{ Content }}')
+        plain, _ = compile_template(template)
+        hashed, _ = compile_template(template, asset_map=AssetMap({"/index.css": "/index.0000000000.css"}))
+        self.assertIn('href="/index.css"', plain)
+        self.assertIn('href="/index.0000000000.css"', hashed)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_assets.py ---
@@ -0,0 +1,119 @@
+# --- START OF FILE test_budget.py ---
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from budget import BudgetedPool, PageBudget, rss_bytes
+    from build import BuildOptions, build_site
+    from bench import write_sample_markdown
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from budget import BudgetedPool, PageBudget, rss_bytes
+    from build import BuildOptions, build_site
+    from bench import write_sample_markdown
+
+
+def _task(kind):
+    if kind == "slow":
+        time.sleep(10)
+    elif kind == "hog":
+        hog = bytearray(300 * 2**20)
+        hog[::4096] = b"x" * len(hog[::4096])  # touch every page so it is resident
+        time.sleep(10)
+    elif kind == "crash":
+        os._exit(1)
+    return kind
+
+
+def _violation(task, violation):
+    return ("violation", task, violation)
+
+
+class TestBudgetedPool(unittest.TestCase):
+
+    def run_pool(self, budget, tasks, jobs=2):
+        pool = BudgetedPool(jobs, budget, _violation)
+        try:
+            return list(pool.imap_unordered(_task, tasks))
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_time_budget_kills_slow_task(self):
+        start = time.monotonic()
+        results = self.run_pool(PageBudget(seconds=0.3), ["fast", "slow", "fast", "fast"])
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(sorted(r for r in results if isinstance(r, str)), ["fast", "fast", "fast"])
+        violations = [r for r in results if not isinstance(r, str)]
+        self.assertEqual(len(violations), 1)
+        _, task, violation = violations[0]
+        self.assertEqual((task, violation.reason), ("slow", "time"))
+        self.assertGreaterEqual(violation.seconds, 0.3)
+
+    @unittest.skipIf(rss_bytes(os.getpid()) is None, "needs /proc to sample worker memory")
+    def test_memory_budget_kills_hog(self):
+        results = self.run_pool(PageBudget(seconds=8, memory_mb=50), ["hog", "fast"], jobs=1)
+        violation = next(r[2] for r in results if not isinstance(r, str))
+        self.assertEqual(violation.reason, "memory")
+        self.assertGreater(violation.memory_bytes, 50 * 2**20)
+        self.assertIn("fast", results)
+
+    def test_crashed_worker_is_reported_and_replaced(self):
+        results = self.run_pool(PageBudget(seconds=5), ["crash", "fast"], jobs=1)
+        self.assertIn("fast", results)
+        self.assertEqual([r[2].reason for r in results if not isinstance(r, str)], ["crashed"])
+
+
+class TestBuildBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        write_sample_markdown(os.path.join(self.content, "huge.md"), 2 * 2**20)
+        with open(os.path.join(self.content, "small.md"), "w") as f:
+            f.write("# Small\n\nFine")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def build(self, skip, incremental=False):
+        options = BuildOptions(budget=PageBudget(seconds=0.3, skip=skip), incremental=incremental,
+                               state_dir=os.path.join(self.root, ".staticweb"))
+        return build_site(os.path.join(self.root, "static"), self.content, self.template, self.docs, options)
+
+    def test_over_budget_page_fails(self):
+        summary = self.build(skip=False)
+        self.assertEqual((summary["rendered"], summary["failed"]), (1, 1))
+        self.assertIn("over time budget", summary["errors"][0]["error"])
+        self.assertEqual(summary["over_budget"][0]["path"], os.path.join(self.content, "huge.md"))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "small.html")))
+        # Budgeted tasks carry no worker spans, so no utilization is claimed
+        self.assertEqual(summary["schedule"], {"pages": 2, "batches": 2})
+
+    def test_over_budget_page_is_skipped(self):
+        summary = self.build(skip=True)
+        self.assertEqual((summary["rendered"], summary["failed"], summary["budget_skipped"]), (1, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "huge.html")))
+
+    def test_skipped_page_is_retried_by_incremental_build(self):
+        self.build(skip=True, incremental=True)
+        summary = self.build(skip=True, incremental=True)
+        self.assertEqual((summary["pages_unchanged"], summary["budget_skipped"]), (1, 1))
+        self.assertEqual(summary["skipped_paths"], [os.path.join(self.content, "huge.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_budget.py ---
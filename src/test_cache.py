@@ -0,0 +1,99 @@
+# --- START OF FILE test_cache.py ---
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Adjust import path if necessary
+try:
+    import output
+    from cache import LocalDirectoryCache, page_cache_key
+    from htmlnode import generate_page
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    import output
+    from cache import LocalDirectoryCache, page_cache_key
+    from htmlnode import generate_page
+
+
+class TestPageCacheKey(unittest.TestCase):
+
+    def test_key_depends_on_every_input(self):
+        base = page_cache_key("# A", "{{ Content }}", "/", False)
+        self.assertEqual(base, page_cache_key("# A", "{{ Content }}", "/", False))
+        self.assertNotEqual(base, page_cache_key("# B", "{{ Content }}", "/", False))
+        self.assertNotEqual(base, page_cache_key("# A", "<p>{{ Content }}</p>", "/", False))
+        self.assertNotEqual(base, page_cache_key("# A", "{{ Content }}", "/site/", False))
+        self.assertNotEqual(base, page_cache_key("# A", "{{ Content }}", "/", True))
+
+    def test_parts_do_not_run_together(self):
+        self.assertNotEqual(page_cache_key("ab", "c", "/"), page_cache_key("b", "ac", "/"))
+
+
+class TestLocalDirectoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = LocalDirectoryCache(os.path.join(self.root, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_miss_then_hit(self):
+        key = page_cache_key("# A", "t", "/")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "<h1>A</h1>")
+        self.assertEqual(self.cache.get(key), "<h1>A</h1>")
+
+    def test_entries_keep_line_endings_and_follow_umask(self):
+        key = page_cache_key("# A", "t", "/")
+        self.cache.put(key, "<pre>a\r\nb\rc</pre>")
+        self.assertEqual(self.cache.get(key), "<pre>a\r\nb\rc</pre>")
+        mode = os.stat(self.cache._path(key)).st_mode & 0o777
+        self.assertEqual(mode, 0o666 & ~output._UMASK)
+
+    def test_unreadable_entry_is_a_miss(self):
+        key = page_cache_key("# A", "t", "/")
+        self.cache.put(key, "<h1>A</h1>")
+        with open(self.cache._path(key), "wb") as f:
+            f.write(b"\xff\xfe broken")
+        self.assertIsNone(self.cache.get(key))
+        os.remove(self.cache._path(key))
+        os.mkdir(self.cache._path(key))
+        self.assertIsNone(self.cache.get(key))
+
+    def test_concurrent_puts_leave_no_temp_files(self):
+        key = page_cache_key("# A", "t", "/")
+        threads = [threading.Thread(target=self.cache.put, args=(key, "<h1>A</h1>" * 1000)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get(key), "<h1>A</h1>" * 1000)
+        entries = os.listdir(os.path.join(self.cache.root, key[:2]))
+        self.assertEqual(entries, [key[2:] + ".html"])
+
+    def test_generate_page_uses_cache(self):
+        template = os.path.join(self.root, "template.html")
+        source = os.path.join(self.root, "index.md")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        with open(source, "w") as f:
+            f.write("# Cached\n\nBody")
+        first = generate_page(source, template, os.path.join(self.root, "a.html"), cache=self.cache)
+        second = generate_page(source, template, os.path.join(self.root, "b.html"), cache=self.cache)
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        with open(os.path.join(self.root, "a.html")) as a, open(os.path.join(self.root, "b.html")) as b:
+            self.assertEqual(a.read(), b.read())
+        third = generate_page(source, template, os.path.join(self.root, "c.html"), base_path="/x/", cache=self.cache)
+        self.assertFalse(third.cache_hit)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_cache.py ---
@@ -0,0 +1,187 @@
+# --- START OF FILE test_changes.py ---
+
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+# Adjust import path if necessary
+try:
+    from changes import detect_changes, record_build
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from changes import detect_changes, record_build
+    from build import BuildOptions, build_site
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+class ChangeDetectionMixin:
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.state = os.path.join(self.root, ".staticweb")
+        self.docs = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write("index.md", "# Home")
+        self.write("blog/index.md", "# Blog")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.content, rel_path)
+        with open(path, "w") as f:
+            f.write(text)
+        # Make sure the mtime moves even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def build(self, fingerprint="v1"):
+        changes = detect_changes(self.content, self.state, self.docs, fingerprint)
+        record_build(self.content, self.state, self.docs, fingerprint, changes)
+        return changes
+
+    def test_first_build_is_full(self):
+        self.assertTrue(self.build().full)
+
+    def test_fingerprint_change_forces_full(self):
+        self.build()
+        self.assertTrue(self.build("v2").full)
+
+    def test_no_changes(self):
+        self.build()
+        changes = self.build()
+        self.assertFalse(changes.full)
+        self.assertEqual(changes.changed, set())
+        self.assertEqual(changes.deleted, set())
+
+    def test_edit_add_and_delete(self):
+        self.build()
+        self.write("blog/index.md", "# Blog, edited")
+        self.write("new.md", "# New")
+        os.remove(os.path.join(self.content, "index.md"))
+        changes = self.build()
+        self.assertEqual(changes.backend, self.backend)
+        self.assertEqual(changes.changed, {"blog/index.md", "new.md"})
+        self.assertEqual(changes.deleted, {"index.md"})
+        self.assertEqual(self.build().changed, set())
+
+    def test_failed_pages_are_retried(self):
+        self.build()
+        changes = detect_changes(self.content, self.state, self.docs, "v1")
+        record_build(self.content, self.state, self.docs, "v1", changes, failed=["index.md"])
+        self.assertEqual(self.build().changed, {"index.md"})
+
+    def test_state_is_kept_per_output_dir(self):
+        self.build()
+        other = os.path.join(self.root, "other")
+        self.assertTrue(detect_changes(self.content, self.state, other, "v1").full)
+
+
+class TestStatChangeDetection(ChangeDetectionMixin, unittest.TestCase):
+    backend = "stat"
+
+    def test_touch_without_edit_is_ignored(self):
+        self.build()
+        self.write("index.md", "# Home")
+        self.assertEqual(self.build().changed, set())
+
+
+@unittest.skipIf(shutil.which("git") is None, "git not installed")
+class TestGitChangeDetection(ChangeDetectionMixin, unittest.TestCase):
+    backend = "git"
+
+    def setUp(self):
+        super().setUp()
+        git(self.root, "init", "-q")
+        git(self.root, "add", "content")
+        git(self.root, "commit", "-q", "-m", "initial")
+
+    def test_committed_changes_detected(self):
+        self.build()
+        self.write("blog/index.md", "# Blog v2")
+        git(self.root, "commit", "-q", "-am", "edit")
+        changes = self.build()
+        self.assertEqual(changes.backend, "git")
+        self.assertEqual(changes.changed, {"blog/index.md"})
+
+    def test_untracked_file_built_once(self):
+        self.build()
+        self.write("draft.md", "# Draft")
+        self.assertEqual(self.build().changed, {"draft.md"})
+        self.assertEqual(self.build().changed, set())
+        os.remove(os.path.join(self.content, "draft.md"))
+        self.assertEqual(self.build().deleted, {"draft.md"})
+
+    def test_non_ascii_name_edited(self):
+        self.write("café.md", "# Café")
+        git(self.root, "add", "content")
+        git(self.root, "commit", "-q", "-m", "cafe")
+        self.build()
+        self.write("café.md", "# Café, edited")
+        changes = self.build()
+        self.assertEqual(changes.changed, {"café.md"})
+        self.assertEqual(changes.deleted, set())
+
+    def test_ignored_file_is_built(self):
+        with open(os.path.join(self.root, ".gitignore"), "w") as f:
+            f.write("content/private.md\n")
+        self.build()
+        self.write("private.md", "# Private")
+        self.assertEqual(self.build().changed, {"private.md"})
+        os.remove(os.path.join(self.content, "private.md"))
+        self.assertEqual(self.build().deleted, {"private.md"})
+
+
+class TestIncrementalBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        for name in ("one", "two"):
+            with open(os.path.join(self.content, f"{name}.md"), "w") as f:
+                f.write(f"# {name}")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def build(self, docs):
+        options = BuildOptions(incremental=True, manifest_path=None, state_dir=os.path.join(self.root, ".staticweb"))
+        return build_site(os.path.join(self.root, "static"), self.content, self.template,
+                          os.path.join(self.root, docs), options)
+
+    def test_second_output_dir_gets_a_full_build(self):
+        self.build("out1")
+        self.assertEqual(self.build("out1")["pages_unchanged"], 2)
+        self.build("out2")
+        self.assertTrue(os.path.exists(os.path.join(self.root, "out2", "one.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "out2", "two.html")))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build("docs")
+        os.remove(os.path.join(self.root, "docs", "one.html"))
+        summary = self.build("docs")
+        self.assertEqual(summary["pages_unchanged"], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "one.html")))
+        self.assertEqual(self.build("docs")["pages_unchanged"], 2)
+        shutil.rmtree(os.path.join(self.root, "docs"))
+        self.build("docs")
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs", "two.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_changes.py ---
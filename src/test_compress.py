@@ -0,0 +1,88 @@
+# --- START OF FILE test_compress.py ---
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from compress import compress_outputs, compress_state_path
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from compress import compress_outputs, compress_state_path
+
+
+class TestCompressOutputs(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.state = tempfile.mkdtemp()
+        self.page = os.path.join(self.root, "index.html")
+        self.write(self.page, b"<p>Hello, Middle-earth!</p>" * 200)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        shutil.rmtree(self.state)
+
+    def write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def test_writes_gzip_sibling(self):
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual(summary["compressed"], 1)
+        self.assertGreater(summary["bytes_saved"], 0)
+        with open(self.page, "rb") as f, gzip.open(self.page + ".gz", "rb") as gz:
+            self.assertEqual(gz.read(), f.read())
+
+    def test_skips_small_and_binary_files(self):
+        self.write(os.path.join(self.root, "tiny.css"), b"body {}")
+        self.write(os.path.join(self.root, "photo.png"), b"\x89PNG" * 1000)
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual(summary["small"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "tiny.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "photo.png.gz")))
+
+    def test_skips_incompressible_files(self):
+        self.write(os.path.join(self.root, "noise.txt"), os.urandom(4096))
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual(summary["incompressible"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "noise.txt.gz")))
+
+    def test_incremental_run_skips_unchanged(self):
+        compress_outputs(self.root, self.state)
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(summary["compressed"], 0)
+        self.assertTrue(os.path.exists(compress_state_path(self.state, self.root)))
+        self.assertEqual(sorted(os.listdir(self.root)), ["index.html", "index.html.gz"])
+
+    def test_rewritten_identical_output_is_not_recompressed(self):
+        compress_outputs(self.root, self.state)
+        self.write(self.page, b"<p>Hello, Middle-earth!</p>" * 200)
+        os.utime(self.page, ns=(10**9, 10**9))
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual((summary["unchanged"], summary["compressed"]), (1, 0))
+
+    def test_changed_output_is_recompressed(self):
+        compress_outputs(self.root, self.state)
+        self.write(self.page, b"<p>Changed</p>" * 300)
+        summary = compress_outputs(self.root, self.state)
+        self.assertEqual(summary["compressed"], 1)
+        with gzip.open(self.page + ".gz", "rb") as gz:
+            self.assertEqual(gz.read(), b"<p>Changed</p>" * 300)
+
+    def test_removed_output_drops_sibling(self):
+        compress_outputs(self.root, self.state)
+        os.remove(self.page)
+        compress_outputs(self.root, self.state)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_compress.py ---
@@ -0,0 +1,123 @@
+# --- START OF FILE test_content.py ---
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from content import DirectorySource, PackedSource, SqliteSource, open_content_source, pack_content
+    from output import MemoryBackend
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from content import DirectorySource, PackedSource, SqliteSource, open_content_source, pack_content
+    from output import MemoryBackend
+    from build import BuildOptions, build_site
+
+
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+class TestContentSources(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.state = os.path.join(self.root, ".staticweb")
+        self.write("index.md", "# Home\n\nWelcome")
+        self.write("blog/first.md", "# First\n\nOne")
+        self.write("blog/second.md", "# Second\n\nTwo with **bold**")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.content, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, source, **options):
+        backend = MemoryBackend(root=self.docs)
+        summary = build_site(os.path.join(self.root, "static"), self.content, self.template, self.docs,
+                             BuildOptions(manifest_path=None, state_dir=self.state, **options),
+                             backend=backend, source=source)
+        return summary, backend.files
+
+    def packed(self, name):
+        path = os.path.join(self.root, name)
+        self.assertEqual(pack_content(self.content, path), 3)
+        return open_content_source(path)
+
+    def test_packed_sources_render_like_the_directory(self):
+        _, expected = self.build(DirectorySource(self.content))
+        self.assertEqual(len(expected), 3)
+        for name in ("content.tar", "content.tar.gz", "content.zip", "content.db"):
+            with self.subTest(name=name), self.packed(name) as source:
+                summary, files = self.build(source)
+                self.assertEqual(summary["failed"], 0)
+                self.assertEqual(files, expected)
+
+    def test_crlf_pages_render_like_lf_from_every_source(self):
+        with open(os.path.join(self.content, "blog", "second.md"), "wb") as f:
+            f.write(b"# Second\r\n\r\nTwo with **bold**\r\n\r\n- a\r\n- b\r\n")
+        _, expected = self.build(DirectorySource(self.content))
+        self.assertIn(b"<p>Two with <b>bold</b></p><ul>", expected["blog/second.html"])
+        for name in ("content.tar.gz", "content.zip"):
+            with self.subTest(name=name), self.packed(name) as source:
+                self.assertEqual(self.build(source)[1], expected)
+        with self.packed("content.db") as source:
+            source.connection.execute("UPDATE pages SET markdown = ? WHERE path = 'blog/second.md'",
+                                      ("# Second\r\n\r\nTwo with **bold**\r\n\r\n- a\r\n- b\r\n",))
+            self.assertEqual(self.build(source)[1], expected)
+
+    def test_parallel_build_from_sqlite(self):
+        with self.packed("content.sqlite") as source:
+            summary, files = self.build(source, jobs=2)
+        self.assertEqual(summary["rendered"], 3)
+        self.assertIn(b"<b>bold</b>", files["blog/second.html"])
+
+    def test_open_content_source_picks_type(self):
+        self.assertIsInstance(open_content_source(self.content), DirectorySource)
+        pack_content(self.content, os.path.join(self.root, "c.tgz"))
+        self.assertIsInstance(open_content_source(os.path.join(self.root, "c.tgz")), PackedSource)
+        with self.assertRaises(ValueError):
+            open_content_source(os.path.join(self.root, "c.rar"))
+
+    def test_sqlite_entries_and_subset(self):
+        with self.packed("content.db") as source:
+            self.assertEqual(source.page_paths(), ["blog/first.md", "blog/second.md", "index.md"])
+            self.assertEqual(source.entries()["index.md"][1], len("# Home\n\nWelcome"))
+            self.assertEqual(dict(source.iter_markdown(["blog/first.md"])), {"blog/first.md": "# First\n\nOne"})
+
+    def test_incremental_build_from_sqlite(self):
+        db_path = os.path.join(self.root, "content.db")
+        pack_content(self.content, db_path)
+        options = BuildOptions(manifest_path=None, state_dir=self.state, incremental=True)
+        with SqliteSource(db_path) as source:
+            summary = build_site("static", self.content, self.template, self.docs, options, source=source)
+        self.assertEqual(summary["rendered"], 3)
+
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("UPDATE pages SET markdown = ?, mtime = mtime + 10 WHERE path = ?",
+                               ("# First\n\nEdited", "blog/first.md"))
+        connection.close()
+        with SqliteSource(db_path) as source:
+            summary = build_site("static", self.content, self.template, self.docs, options, source=source)
+        self.assertEqual(summary["rendered"], 1)
+        with open(os.path.join(self.docs, "blog", "first.html")) as f:
+            self.assertIn("Edited", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_content.py ---
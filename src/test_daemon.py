@@ -0,0 +1,136 @@
+# --- START OF FILE test_daemon.py ---
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Adjust import path if necessary
+try:
+    from build import BuildOptions
+    from daemon import BuildDaemon
+    from client import send_command
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from build import BuildOptions
+    from daemon import BuildDaemon
+    from client import send_command
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestBuildDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.socket_path = os.path.join(self.root, "daemon.sock")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def make_daemon(self, **options):
+        return BuildDaemon(self.socket_path, self.static, self.content, self.template,
+                           self.docs, BuildOptions(**options))
+
+    def test_first_build_renders_everything(self):
+        daemon = self.make_daemon()
+        summary = daemon.build()
+        daemon.close()
+        self.assertEqual(summary["rendered"], 2)
+        self.assertEqual(summary["skipped"], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.css")))
+        with open(os.path.join(self.docs, "blog", "index.html"), encoding="utf-8") as f:
+            self.assertIn("<h1>Blog</h1>", f.read())
+
+    def test_rebuild_skips_unchanged_pages(self):
+        daemon = self.make_daemon()
+        daemon.build()
+        index_md = os.path.join(self.content, "index.md")
+        self.write(index_md, "# Home\n\nWelcome back, friend")
+        os.utime(index_md, ns=(time.time_ns(), time.time_ns() + 10**9))
+        summary = daemon.build()
+        daemon.close()
+        self.assertEqual(summary["rendered"], 1)
+        self.assertEqual(summary["skipped"], 1)
+
+    def test_template_change_rebuilds_all(self):
+        daemon = self.make_daemon()
+        daemon.build()
+        self.write(self.template, TEMPLATE + "\n<!-- changed -->")
+        os.utime(self.template, ns=(time.time_ns(), time.time_ns() + 10**9))
+        summary = daemon.build()
+        daemon.close()
+        self.assertEqual(summary["rendered"], 2)
+
+    def test_build_paths_forces_listed_pages(self):
+        daemon = self.make_daemon()
+        daemon.build()
+        blog_md = os.path.join(self.content, "blog", "index.md")
+        summary = daemon.build([blog_md, os.path.join(self.content, "nope.md")])
+        daemon.close()
+        self.assertEqual(summary["rendered"], 1)
+        self.assertEqual(summary["missing"], [os.path.normpath(os.path.join(self.content, "nope.md"))])
+
+    def test_deleted_sources_and_renamed_assets_lose_their_outputs(self):
+        daemon = self.make_daemon(fingerprint=True)
+        daemon.build()
+        old_assets = set(os.listdir(self.docs)) - {"index.html", "blog"}
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        summary = daemon.build()
+        daemon.close()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        new_assets = set(os.listdir(self.docs)) - {"index.html"}
+        self.assertEqual(len(new_assets), len(old_assets))
+        self.assertFalse(old_assets & new_assets)
+        self.assertGreaterEqual(summary["stale_removed"], 1)
+
+    def test_socket_round_trip(self):
+        daemon = self.make_daemon()
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            for _ in range(100):
+                if os.path.exists(self.socket_path):
+                    break
+                time.sleep(0.01)
+            reply = send_command(self.socket_path, "build", timeout=10)
+            self.assertTrue(reply["ok"])
+            self.assertEqual(reply["result"]["rendered"], 2)
+
+            reply = send_command(self.socket_path, "status", timeout=10)
+            self.assertEqual(reply["result"]["pages"], 2)
+            self.assertEqual(reply["result"]["builds"], 1)
+
+            reply = send_command(self.socket_path, "bogus", timeout=10)
+            self.assertFalse(reply["ok"])
+        finally:
+            send_command(self.socket_path, "stop", timeout=10)
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_daemon.py ---
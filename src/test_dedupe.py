@@ -0,0 +1,75 @@
+# --- START OF FILE test_dedupe.py ---
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from assets import AssetMap, DedupeIndex
+    from htmlnode import copy_directory_recursive
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from assets import AssetMap, DedupeIndex
+    from htmlnode import copy_directory_recursive
+
+
+PHOTO = b"\x89PNG" + b"\x00" * 1000
+
+
+class TestDedupe(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        for folder in ("a", "b", "c"):
+            os.makedirs(os.path.join(self.static, "blog", folder))
+            self.write(os.path.join(self.static, "blog", folder, "photo.png"), PHOTO)
+        self.write(os.path.join(self.static, "blog", "c", "other.png"), b"different")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def photo(self, folder):
+        return os.path.join(self.docs, "blog", folder, "photo.png")
+
+    def test_identical_files_are_hardlinked(self):
+        index = DedupeIndex()
+        copy_directory_recursive(self.static, self.docs, dedupe_index=index)
+        self.assertEqual(len(index.paths), 2)
+        self.assertEqual(index.linked, 2)
+        self.assertEqual(index.saved_bytes, 2 * len(PHOTO))
+        inodes = {os.stat(self.photo(folder)).st_ino for folder in ("a", "b", "c")}
+        self.assertEqual(len(inodes), 1)
+        with open(self.photo("b"), "rb") as f:
+            self.assertEqual(f.read(), PHOTO)
+
+    def test_recopy_does_not_write_through_links(self):
+        copy_directory_recursive(self.static, self.docs, dedupe_index=DedupeIndex())
+        self.write(os.path.join(self.static, "blog", "b", "photo.png"), b"edited")
+        copy_directory_recursive(self.static, self.docs, dedupe_index=DedupeIndex())
+        with open(self.photo("a"), "rb") as f:
+            self.assertEqual(f.read(), PHOTO)
+        with open(self.photo("b"), "rb") as f:
+            self.assertEqual(f.read(), b"edited")
+
+    def test_combines_with_fingerprinting(self):
+        asset_map = AssetMap()
+        index = DedupeIndex()
+        copy_directory_recursive(self.static, self.docs, asset_map, dedupe_index=index)
+        self.assertEqual(index.linked, 2)
+        hashed = [asset_map[f"/blog/{folder}/photo.png"] for folder in ("a", "b", "c")]
+        self.assertEqual(len({os.path.basename(url) for url in hashed}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_dedupe.py ---
@@ -166,5 +166,33 @@ class TestParentNode(unittest.TestCase):
             "<div><h1>Heading</h1>Text between elements<ul><li>Item 1</li><li>Item 2</li></ul></div>",
         )
 
+    def test_escape_text_fast_path_returns_same_string(self):
+        text = "Nothing special here, just 'quotes' and \"more\"."
+        self.assertIs(escape_text(text), text)
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+
+    def test_escape_attribute(self):
+        value = "/images/photo.png"
+        self.assertIs(escape_attribute(value), value)
+        self.assertEqual(escape_attribute('say "hi" & \'bye\' <now>'),
+                         "say &quot;hi&quot; &amp; &#x27;bye&#x27; &lt;now&gt;")
+
+    def test_leaf_values_and_props_are_escaped(self):
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+        self.assertEqual(LeafNode("code", "if a < b && c:").to_html(), "<code>if a &lt; b &amp;&amp; c:</code>")
+        node = LeafNode("a", "Q&A", {"href": '/search?q="x"&page=2'})
+        self.assertEqual(node.to_html(), '<a href="/search?q=&quot;x&quot;&amp;page=2">Q&amp;A</a>')
+
+    def test_code_block_markup_is_escaped(self):
+        node = markdown_to_html_node("```\n<script>alert('x')</script>\n```")
+        self.assertEqual(node.to_html(),
+                         "<div><pre><code>&lt;script&gt;alert('x')&lt;/script&gt;</code></pre></div>")
+
+    def test_void_elements_have_no_end_tag(self):
+        node = LeafNode("img", "", {"src": "a.png", "alt": "A & B"})
+        self.assertEqual(node.to_html(), '<img src="a.png" alt="A &amp; B">')
+        self.assertEqual(LeafNode("br", "").to_html(), "<br>")
+        self.assertEqual(ParentNode("p", [LeafNode(None, "x"), LeafNode("br", "")]).to_html(), "<p>x<br></p>")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+# --- START OF FILE test_inline_scanner.py ---
+
+import re
+import time
+import random
+import unittest
+
+# Adjust import path if necessary
+try:
+    from htmlnode import extract_markdown_images, extract_markdown_links, iter_inline_links, text_to_textnodes
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from htmlnode import extract_markdown_images, extract_markdown_links, iter_inline_links, text_to_textnodes
+
+
+# The patterns the scanner replaced; it must match exactly what they match
+IMAGE_PATTERN = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_PATTERN = re.compile(r"(?<!\!)\[(.*?)\]\((.*?)\)")
+
+ALPHABET = ["!", "[", "]", "(", ")", "](", "![", "\n", "a", " ", "é"]
+
+
+class TestInlineScanner(unittest.TestCase):
+
+    def assert_matches_regex(self, text):
+        for image, pattern in ((True, IMAGE_PATTERN), (False, LINK_PATTERN)):
+            expected = [(m.start(), m.end(), m.group(1), m.group(2)) for m in pattern.finditer(text)]
+            self.assertEqual(list(iter_inline_links(text, image)), expected, msg=repr(text))
+
+    def test_fuzz_against_regex(self):
+        rng = random.Random(1234)
+        for _ in range(5000):
+            text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+            self.assert_matches_regex(text)
+
+    def test_edge_cases(self):
+        for text in ("", "![](x)", "[]()", "![a](b)[c](d)", "![a](b\n)", "[a\n](b)", "![a](b ](c)",
+                     "!![a](b)", "![[a]](b)", "[a](b))", "x![a](![b](c))", "[a]\n(b)"):
+            with self.subTest(text=text):
+                self.assert_matches_regex(text)
+
+    def test_extract_wrappers(self):
+        text = "![img](i.png) and [link](l) and ![two](t.png)"
+        self.assertEqual(extract_markdown_images(text), [("img", "i.png"), ("two", "t.png")])
+        self.assertEqual(extract_markdown_links(text), [("link", "l")])
+
+    def test_adversarial_inputs_stay_fast(self):
+        # Each of these takes the regex versions seconds to minutes
+        for text in ("![" * 100000, "[" * 200000, "[a](" * 50000, "![a](b)" * 30000):
+            start = time.perf_counter()
+            text_to_textnodes(text)
+            list(iter_inline_links(text, image=False))
+            self.assertLess(time.perf_counter() - start, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_inline_scanner.py ---
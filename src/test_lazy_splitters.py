@@ -0,0 +1,101 @@
+# --- START OF FILE test_lazy_splitters.py ---
+
+import unittest
+
+# Adjust import path if necessary
+try:
+    from textnode import TextNode, TextType
+    from htmlnode import (iter_split_nodes_delimiter, iter_split_nodes_image, iter_split_nodes_link,
+                          iter_text_to_textnodes, split_nodes_delimiter, text_to_textnodes)
+    from htmlnode import (MARK_BACKTICK, MARK_BOLD, MARK_ASTERISK, MARK_IMAGE, MARK_LINK, MARK_UNDERSCORE,
+                          inline_stage_stats, reset_inline_stage_stats, scan_inline_markers)
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from textnode import TextNode, TextType
+    from htmlnode import (iter_split_nodes_delimiter, iter_split_nodes_image, iter_split_nodes_link,
+                          iter_text_to_textnodes, split_nodes_delimiter, text_to_textnodes)
+    from htmlnode import (MARK_BACKTICK, MARK_BOLD, MARK_ASTERISK, MARK_IMAGE, MARK_LINK, MARK_UNDERSCORE,
+                          inline_stage_stats, reset_inline_stage_stats, scan_inline_markers)
+
+
+class TestLazySplitters(unittest.TestCase):
+
+    def test_generators_are_lazy(self):
+        def endless():
+            yield TextNode("a **b** c", TextType.TEXT)
+            while True:
+                yield TextNode("plain", TextType.TEXT)
+
+        nodes = iter_split_nodes_delimiter(endless(), "**", TextType.BOLD)
+        self.assertEqual([next(nodes) for _ in range(3)], [
+            TextNode("a ", TextType.TEXT),
+            TextNode("b", TextType.BOLD),
+            TextNode(" c", TextType.TEXT),
+        ])
+
+    def test_chained_generators(self):
+        source = iter([TextNode("![i](/i.png) and [l](/l) text", TextType.TEXT)])
+        nodes = list(iter_split_nodes_link(iter_split_nodes_image(source)))
+        self.assertEqual(nodes, [
+            TextNode("i", TextType.IMAGE, "/i.png"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("l", TextType.LINK, "/l"),
+            TextNode(" text", TextType.TEXT),
+        ])
+
+    def test_lazy_pipeline_matches_list_api(self):
+        text = "**b** _i_ *j* `c` [l](/l) ![i](/i.png) tail"
+        self.assertEqual(list(iter_text_to_textnodes(text)), text_to_textnodes(text))
+        self.assertIsInstance(text_to_textnodes(text), list)
+        self.assertEqual(list(iter_text_to_textnodes("")), [])
+
+    def test_wrapper_raises_eagerly(self):
+        with self.assertRaises(ValueError):
+            split_nodes_delimiter([TextNode("a **b", TextType.TEXT)], "**", TextType.BOLD)
+
+
+class TestInlinePrescan(unittest.TestCase):
+
+    def setUp(self):
+        reset_inline_stage_stats()
+
+    def all_stages(self, text):
+        nodes = iter([TextNode(text, TextType.TEXT)])
+        nodes = iter_split_nodes_link(iter_split_nodes_image(nodes))
+        for delimiter, text_type in (("**", TextType.BOLD), ("*", TextType.ITALIC), ("_", TextType.ITALIC),
+                                     ("`", TextType.CODE)):
+            nodes = iter_split_nodes_delimiter(nodes, delimiter, text_type)
+        return list(nodes)
+
+    def test_scan_inline_markers(self):
+        self.assertEqual(scan_inline_markers("plain words"), 0)
+        self.assertEqual(scan_inline_markers("a [l](/l)"), MARK_LINK)
+        self.assertEqual(scan_inline_markers("![i](/i.png)"), MARK_IMAGE | MARK_LINK)
+        self.assertEqual(scan_inline_markers("*i* **b**"), MARK_ASTERISK | MARK_BOLD)
+        self.assertEqual(scan_inline_markers("_i_ `c`"), MARK_UNDERSCORE | MARK_BACKTICK)
+        # '![' without '](' cannot start an image
+        self.assertEqual(scan_inline_markers("![ and ["), 0)
+
+    def test_prescan_matches_all_stages(self):
+        for text in ("plain", "**b** _i_ *j* `c` [l](/l) ![i](/i.png) tail", "snake_case_name",
+                     "![alt *x*](/a_b.png) and `x` only", "[l](/x) then **b**", "a ** b ** c"):
+            with self.subTest(text=text):
+                self.assertEqual(list(iter_text_to_textnodes(text)), self.all_stages(text))
+
+    def test_skipped_stages_are_counted(self):
+        for text in ("plain", "more plain", "**b** and [l](/l)"):
+            list(iter_text_to_textnodes(text))
+        stats = inline_stage_stats()
+        self.assertEqual(stats["texts"], 3)
+        self.assertEqual(stats["skipped"], {"image": 3, "link": 2, "bold": 2, "italic_asterisk": 2,
+                                            "italic_underscore": 3, "code": 3})
+        reset_inline_stage_stats()
+        self.assertEqual(inline_stage_stats()["texts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_lazy_splitters.py ---
@@ -0,0 +1,88 @@
+# --- START OF FILE test_manifest.py ---
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from manifest import default_manifest_path, write_manifest, diff_manifests
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from manifest import default_manifest_path, write_manifest, diff_manifests
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.docs = os.path.join(self.root, "docs")
+        self.manifest = os.path.join(self.root, "state", "manifest.json")
+        os.makedirs(os.path.join(self.docs, "blog"))
+        self.write("index.html", "<p>home</p>")
+        self.write("blog/index.html", "<p>blog</p>")
+        self.write("index.css", "body {}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.docs, rel_path), "w") as f:
+            f.write(text)
+
+    def test_first_manifest_lists_everything_as_added(self):
+        manifest = write_manifest(self.docs, self.manifest)
+        self.assertEqual(set(manifest["files"]), {"index.html", "blog/index.html", "index.css"})
+        self.assertEqual(manifest["files"]["index.css"]["size"], 7)
+        self.assertEqual(manifest["delta"]["added"], ["blog/index.html", "index.css", "index.html"])
+        with open(self.manifest) as f:
+            self.assertEqual(json.load(f)["files"], manifest["files"])
+
+    def test_typo_fix_is_a_one_file_delta(self):
+        write_manifest(self.docs, self.manifest)
+        self.write("blog/index.html", "<p>blog!</p>")
+        delta = write_manifest(self.docs, self.manifest)["delta"]
+        self.assertEqual(delta, {"added": [], "modified": ["blog/index.html"], "removed": []})
+
+    def test_rewrite_with_same_bytes_is_not_modified(self):
+        write_manifest(self.docs, self.manifest)
+        shutil.rmtree(self.docs)
+        os.makedirs(os.path.join(self.docs, "blog"))
+        self.write("index.html", "<p>home</p>")
+        self.write("blog/index.html", "<p>blog</p>")
+        delta = write_manifest(self.docs, self.manifest)["delta"]
+        self.assertEqual(delta, {"added": [], "modified": [], "removed": ["index.css"]})
+
+    def test_internal_files_are_excluded(self):
+        self.write(".shard-manifest.json", "{}")
+        manifest = write_manifest(self.docs, self.manifest)
+        self.assertNotIn(".shard-manifest.json", manifest["files"])
+
+    def test_other_output_dir_is_a_full_upload(self):
+        write_manifest(self.docs, self.manifest)
+        other = os.path.join(self.root, "other")
+        os.makedirs(other)
+        with open(os.path.join(other, "index.html"), "w") as f:
+            f.write("<p>home</p>")
+        delta = write_manifest(other, self.manifest)["delta"]
+        self.assertEqual(delta, {"added": ["index.html"], "modified": [], "removed": []})
+
+    def test_default_path_per_output_dir(self):
+        state = os.path.join(self.root, "state")
+        self.assertEqual(default_manifest_path(state, self.docs), default_manifest_path(state, self.docs + "/"))
+        self.assertNotEqual(default_manifest_path(state, self.docs),
+                            default_manifest_path(state, os.path.join(self.root, "other")))
+
+    def test_diff_manifests(self):
+        old = {"a": {"sha256": "1"}, "b": {"sha256": "2"}}
+        new = {"b": {"sha256": "3"}, "c": {"sha256": "4"}}
+        self.assertEqual(diff_manifests(old, new), {"added": ["c"], "modified": ["b"], "removed": ["a"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_manifest.py ---
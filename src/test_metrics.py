@@ -0,0 +1,161 @@
+# --- START OF FILE test_metrics.py ---
+
+import os
+import csv
+import json
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+# Adjust import path if necessary
+try:
+    from metrics import Histogram, PageMetrics, count_nodes, format_page_report, format_prometheus
+    from htmlnode import LeafNode, ParentNode, generate_page
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from metrics import Histogram, PageMetrics, count_nodes, format_page_report, format_prometheus
+    from htmlnode import LeafNode, ParentNode, generate_page
+    from build import BuildOptions, build_site
+
+
+def row(source, seconds, source_bytes):
+    return {"source": source, "dest": source + ".html", "seconds": seconds, "source_bytes": source_bytes,
+            "blocks": 1, "nodes": 2, "parse_seconds": 0.0, "render_seconds": 0.0, "output_bytes": 10,
+            "cache_hit": False}
+
+
+class TestPageMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_count_nodes(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "c")]), LeafNode("hr", "")])
+        self.assertEqual(count_nodes(node), 5)
+
+    def test_top_pages_are_kept(self):
+        metrics = PageMetrics(top=2)
+        for i, (seconds, size) in enumerate([(0.1, 500), (0.5, 100), (0.3, 900), (0.2, 50)]):
+            metrics.add(row(f"p{i}.md", seconds, size))
+        self.assertEqual([r["source"] for r in metrics.slowest()], ["p1.md", "p2.md"])
+        self.assertEqual([r["source"] for r in metrics.largest()], ["p2.md", "p0.md"])
+        self.assertEqual(metrics.count, 4)
+        lines = format_page_report(metrics.slowest(), metrics.largest())
+        self.assertEqual(lines[0], "Slowest pages:")
+        self.assertIn("Largest pages:", lines)
+
+    def test_table_written_as_csv_and_json(self):
+        for name in ("pages.csv", "pages.json"):
+            path = os.path.join(self.root, name)
+            with PageMetrics(top=0, path=path) as metrics:
+                metrics.add(row("a.md", 0.1, 10))
+                metrics.add(row("b.md", 0.2, 20))
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f)) if name.endswith(".csv") else json.load(f)
+            self.assertEqual([r["source"] for r in rows], ["a.md", "b.md"])
+            self.assertEqual(str(rows[1]["source_bytes"]), "20")
+        with self.assertRaises(ValueError):
+            PageMetrics(path=os.path.join(self.root, "pages.txt"))
+
+    def test_generate_page_reports_page_stats(self):
+        source = os.path.join(self.root, "page.md")
+        with open(source, "w") as f:
+            f.write("# Title\n\nSome **bold** text.\n\n- one\n- two")
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        result = generate_page(source, template, os.path.join(self.root, "page.html"))
+        self.assertEqual(result.source_bytes, os.path.getsize(source))
+        self.assertEqual(result.blocks, 3)
+        # div, h1, text, p, text, b, text, ul, li, text, li, text
+        self.assertEqual(result.nodes, 12)
+        self.assertGreater(result.parse_seconds, 0)
+        self.assertGreater(result.render_seconds, 0)
+
+    def test_build_reports_slowest_and_largest(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        for i in range(6):
+            with open(os.path.join(content, f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\n" + "words " * (i * 100))
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        table = os.path.join(self.root, "pages.json")
+        options = BuildOptions(state_dir=os.path.join(self.root, ".staticweb"), top_pages=3,
+                               page_metrics_path=table)
+        summary = build_site(os.path.join(self.root, "static"), content, template,
+                             os.path.join(self.root, "docs"), options)
+        self.assertEqual(len(summary["slowest"]), 3)
+        self.assertEqual([os.path.basename(r["source"]) for r in summary["largest"]],
+                         ["page5.md", "page4.md", "page3.md"])
+        with open(table) as f:
+            self.assertEqual(len(json.load(f)), 6)
+
+    def test_histogram_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+    def test_build_writes_prometheus_textfile(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        for i in range(3):
+            with open(os.path.join(content, f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\nText.")
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        metrics_path = os.path.join(self.root, "textfile", "staticweb.prom")
+        options = BuildOptions(state_dir=os.path.join(self.root, ".staticweb"), metrics_path=metrics_path)
+        summary = build_site(os.path.join(self.root, "static"), content, template,
+                             os.path.join(self.root, "docs"), options)
+        self.assertEqual(summary["bytes_read"], sum(os.path.getsize(os.path.join(content, name))
+                                                    for name in os.listdir(content)))
+        self.assertIn("total", summary["stages"])
+        with open(metrics_path) as f:
+            text = f.read()
+        samples = dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+        self.assertEqual(samples["staticweb_build_pages_rendered"], "3")
+        self.assertEqual(samples["staticweb_build_cache_hit_ratio"], "0.0")
+        self.assertEqual(samples['staticweb_page_stage_seconds_bucket{stage="page",le="+Inf"}'], "3")
+        self.assertEqual(samples['staticweb_page_stage_seconds_count{stage="parse"}'], "3")
+        self.assertIn('staticweb_build_duration_seconds{stage="pages"}', samples)
+        self.assertGreater(int(samples['staticweb_build_peak_rss_bytes{process="main"}']), 0)
+        self.assertIn("# TYPE staticweb_page_stage_seconds histogram", text)
+        self.assertEqual(os.listdir(os.path.dirname(metrics_path)), ["staticweb.prom"])
+
+    def test_prometheus_buckets_are_cumulative(self):
+        summary = {"rendered": 4, "failed": 0, "cache_hits": 1, "bytes_written": 10, "changed_outputs": [],
+                   "seconds": 1.0, "histograms": {"page": {"buckets": [0.1, 1.0], "counts": [2, 1],
+                                                           "count": 4, "sum": 3.65}}}
+        text = format_prometheus(summary)
+        self.assertIn('staticweb_page_stage_seconds_bucket{stage="page",le="0.1"} 2', text)
+        self.assertIn('staticweb_page_stage_seconds_bucket{stage="page",le="1.0"} 3', text)
+        self.assertIn('staticweb_page_stage_seconds_bucket{stage="page",le="+Inf"} 4', text)
+        self.assertIn("staticweb_build_cache_hit_ratio 0.25", text)
+
+    def test_worker_peak_omitted_before_any_worker_exits(self):
+        # A fresh interpreter has reaped no children, like a daemon with a live pool
+        code = ("from metrics import format_prometheus; print(format_prometheus({'rendered': 0, 'failed': 0, "
+                "'cache_hits': 0, 'bytes_written': 0, 'changed_outputs': [], 'seconds': 0.0}))")
+        text = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout
+        self.assertIn('staticweb_build_peak_rss_bytes{process="main"}', text)
+        self.assertNotIn('process="worker"', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_metrics.py ---
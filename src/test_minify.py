@@ -0,0 +1,104 @@
+# --- START OF FILE test_minify.py ---
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from minify import collapse_whitespace, minify_html, minify_node
+    from htmlnode import markdown_to_html_node, generate_page
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from minify import collapse_whitespace, minify_html, minify_node
+    from htmlnode import markdown_to_html_node, generate_page
+
+
+class TestMinify(unittest.TestCase):
+
+    def test_collapse_whitespace_keeps_edges(self):
+        self.assertEqual(collapse_whitespace("  a \n\n b  "), " a b ")
+        self.assertEqual(collapse_whitespace("a\nb"), "a b")
+        self.assertEqual(collapse_whitespace("\n  \n"), " ")
+        self.assertEqual(collapse_whitespace(""), "")
+
+    def test_non_breaking_spaces_are_content(self):
+        self.assertEqual(collapse_whitespace("a\u00a0\u00a0 \n b\u2003"), "a\u00a0\u00a0 b\u2003")
+        self.assertEqual(collapse_whitespace("\u00a0x"), "\u00a0x")
+        self.assertEqual(minify_html("<p>\u00a0Price:\u00a010\u00a0€ </p>"), "<p>\u00a0Price:\u00a010\u00a0€</p>")
+        node = markdown_to_html_node("caf\u00e9 \u00a0  menu")
+        self.assertEqual(minify_node(node), 1)
+        self.assertEqual(node.to_html(), "<div><p>caf\u00e9 \u00a0 menu</p></div>")
+
+    def test_template_indentation_removed(self):
+        template = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+        self.assertEqual(
+            minify_html(template),
+            "<!doctype html><html><head><title>{{ Title }}</title></head>"
+            "<body><article>{{ Content }}</article></body></html>",
+        )
+
+    def test_inline_spacing_kept(self):
+        html = "<p>Hello   <b>brave</b>\n  <i>new</i> world</p>"
+        self.assertEqual(minify_html(html), "<p>Hello <b>brave</b> <i>new</i> world</p>")
+
+    def test_pre_content_preserved(self):
+        html = "<div>\n  <pre><code>  indented\n    more</code></pre>\n</div>"
+        self.assertEqual(minify_html(html), "<div><pre><code>  indented\n    more</code></pre></div>")
+
+    def test_comments_and_attributes_untouched(self):
+        html = '<div   class="a  b">\n<!-- keep  me -->\n</div>'
+        self.assertEqual(minify_html(html), '<div   class="a  b"><!-- keep  me --></div>')
+
+    def test_minify_node_tree(self):
+        node = markdown_to_html_node("Some   text\nwrapped  here\n\n```\n  code   block\n```")
+        saved = minify_node(node)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>Some text wrapped here</p><pre><code>  code   block</code></pre></div>",
+        )
+        self.assertEqual(saved, 3)
+
+
+class TestGeneratePageMinify(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.template = os.path.join(self.root, "template.html")
+        self.source = os.path.join(self.root, "index.md")
+        with open(self.template, "w", encoding="utf-8") as f:
+            f.write("<html>\n  <body>\n    <article>{{ Content }}</article>\n  </body>\n</html>")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Title\n\nA   wide\nparagraph")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_reports_bytes_saved(self):
+        plain = generate_page(self.source, self.template, os.path.join(self.root, "plain.html"))
+        small = generate_page(self.source, self.template, os.path.join(self.root, "small.html"), minify=True)
+        self.assertEqual(plain.bytes_saved, 0)
+        self.assertGreater(small.bytes_saved, 0)
+        self.assertEqual(plain.output_bytes - small.output_bytes, small.bytes_saved)
+        with open(os.path.join(self.root, "small.html"), encoding="utf-8") as f:
+            self.assertEqual(
+                f.read(),
+                "<html><body><article><div><h1>Title</h1><p>A wide paragraph</p></div></article></body></html>",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_minify.py ---
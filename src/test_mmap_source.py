@@ -0,0 +1,107 @@
+# --- START OF FILE test_mmap_source.py ---
+
+import os
+import mmap
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    import htmlnode
+    from htmlnode import (extract_title, generate_page, iter_buffer_blocks, markdown_to_blocks,
+                          markdown_to_html_node, open_markdown_source)
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    import htmlnode
+    from htmlnode import (extract_title, generate_page, iter_buffer_blocks, markdown_to_blocks,
+                          markdown_to_html_node, open_markdown_source)
+
+
+MARKDOWN = """# Tëst title
+
+Paragraph with **bold** and `code`, ünïcödé.
+
+
+- one
+- two
+
+```
+code block
+```
+
+> quoted
+> text
+
+
+"""
+
+
+class TestMappedMarkdown(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.md_path = os.path.join(self.root, "page.md")
+        with open(self.md_path, "w", encoding="utf-8") as f:
+            f.write(MARKDOWN)
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_buffer_blocks_match_string_blocks(self):
+        for text in (MARKDOWN, "", "\n\n", "a\n\n\nb", "a\n\n", " x \n\n\n\n y", "single"):
+            with self.subTest(text=text):
+                self.assertEqual(list(iter_buffer_blocks(text.encode("utf-8"))), markdown_to_blocks(text))
+
+    def test_crlf_sources_render_like_lf(self):
+        crlf = b"# Title\r\n\r\nPara one\r\n\r\n- a\r\n- b\r\n"
+        expected = "<div><h1>Title</h1><p>Para one</p><ul><li>a</li><li>b</li></ul></div>"
+        with open(self.md_path, "wb") as f:
+            f.write(crlf)
+        for threshold in (None, 16):
+            with self.subTest(mmap_threshold=threshold):
+                with open_markdown_source(self.md_path, mmap_threshold=threshold) as markdown:
+                    self.assertEqual(markdown_to_html_node(markdown).to_html(), expected)
+                    self.assertEqual(extract_title(markdown), "Title")
+        self.assertEqual(list(iter_buffer_blocks(b"a\rb\r\rc\n\r\nd")), ["a\nb", "c", "d"])
+
+    def test_title_from_buffer(self):
+        self.assertEqual(extract_title(MARKDOWN.encode("utf-8")), "Tëst title")
+        with self.assertRaises(ValueError):
+            extract_title(b"no title\n\n## sub")
+        with self.assertRaises(ValueError):
+            extract_title(b"")
+
+    def test_small_files_are_read_as_strings(self):
+        with open_markdown_source(self.md_path) as markdown:
+            self.assertEqual(markdown, MARKDOWN)
+
+    def test_large_files_are_mapped(self):
+        with open_markdown_source(self.md_path, mmap_threshold=16) as markdown:
+            self.assertIsInstance(markdown, mmap.mmap)
+            mapped = markdown_to_html_node(markdown).to_html()
+        self.assertTrue(markdown.closed)
+        self.assertEqual(mapped, markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_generate_page_output_is_identical_when_mapped(self):
+        plain = os.path.join(self.root, "plain.html")
+        mapped = os.path.join(self.root, "mapped.html")
+        generate_page(self.md_path, self.template, plain)
+        original = htmlnode.MMAP_THRESHOLD
+        htmlnode.MMAP_THRESHOLD = 1
+        try:
+            generate_page(self.md_path, self.template, mapped)
+        finally:
+            htmlnode.MMAP_THRESHOLD = original
+        with open(plain, "rb") as a, open(mapped, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_mmap_source.py ---
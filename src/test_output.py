@@ -0,0 +1,151 @@
+# --- START OF FILE test_output.py ---
+
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    import output
+    from output import ArchiveBackend, DiskBackend, MemoryBackend
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    import output
+    from output import ArchiveBackend, DiskBackend, MemoryBackend
+    from build import BuildOptions, build_site
+
+
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+PHOTO = b"\x89PNG" + b"\x00" * 500
+
+
+class TestOutputBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(os.path.join(self.static, "index.css"), b"body { color: red; }")
+        self.write(os.path.join(self.static, "a", "photo.png"), PHOTO)
+        self.write(os.path.join(self.static, "b", "photo.png"), PHOTO)
+        self.write(os.path.join(self.content, "index.md"), b"# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), b"# Post\n\nText")
+        self.write(self.template, TEMPLATE.encode("utf-8"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def build(self, backend, **options):
+        return build_site(self.static, self.content, self.template, self.docs,
+                          BuildOptions(manifest_path=None, state_dir=os.path.join(self.root, ".staticweb"),
+                                       **options), backend=backend)
+
+    def test_memory_backend_collects_site(self):
+        backend = MemoryBackend(root=self.docs)
+        summary = self.build(backend)
+        self.assertEqual(summary["rendered"], 2)
+        self.assertEqual(sorted(backend.files),
+                         ["a/photo.png", "b/photo.png", "blog/post.html", "index.css", "index.html"])
+        self.assertIn(b"<h1>Home</h1>", backend.files["index.html"])
+        self.assertFalse(os.path.exists(self.docs))
+
+    def test_memory_backend_reports_unchanged_writes(self):
+        backend = MemoryBackend()
+        self.assertTrue(backend.write_bytes("x.html", b"one"))
+        self.assertFalse(backend.write_bytes("x.html", b"one"))
+        self.assertTrue(backend.write_bytes("x.html", b"two"))
+
+    def test_tar_archive_stores_duplicates_as_links(self):
+        archive_path = os.path.join(self.root, "site.tar.gz")
+        with ArchiveBackend(archive_path, root=self.docs) as backend:
+            self.build(backend, dedupe=True, jobs=2)
+        with tarfile.open(archive_path, "r:gz") as archive:
+            members = {member.name: member for member in archive.getmembers()}
+            self.assertIn("blog/post.html", members)
+            photos = [members["a/photo.png"], members["b/photo.png"]]
+            links = [member for member in photos if member.islnk()]
+            self.assertEqual(len(links), 1)
+            self.assertIn(links[0].linkname, ("a/photo.png", "b/photo.png"))
+            self.assertNotEqual(links[0].linkname, links[0].name)
+            self.assertIn(b"<h1>Post</h1>", archive.extractfile("blog/post.html").read())
+        self.assertFalse(os.path.exists(self.docs))
+
+    def test_zip_archive(self):
+        buffer = io.BytesIO()
+        with ArchiveBackend("site.zip", root=self.docs, fileobj=buffer) as backend:
+            self.build(backend, dedupe=True)
+        with zipfile.ZipFile(buffer) as archive:
+            self.assertEqual(archive.read("b/photo.png"), PHOTO)
+            self.assertIn(b"<h1>Home</h1>", archive.read("index.html"))
+
+    def test_archive_rejects_duplicate_members(self):
+        with ArchiveBackend("site.tar", fileobj=io.BytesIO()) as backend:
+            backend.write_bytes("index.html", b"one")
+            with self.assertRaises(ValueError):
+                backend.write_bytes("index.html", b"two")
+
+    def test_unsupported_archive_type(self):
+        with self.assertRaises(ValueError):
+            ArchiveBackend("site.rar", fileobj=io.BytesIO())
+
+    def test_disk_copy_replaces_links_instead_of_writing_through(self):
+        backend = DiskBackend()
+        first = os.path.join(self.docs, "first.png")
+        second = os.path.join(self.docs, "second.png")
+        backend.copy_file(os.path.join(self.static, "a", "photo.png"), first)
+        self.assertTrue(backend.link_file(first, second))
+        backend.copy_file(os.path.join(self.static, "index.css"), second)
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), PHOTO)
+
+    def test_default_rebuild_keeps_unchanged_outputs_and_removes_stale(self):
+        self.build(None)
+        page = os.path.join(self.docs, "blog", "post.html")
+        css = os.path.join(self.docs, "index.css")
+        for path in (page, css):
+            os.utime(path, ns=(10**9, 10**9))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.write(os.path.join(self.docs, "old", "gone.html"), b"stale")
+        summary = self.build(None)
+        self.assertEqual(os.stat(css).st_mtime_ns, 10**9)
+        self.assertFalse(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "old")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertEqual(summary["stale_removed"], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_rebuild_without_compress_removes_compressed_siblings(self):
+        self.write(os.path.join(self.content, "long.md"), b"# Long\n\n" + b"Compressible text. " * 200)
+        self.build(None, compress=True)
+        sibling = os.path.join(self.docs, "long.html.gz")
+        self.assertTrue(os.path.exists(sibling))
+        self.build(None)
+        self.assertFalse(os.path.exists(sibling))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "long.html")))
+
+    def test_output_mode_follows_umask_or_existing_file(self):
+        path = os.path.join(self.root, "new.html")
+        DiskBackend().write_bytes(path, b"<p>hi</p>")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~output._UMASK)
+        os.chmod(path, 0o600)
+        DiskBackend().write_bytes(path, b"<p>changed</p>")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_output.py ---
@@ -0,0 +1,178 @@
+# --- START OF FILE test_scale.py ---
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import contextlib
+import tracemalloc
+import unittest
+
+# Adjust import path if necessary
+try:
+    from budget import rss_bytes
+    from build import BuildOptions, build_pages
+    from htmlnode import discover_pages, generate_pages_recursive
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from budget import rss_bytes
+    from build import BuildOptions, build_pages
+    from htmlnode import discover_pages, generate_pages_recursive
+
+
+# Pages in the large site; STATICWEB_SCALE_PAGES=100000 runs the full-size check,
+# and STATICWEB_SCALE_REPORT=1 prints the measured peaks.
+# The small site is a quarter of it, so the ceilings apply to the difference.
+LARGE_PAGES = int(os.environ.get("STATICWEB_SCALE_PAGES", "400"))
+SMALL_PAGES = max(LARGE_PAGES // 4, 1)
+PAGES_PER_DIR = 200
+
+# Peak traced memory may only grow by the per-page bookkeeping (page list,
+# changed-output paths, about 200 B), never by page content, which is about
+# 2 KiB here. The slack only absorbs allocator noise, so retaining even a
+# quarter of every page's content fails at any size.
+TRACED_BYTES_PER_PAGE = 512
+TRACED_SLACK_BYTES = 16 * 2**10
+# RSS moves in whole pages and also counts allocator fragmentation and
+# tracemalloc's own tables, so it is only meaningful on large sites
+RSS_MIN_PAGES = 10000
+RSS_BYTES_PER_PAGE = 1024
+RSS_SLACK_BYTES = 8 * 2**20
+
+PAGE_MARKDOWN = """# Page {i}
+
+Some **bold** and _italic_ text with `code` and a [link](/page{i}.html) to itself.
+
+{paragraph}
+
+- one item
+- another item with an ![image](/images/{i}.png)
+
+```
+code block for page {i}
+```
+
+> a quote to finish
+"""
+PARAGRAPH = "Plain words flow through this paragraph to give every page some bulk. " * 25
+
+
+def write_site(root, pages):
+    content = os.path.join(root, "content")
+    for i in range(pages):
+        directory = os.path.join(content, f"section{i // PAGES_PER_DIR}")
+        if i % PAGES_PER_DIR == 0:
+            os.makedirs(directory)
+        with open(os.path.join(directory, f"page{i}.md"), "w") as f:
+            f.write(PAGE_MARKDOWN.format(i=i, paragraph=PARAGRAPH))
+    template = os.path.join(root, "template.html")
+    with open(template, "w") as f:
+        f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+    return content, template
+
+
+class StageMemory:
+    """
+    Measures the peak traced and resident memory of one build stage, and the
+    allocation sites still holding memory when it ends.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.traced_peak = 0
+        self.rss_peak = None
+        self.top_sites = []
+        self._stop = threading.Event()
+
+    def _sample_rss(self):
+        while not self._stop.wait(0.01):
+            rss = rss_bytes(os.getpid())
+            if rss is not None:
+                self.rss_peak = max(self.rss_peak or 0, rss)
+
+    def __enter__(self):
+        self.start_snapshot = tracemalloc.take_snapshot()
+        self.rss_start = rss_bytes(os.getpid())
+        self.rss_peak = self.rss_start
+        tracemalloc.reset_peak()
+        self.traced_start = tracemalloc.get_traced_memory()[0]
+        self._sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.traced_peak = tracemalloc.get_traced_memory()[1] - self.traced_start
+        self._stop.set()
+        self._sampler.join()
+        stats = tracemalloc.take_snapshot().compare_to(self.start_snapshot, "lineno")
+        self.top_sites = [str(stat) for stat in stats[:8]]
+        self.start_snapshot = None
+
+    @property
+    def rss_growth(self):
+        if self.rss_start is None or self.rss_peak is None:
+            return None
+        return self.rss_peak - self.rss_start
+
+
+class TestScale(unittest.TestCase):
+    """Peak memory of each build stage must not grow with page content."""
+
+    def measure(self, pages):
+        root = tempfile.mkdtemp()
+        try:
+            content, template = write_site(root, pages)
+            docs = os.path.join(root, "docs")
+            options = BuildOptions(state_dir=os.path.join(root, ".staticweb"), schedule=False)
+            stages = {}
+            tracemalloc.start()
+            try:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    with StageMemory("discover") as stages["discover"]:
+                        discovered = discover_pages(content, docs)
+                    with StageMemory("render") as stages["render"]:
+                        summary = build_pages(discovered, template, options)
+                    del discovered, summary
+                    with StageMemory("recursive") as stages["recursive"]:
+                        generate_pages_recursive(content, template, os.path.join(root, "docs-recursive"))
+            finally:
+                tracemalloc.stop()
+            return stages
+        finally:
+            shutil.rmtree(root)
+
+    def report(self, stage, small, large):
+        return "\n".join(
+            [f"Stage '{stage}': traced peak {small.traced_peak} B at {SMALL_PAGES} pages, "
+             f"{large.traced_peak} B at {LARGE_PAGES} pages; RSS growth {small.rss_growth} B, "
+             f"{large.rss_growth} B. Top allocation sites held at the end of the large stage:"]
+            + [f"  {site}" for site in large.top_sites])
+
+    def test_peak_memory_is_bounded_per_page(self):
+        started = time.perf_counter()
+        small = self.measure(SMALL_PAGES)
+        large = self.measure(LARGE_PAGES)
+        extra_pages = LARGE_PAGES - SMALL_PAGES
+        for stage in small:
+            with self.subTest(stage=stage):
+                report = self.report(stage, small[stage], large[stage])
+                self.assertLessEqual(large[stage].traced_peak - small[stage].traced_peak,
+                                     extra_pages * TRACED_BYTES_PER_PAGE + TRACED_SLACK_BYTES, report)
+                if (LARGE_PAGES >= RSS_MIN_PAGES and large[stage].rss_growth is not None
+                        and small[stage].rss_growth is not None):
+                    self.assertLessEqual(large[stage].rss_growth - small[stage].rss_growth,
+                                         extra_pages * RSS_BYTES_PER_PAGE + RSS_SLACK_BYTES, report)
+        if not os.environ.get("STATICWEB_SCALE_REPORT"):
+            return
+        print(f"\nScale test: {SMALL_PAGES} and {LARGE_PAGES} pages in {time.perf_counter() - started:.1f}s")
+        for stage in small:
+            print(f"  {stage}: traced peak {small[stage].traced_peak / 2**20:.1f} -> "
+                  f"{large[stage].traced_peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_scale.py ---
@@ -0,0 +1,85 @@
+# --- START OF FILE test_schedule.py ---
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from schedule import estimate_costs, load_render_times, plan_batches, record_render_times, schedule_stats
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from schedule import estimate_costs, load_render_times, plan_batches, record_render_times, schedule_stats
+    from build import BuildOptions, build_site
+
+
+class TestSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def page(self, name, size):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as f:
+            f.write("# T\n\n" + "x" * size)
+        return path, path + ".html"
+
+    def test_large_pages_first_and_small_pages_batched(self):
+        pages = [(f"p{i}.md", f"p{i}.html") for i in range(10)]
+        costs = [100.0, 1.0, 1.0, 1.0, 1.0, 50.0, 1.0, 1.0, 1.0, 1.0]
+        batches = plan_batches(pages, costs, jobs=2, tasks_per_worker=4)
+        self.assertEqual(batches[0], [("p0.md", "p0.html")])
+        self.assertEqual(batches[1], [("p5.md", "p5.html")])
+        self.assertGreater(len(batches[-1]), 1)
+        self.assertEqual(sorted(page for batch in batches for page in batch), sorted(pages))
+
+    def test_costs_prefer_history_and_scale_sizes_by_its_rate(self):
+        known = self.page("known.md", 1000)
+        new = self.page("new.md", 4000)
+        history = {known[0]: 2.0}
+        known_cost, new_cost = estimate_costs([known, new], history)
+        self.assertEqual(known_cost, 2.0)
+        self.assertAlmostEqual(new_cost, 2.0 * os.path.getsize(new[0]) / os.path.getsize(known[0]))
+
+    def test_stats(self):
+        spans = [(1, 0.0, 4.0), (2, 0.0, 1.0), (2, 1.0, 2.0)]
+        stats = schedule_stats(spans, jobs=2)
+        self.assertEqual(stats["makespan"], 4.0)
+        self.assertEqual(stats["utilization"], 0.75)
+        self.assertEqual(stats["tail"], 2.0)
+        self.assertEqual(schedule_stats([(1, 0.0, 1.0)], jobs=2)["tail"], 1.0)
+
+    def test_history_is_merged(self):
+        record_render_times(self.root, {"a": 1.0, "b": 2.0})
+        record_render_times(self.root, {"b": 3.0})
+        self.assertEqual(load_render_times(self.root), {"a": 1.0, "b": 3.0})
+
+    def test_parallel_build_is_scheduled(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        for i in range(12):
+            with open(os.path.join(content, f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\n" + "words " * (i * 200))
+        template = os.path.join(self.root, "template.html")
+        with open(template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        state = os.path.join(self.root, ".staticweb")
+        docs = os.path.join(self.root, "docs")
+        summary = build_site(os.path.join(self.root, "static"), content, template, docs,
+                             BuildOptions(jobs=2, state_dir=state))
+        self.assertEqual(summary["rendered"], 12)
+        self.assertEqual(summary["schedule"]["pages"], 12)
+        self.assertLess(summary["schedule"]["batches"], 12)
+        self.assertEqual(len(load_render_times(state)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_schedule.py ---
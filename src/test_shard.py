@@ -0,0 +1,111 @@
+# --- START OF FILE test_shard.py ---
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from build import BuildOptions, build_site
+    from shard import parse_shard, shard_of, merge_shards, MANIFEST_FILE
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from build import BuildOptions, build_site
+    from shard import parse_shard, shard_of, merge_shards, MANIFEST_FILE
+
+
+class TestShardPartitioning(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "1/0", "x/4", "1-4"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_assignment_is_stable_and_in_range(self):
+        paths = [f"blog/post{i}/index.md" for i in range(200)]
+        first = [shard_of(path, 4) for path in paths]
+        self.assertEqual(first, [shard_of(path, 4) for path in paths])
+        self.assertEqual(set(first), {1, 2, 3, 4})
+        self.assertEqual(shard_of("index.md", 1), 1)
+
+
+class TestShardedBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.static)
+        with open(os.path.join(self.static, "index.css"), "w") as f:
+            f.write("body {}")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(12):
+            os.makedirs(os.path.join(self.content, f"post{i}"))
+            with open(os.path.join(self.content, f"post{i}", "index.md"), "w") as f:
+                f.write(f"# Post {i}\n\nBody {i}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def build_shard(self, index, count, dedupe=False):
+        out = os.path.join(self.root, f"shard{index}")
+        build_site(self.static, self.content, self.template, out,
+                   BuildOptions(shard=(index, count), dedupe=dedupe, state_dir=os.path.join(self.root, ".staticweb")))
+        return out
+
+    def test_shards_are_disjoint_and_merge(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 2, 3)]
+        pages = []
+        for shard_dir in shard_dirs:
+            with open(os.path.join(shard_dir, MANIFEST_FILE)) as f:
+                pages.extend(json.load(f)["pages"])
+        self.assertEqual(len(pages), 12)
+        self.assertEqual(len(set(pages)), 12)
+
+        merged_dir = os.path.join(self.root, "merged")
+        merged = merge_shards(shard_dirs, merged_dir)
+        self.assertEqual(len(merged["pages"]), 12)
+        self.assertTrue(os.path.exists(os.path.join(merged_dir, "index.css")))
+        for i in range(12):
+            self.assertTrue(os.path.exists(os.path.join(merged_dir, f"post{i}", "index.html")))
+
+    def test_merge_keeps_dedupe_hardlinks(self):
+        shutil.copy(os.path.join(self.static, "index.css"), os.path.join(self.static, "copy.css"))
+        shard_dirs = [self.build_shard(i, 2, dedupe=True) for i in (1, 2)]
+        merged_dir = os.path.join(self.root, "merged")
+        merge_shards(shard_dirs, merged_dir)
+        self.assertTrue(os.path.samefile(os.path.join(merged_dir, "index.css"), os.path.join(merged_dir, "copy.css")))
+        self.assertFalse(os.path.samefile(os.path.join(merged_dir, "index.css"),
+                                          os.path.join(shard_dirs[0], "index.css")))
+
+    def test_merge_detects_missing_shard(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 2)]
+        with self.assertRaisesRegex(ValueError, "Missing shards: 3/3"):
+            merge_shards(shard_dirs, os.path.join(self.root, "merged"))
+
+    def test_merge_detects_duplicate_shard(self):
+        first = self.build_shard(1, 2)
+        copy = os.path.join(self.root, "copy")
+        shutil.copytree(first, copy)
+        with self.assertRaisesRegex(ValueError, "more than once"):
+            merge_shards([first, copy, self.build_shard(2, 2)], os.path.join(self.root, "merged"))
+
+    def test_merge_detects_missing_page_file(self):
+        shard_dirs = [self.build_shard(i, 2) for i in (1, 2)]
+        with open(os.path.join(shard_dirs[1], MANIFEST_FILE)) as f:
+            page = json.load(f)["pages"][0]
+        os.remove(os.path.join(shard_dirs[1], page))
+        with self.assertRaisesRegex(ValueError, "missing from"):
+            merge_shards(shard_dirs, os.path.join(self.root, "merged"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_shard.py ---
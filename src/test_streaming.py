@@ -0,0 +1,97 @@
+# --- START OF FILE test_streaming.py ---
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    import htmlnode
+    from htmlnode import (generate_page, iter_block_nodes, iter_line_blocks, markdown_to_blocks,
+                          markdown_to_html_node, render_markdown_stream)
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    import htmlnode
+    from htmlnode import (generate_page, iter_block_nodes, iter_line_blocks, markdown_to_blocks,
+                          markdown_to_html_node, render_markdown_stream)
+
+
+MARKDOWN = """# Title
+
+A paragraph
+spanning **two** lines.
+
+
+
+- one
+- two
+   \n
+```
+code
+```
+
+> quote
+"""
+
+
+class TestStreamingParser(unittest.TestCase):
+
+    def test_line_blocks_match_markdown_to_blocks(self):
+        for text in (MARKDOWN, "", "\n\n\n", "a\n\n\nb", "a\n \nb", "a\n\n", "  x\n\n\n\n  y  "):
+            with self.subTest(text=text):
+                lines = io.StringIO(text)
+                self.assertEqual(list(iter_line_blocks(lines)), markdown_to_blocks(text))
+
+    def test_lines_without_newlines(self):
+        self.assertEqual(list(iter_line_blocks(["# Title", "", "para", "graph"])), ["# Title", "para\ngraph"])
+
+    def test_stream_matches_tree_render(self):
+        out = io.StringIO()
+        count = render_markdown_stream(io.StringIO(MARKDOWN), out)
+        self.assertEqual(count, 5)
+        self.assertEqual(out.getvalue(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_nodes_are_yielded_lazily(self):
+        def endless_lines():
+            yield "# Title\n"
+            yield "\n"
+            while True:
+                yield "more text\n"
+
+        nodes = iter_block_nodes(endless_lines())
+        self.assertEqual(next(nodes).to_html(), "<h1>Title</h1>")
+
+    def test_large_pages_stream_to_disk(self):
+        root = tempfile.mkdtemp()
+        try:
+            md_path = os.path.join(root, "page.md")
+            template = os.path.join(root, "template.html")
+            with open(md_path, "w") as f:
+                f.write(MARKDOWN + "\n\n[link](/x) ![img](/y.png)   spaced    words")
+            with open(template, "w") as f:
+                f.write('<title>{{ Title }}</title><a href="/home">h</a>{{ Content }}')
+            plain = os.path.join(root, "plain.html")
+            streamed = os.path.join(root, "streamed.html")
+            expected = generate_page(md_path, template, plain, "/base/", minify=True)
+            original = htmlnode.MMAP_THRESHOLD
+            htmlnode.MMAP_THRESHOLD = 1
+            try:
+                result = generate_page(md_path, template, streamed, "/base/", minify=True)
+                self.assertFalse(generate_page(md_path, template, streamed, "/base/", minify=True).changed)
+            finally:
+                htmlnode.MMAP_THRESHOLD = original
+            with open(plain, "rb") as a, open(streamed, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            self.assertEqual(result.output_bytes, expected.output_bytes)
+            self.assertEqual(result.bytes_saved, expected.bytes_saved)
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_streaming.py ---
@@ -55,7 +55,7 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "img")
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "image.jpg", "alt": "Sample image"})
-        self.assertEqual(html_node.to_html(), '<img src="image.jpg" alt="Sample image"></img>')
+        self.assertEqual(html_node.to_html(), '<img src="image.jpg" alt="Sample image">')
     
     def test_image_missing_url(self):
         node = TextNode("Sample image", TextType.IMAGE)
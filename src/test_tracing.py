@@ -0,0 +1,87 @@
+# --- START OF FILE test_tracing.py ---
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    import tracing
+    from build import BuildOptions, build_site
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    import tracing
+    from build import BuildOptions, build_site
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        for i in range(4):
+            with open(os.path.join(self.content, f"page{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\nSome **bold** text.")
+        with open(os.path.join(self.static, "style.css"), "w") as f:
+            f.write("body { color: red; }")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        tracing.disable()
+        shutil.rmtree(self.root)
+
+    def build(self, jobs):
+        trace_path = os.path.join(self.root, "trace.json")
+        options = BuildOptions(jobs=jobs, state_dir=os.path.join(self.root, ".staticweb"), trace_path=trace_path)
+        summary = build_site(self.static, self.content, self.template, os.path.join(self.root, "docs"), options)
+        with open(trace_path) as f:
+            trace = json.load(f)
+        self.assertIsNone(options.trace_dir)
+        return summary, trace["traceEvents"]
+
+    def test_spans_are_disabled_by_default(self):
+        with tracing.span("nothing"):
+            pass
+        self.assertIs(tracing.span("nothing"), tracing._NULL_SPAN)
+
+    def test_serial_build_trace(self):
+        summary, events = self.build(jobs=1)
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(summary["trace_events"], len(spans))
+        names = [event["name"] for event in spans]
+        for name in ("build", "static", "discover", "pages"):
+            self.assertEqual(names.count(name), 1)
+        for name in ("page", "read", "parse", "render", "write"):
+            self.assertEqual(names.count(name), 4)
+        copies = [event for event in spans if event["name"] == "copy"]
+        self.assertEqual([os.path.basename(event["args"]["path"]) for event in copies], ["style.css"])
+        for event in spans:
+            self.assertEqual(event["pid"], os.getpid())
+            self.assertIn("tid", event)
+            self.assertGreaterEqual(event["dur"], 0)
+        metadata = [event for event in events if event["ph"] == "M"]
+        self.assertEqual(metadata[0]["args"]["name"], "build")
+
+    def test_parallel_build_traces_workers(self):
+        _, events = self.build(jobs=2)
+        pages = [event for event in events if event["name"] == "page"]
+        self.assertEqual(len(pages), 4)
+        self.assertTrue(all(event["pid"] != os.getpid() for event in pages))
+        worker_names = [event["args"]["name"] for event in events
+                        if event["ph"] == "M" and event["pid"] != os.getpid()]
+        self.assertTrue(worker_names)
+        self.assertTrue(all(name.startswith("worker ") for name in worker_names))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_tracing.py ---
@@ -0,0 +1,72 @@
+# --- START OF FILE test_write_if_changed.py ---
+
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adjust import path if necessary
+try:
+    from output import write_if_changed
+    from htmlnode import generate_page
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__)) # Or adjust path
+    from output import write_if_changed
+    from htmlnode import generate_page
+
+
+class TestWriteIfChanged(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "page.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def backdate(self):
+        os.utime(self.path, ns=(10**9, 10**9))
+
+    def test_new_file_is_written(self):
+        self.assertTrue(write_if_changed(self.path, b"<p>hi</p>"))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>hi</p>")
+
+    def test_identical_bytes_keep_mtime(self):
+        write_if_changed(self.path, b"<p>hi</p>")
+        self.backdate()
+        self.assertFalse(write_if_changed(self.path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 10**9)
+
+    def test_same_size_different_bytes_rewritten(self):
+        write_if_changed(self.path, b"<p>hi</p>")
+        self.backdate()
+        self.assertTrue(write_if_changed(self.path, b"<p>yo</p>"))
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, 10**9)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>yo</p>")
+
+    def test_no_temp_files_left(self):
+        write_if_changed(self.path, b"a")
+        write_if_changed(self.path, b"bb")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_generate_page_reports_changed(self):
+        template = os.path.join(self.root, "template.html")
+        source = os.path.join(self.root, "index.md")
+        with open(template, "w") as f:
+            f.write("{{ Content }}")
+        with open(source, "w") as f:
+            f.write("# Title")
+        self.assertTrue(generate_page(source, template, self.path).changed)
+        self.assertFalse(generate_page(source, template, self.path).changed)
+        with open(source, "w") as f:
+            f.write("# Title 2")
+        self.assertTrue(generate_page(source, template, self.path).changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# --- END OF FILE test_write_if_changed.py ---
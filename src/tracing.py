@@ -0,0 +1,116 @@
+# --- START OF FILE tracing.py ---
+
+import os
+import json
+import time
+import threading
+
+
+# Events of this process, or None while tracing is off. Worker processes
+# append theirs to one JSON-lines file each in the shared trace directory,
+# which write_trace merges into a single Chrome/Perfetto trace.
+_events = None
+_trace_dir = None
+_pid = None
+
+
+class _Span:
+    """A complete ('X') trace event, recorded when the with block exits."""
+
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.time_ns()
+        event = {"name": self.name, "cat": self.cat, "ph": "X", "ts": self.start // 1000,
+                 "dur": (end - self.start) // 1000, "pid": _pid, "tid": threading.get_native_id()}
+        if self.args:
+            event["args"] = self.args
+        _events.append(event)
+
+
+class _NullSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(trace_dir):
+    """
+    Starts recording spans in this process into trace_dir. Safe to call
+    repeatedly; a forked child starts with an empty event list rather than
+    inheriting its parent's.
+    """
+    global _events, _trace_dir, _pid
+    if _events is not None and _pid == os.getpid() and _trace_dir == trace_dir:
+        return
+    _events = []
+    _trace_dir = trace_dir
+    _pid = os.getpid()
+
+
+def disable():
+    global _events, _trace_dir, _pid
+    _events = _trace_dir = _pid = None
+
+
+def span(name, cat="build", **args):
+    """
+    Returns a context manager recording a span named name, tagged with the
+    current process and thread IDs. A shared no-op when tracing is off.
+    """
+    if _events is None or _pid != os.getpid():
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def flush():
+    """Appends this process's recorded events to its file in the trace directory."""
+    if not _events or _pid != os.getpid():
+        return
+    with open(os.path.join(_trace_dir, f"{_pid}.jsonl"), "a", encoding="utf-8") as f:
+        for event in _events:
+            f.write(json.dumps(event) + "\n")
+    _events.clear()
+
+
+def write_trace(trace_dir, out_path, main_pid=None):
+    """
+    Merges every process's events into a Chrome trace-event JSON file,
+    with process names so the viewer labels the main process and workers.
+
+    Returns:
+        The number of span events written.
+    """
+    events = []
+    for name in sorted(os.listdir(trace_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        with open(os.path.join(trace_dir, name), "r", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    pids = sorted({event["pid"] for event in events})
+    metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                 "args": {"name": "build" if pid == main_pid else f"worker {pid}"}} for pid in pids]
+    events.sort(key=lambda event: event["ts"])
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+# --- END OF FILE tracing.py ---